@@ -0,0 +1,239 @@
+"""
+Бенчмарк гарячих шляхів AI (без pygame)
+Запуск: python -m benchmark run -o results.json
+        python -m benchmark compare baseline.json results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+from maze import Maze
+from entities import Pacman, Ghost
+from simulation import Simulation
+from level_manager import LevelManager
+from constants import GHOST_CONFIGS, Difficulty
+
+MAZE_SIZES = [15, 50, 100, 250, 500, 1000]
+GHOST_COUNTS = [1, 4, 16, 64, 256]
+BATCH_SIZE = 1000
+DEFAULT_THRESHOLD = 0.10
+
+
+def machine_info():
+    """Опис машини для збереження разом з результатами"""
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+    }
+
+
+def measure(func, repeat=3):
+    """Мінімальний час одного виклику (кількість викликів підбирає autorange)"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number
+
+
+def open_cells(maze, count, rng):
+    """Випадкові вільні клітинки лабіринту"""
+    cells = []
+    while len(cells) < count:
+        x = rng.randrange(1, maze.width - 1)
+        y = rng.randrange(1, maze.height - 1)
+        if not maze.is_wall(x, y):
+            cells.append((x, y))
+    return cells
+
+
+def make_ghosts(maze, count, rng):
+    ghosts = []
+    for i, (x, y) in enumerate(open_cells(maze, count, rng)):
+        color, personality = GHOST_CONFIGS[i % len(GHOST_CONFIGS)]
+        ghosts.append(Ghost(x, y, color, personality))
+    return ghosts
+
+
+def bench_maze(size, rng):
+    """Операції лабіринту та пошуку шляху для одного розміру"""
+    results = []
+    maze = Maze(size, size)
+    cells = open_cells(maze, BATCH_SIZE, rng)
+
+    def record(name, per_call, ops=1):
+        results.append({'name': name, 'size': size, 'ghosts': None,
+                        'per_op_s': per_call / ops})
+
+    record('Maze.generate', measure(maze.generate, repeat=1 if size >= 500 else 3))
+
+    def is_wall_batch():
+        for x, y in cells:
+            maze.is_wall(x, y)
+    record('Maze.is_wall', measure(is_wall_batch), BATCH_SIZE)
+
+    def neighbors_batch():
+        for x, y in cells:
+            maze.get_neighbors(x, y)
+    record('Maze.get_neighbors', measure(neighbors_batch), BATCH_SIZE)
+
+    ghost = make_ghosts(maze, 1, rng)[0]
+    targets = open_cells(maze, 20, rng)
+
+    def bfs_batch():
+        for target in targets:
+            ghost.find_path_bfs(target, maze)
+    record('Ghost.find_path_bfs', measure(bfs_batch), len(targets))
+
+    def astar_batch():
+        for target in targets:
+            ghost.find_path_astar(target, maze)
+    record('Ghost.find_path_astar', measure(astar_batch), len(targets))
+
+    pacmen = [Pacman(x, y) for x, y in open_cells(maze, 100, rng)]
+
+    def vision_batch():
+        for pacman in pacmen:
+            ghost.can_see_pacman(pacman, maze)
+    record('Ghost.can_see_pacman', measure(vision_batch), len(pacmen))
+
+    return results
+
+
+def bench_tick(size, ghost_count, rng):
+    """
+    Повний тік симуляції (пакмен в авто-режимі, HARD)
+    Лабіринт будується через LevelManager, як у грі, - привиди користуються
+    таблицями відстаней і видимості макета
+    """
+    sim = Simulation(LevelManager(width=size, height=size))
+    try:
+        # Дочекатися фонової підготовки наступного рівня - вона не має
+        # конкурувати з вимірюванням
+        sim.levels.get(sim.level + 1)
+        sim.difficulty = Difficulty.HARD
+        x, y = open_cells(sim.maze, 1, rng)[0]
+        sim.pacman = Pacman(x, y)
+        sim.pacman.auto_mode = True
+        sim.ghosts = make_ghosts(sim.maze, ghost_count, rng)
+        # Точки не збираються: інакше очки змінюють складність, а пройдений
+        # рівень підміняє лабіринт посеред вимірювання
+        sim.collect_dots = lambda: None
+
+        def tick():
+            sim.game_over = False
+            sim.update()
+
+        # Повідомлення гри (GAME OVER тощо) не мають змішуватися з результатами
+        with contextlib.redirect_stdout(io.StringIO()):
+            per_op = measure(tick)
+    finally:
+        sim.levels.shutdown()
+    return {'name': 'Simulation.update', 'size': size, 'ghosts': ghost_count,
+            'per_op_s': per_op}
+
+
+def run(sizes, ghost_counts, seed=0, verbose=True):
+    rng = random.Random(seed)
+    random.seed(seed)
+    results = []
+    for size in sizes:
+        for entry in bench_maze(size, rng):
+            results.append(entry)
+            if verbose:
+                print(format_entry(entry))
+        for ghost_count in ghost_counts:
+            entry = bench_tick(size, ghost_count, rng)
+            results.append(entry)
+            if verbose:
+                print(format_entry(entry))
+    return {
+        'machine': machine_info(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def format_entry(entry):
+    ghosts = f" ghosts={entry['ghosts']}" if entry['ghosts'] is not None else ""
+    return f"{entry['name']:<24} size={entry['size']:<5}{ghosts:<12} {entry['per_op_s'] * 1e6:12.2f} µs"
+
+
+def entry_key(entry):
+    return (entry['name'], entry['size'], entry['ghosts'])
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Порівнює результати з базовими
+
+    Returns:
+        Список регресій (назва, розмір, привиди, було, стало, зміна)
+    """
+    base = {entry_key(e): e['per_op_s'] for e in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        key = entry_key(entry)
+        if key not in base or base[key] <= 0:
+            continue
+        change = entry['per_op_s'] / base[key] - 1.0
+        if change > threshold:
+            regressions.append((*key, base[key], entry['per_op_s'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк AI пакмена")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="виміряти та зберегти JSON")
+    run_parser.add_argument('-o', '--output', default='bench_results.json')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=MAZE_SIZES)
+    run_parser.add_argument('--ghosts', type=int, nargs='+', default=GHOST_COUNTS)
+    run_parser.add_argument('--seed', type=int, default=0)
+
+    compare_parser = commands.add_parser('compare', help="порівняти з базовими результатами")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="допустиме сповільнення (0.10 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run(args.sizes, args.ghosts, args.seed)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Результати збережено у {args.output}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    if not regressions:
+        print("Регресій не виявлено")
+        return 0
+
+    print(f"Регресії (> {args.threshold:.0%}):")
+    for name, size, ghosts, before, after, change in regressions:
+        ghosts_text = f" ghosts={ghosts}" if ghosts is not None else ""
+        print(f"  {name} size={size}{ghosts_text}: "
+              f"{before * 1e6:.2f} → {after * 1e6:.2f} µs (+{change:.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
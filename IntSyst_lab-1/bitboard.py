@@ -0,0 +1,167 @@
+class BitboardMaze:
+    """
+    Лабіринт як бітові дошки (Python int, один біт на клітинку)
+    Біт клітинки (x, y) = y * stride + x; stride = width + 1, зайвий стовпчик
+    завжди нульовий, тому зсуви вліво/вправо не переходять між рядками
+    """
+    __slots__ = ('width', 'height', 'stride', 'open')
+
+    def __init__(self, maze):
+        self.width = maze.width
+        self.height = maze.height
+        self.stride = maze.width + 1
+        # Вільні клітинки (не стіни); рядок за рядком, без циклу по бітах
+        open_mask = 0
+        for y in range(maze.height - 1, -1, -1):
+            row = 0
+            for value in reversed(maze.grid[y]):
+                row = (row << 1) | (1 if value != 0 else 0)
+            open_mask = (open_mask << self.stride) | row
+        self.open = open_mask
+
+    def index(self, x, y):
+        return y * self.stride + x
+
+    def bit(self, x, y):
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return 0
+        return 1 << (y * self.stride + x)
+
+    def cell(self, index):
+        return (index % self.stride, index // self.stride)
+
+    def mask_of(self, cells):
+        mask = 0
+        for x, y in cells:
+            mask |= self.bit(x, y)
+        return mask
+
+    def cells(self, mask):
+        """Клітинки, біти яких встановлені (від молодших до старших)"""
+        while mask:
+            low = mask & -mask
+            yield self.cell(low.bit_length() - 1)
+            mask ^= low
+
+    def first_cell(self, mask):
+        if not mask:
+            return None
+        return self.cell((mask & -mask).bit_length() - 1)
+
+    def expand(self, mask, passable=None):
+        """Сусіди всіх клітинок маски (4 напрямки) в межах прохідних клітинок"""
+        if passable is None:
+            passable = self.open
+        stride = self.stride
+        return ((mask << 1) | (mask >> 1) | (mask << stride) | (mask >> stride)) & passable
+
+    def bfs_layers(self, start, goal=0, blocked=0, max_layers=None):
+        """
+        BFS фронтами: кожен шар - одна маска
+
+        Returns:
+            Список шарів (шар 0 - start); зупиняється на першому шарі,
+            що перетинає goal, або коли фронт вичерпано
+        """
+        passable = self.open & ~blocked
+        layers = [start]
+        visited = start
+        frontier = start
+        while frontier and not frontier & goal:
+            if max_layers is not None and len(layers) > max_layers:
+                break
+            frontier = self.expand(frontier, passable) & ~visited
+            if not frontier:
+                break
+            visited |= frontier
+            layers.append(frontier)
+        return layers
+
+    def distance(self, start_cell, goal_mask, blocked=0):
+        """Кількість кроків до найближчої клітинки goal_mask (або None)"""
+        layers = self.bfs_layers(self.bit(*start_cell), goal_mask, blocked)
+        if not layers[-1] & goal_mask:
+            return None
+        return len(layers) - 1
+
+    def first_step(self, start_cell, goal_mask, blocked=0):
+        """Перша клітинка найкоротшого шляху до найближчої цілі (або None)"""
+        start = self.bit(*start_cell)
+        if not start or start & goal_mask:
+            return None
+        layers = self.bfs_layers(start, goal_mask, blocked)
+        hit = layers[-1] & goal_mask
+        if not hit or len(layers) < 2:
+            return None
+        # Зворотний прохід по шарах: лишаємо одну клітинку на шар
+        current = hit & -hit
+        for layer in reversed(layers[1:-1]):
+            step = self.expand(current) & layer
+            current = step & -step
+        return self.first_cell(current)
+
+    def reach(self, mask, steps, blocked=0):
+        """Всі клітинки, досяжні з маски не більше ніж за steps кроків"""
+        passable = self.open & ~blocked
+        visited = mask
+        frontier = mask
+        for _ in range(steps):
+            frontier = self.expand(frontier, passable) & ~visited
+            if not frontier:
+                break
+            visited |= frontier
+        return visited
+
+    def line_of_sight(self, mask, vision_range):
+        """Клітинки, видимі з маски по прямих коридорах (до першої стіни)"""
+        stride = self.stride
+        visible = mask
+        east = west = south = north = mask
+        for _ in range(vision_range):
+            east = (east << 1) & self.open
+            west = (west >> 1) & self.open
+            south = (south << stride) & self.open
+            north = (north >> stride) & self.open
+            if not (east | west | south | north):
+                break
+            visible |= east | west | south | north
+        return visible
+
+
+class BoardState:
+    """Динамічний стан гри як бітові дошки; копіювання - кілька int"""
+    __slots__ = ('board', 'dots', 'ghosts', 'pacman')
+
+    def __init__(self, board, dots=0, ghosts=0, pacman=0):
+        self.board = board
+        self.dots = dots
+        self.ghosts = ghosts
+        self.pacman = pacman
+
+    @classmethod
+    def from_game(cls, maze, pacman, ghosts):
+        board = maze.bitboard
+        ghost_mask = 0
+        for ghost in ghosts:
+            ghost_mask |= board.bit(int(round(ghost.x)), int(round(ghost.y)))
+        return cls(board, maze.dots_mask, ghost_mask,
+                   board.bit(int(round(pacman.x)), int(round(pacman.y))))
+
+    def copy(self):
+        return BoardState(self.board, self.dots, self.ghosts, self.pacman)
+
+    def dots_remaining(self):
+        return self.dots.bit_count()
+
+    def ghost_visibility(self, vision_range):
+        """Фронт видимості привидів"""
+        return self.board.line_of_sight(self.ghosts, vision_range)
+
+    def danger_zone(self, steps):
+        """Клітинки, куди будь-який привид дійде за steps кроків"""
+        return self.board.reach(self.ghosts, steps)
+
+    def move_pacman(self, cell):
+        """Переміщує пакмена та з'їдає точку (для прогнозування на кілька ходів)"""
+        self.pacman = self.board.bit(*cell)
+        self.dots &= ~self.pacman
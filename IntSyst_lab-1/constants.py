@@ -23,6 +23,16 @@ PACMAN_SPEED = 0.12
 GHOST_SPEED = 0.08
 GHOST_VISION_RANGE = 6
 GHOST_MEMORY_TIME = 80
+# Авто-режим тікає, якщо привид дійде до пакмена за стільки кроків
+AUTO_DANGER_STEPS = 4
+
+# Частота симуляції та рендерингу (незалежні)
+SIM_TICK_RATE = 60
+RENDER_FPS = 60
+MAX_CATCHUP_TICKS = 5
+
+# Кеш рівнів (лабіринти та похідні структури)
+LEVEL_CACHE_SIZE = 8
 
 # Пороги складності
 SCORE_THRESHOLD_MEDIUM = 300
@@ -37,6 +47,22 @@ class Difficulty(Enum):
     MEDIUM = 2
     HARD = 3
 
+# Коди особистостей привидів (індекси в таблиці стратегій)
+PERSONALITY_AGGRESSIVE = 0
+PERSONALITY_STRATEGIC = 1
+PERSONALITY_PATROL = 2
+PERSONALITY_RANDOM = 3
+PERSONALITY_CODES = {
+    'aggressive': PERSONALITY_AGGRESSIVE,
+    'strategic': PERSONALITY_STRATEGIC,
+    'patrol': PERSONALITY_PATROL,
+    'random': PERSONALITY_RANDOM
+}
+
+# Компактне сховище сутностей (колонки array + кільцеві буфери шляхів)
+USE_COMPACT_ENTITIES = False
+PATH_RING_SIZE = 64
+
 # Конфігурація привидів
 GHOST_CONFIGS = [
     (RED, 'aggressive'),
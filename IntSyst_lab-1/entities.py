@@ -2,17 +2,21 @@ import math
 import random
 import heapq
 from collections import deque
+from itertools import islice
+from bitboard import BoardState
 from constants import (
     PACMAN_SPEED, GHOST_SPEED, GHOST_VISION_RANGE, 
-    GHOST_MEMORY_TIME, PATROL_POINTS, MAZE_WIDTH, MAZE_HEIGHT,
+    GHOST_MEMORY_TIME, AUTO_DANGER_STEPS, PATROL_POINTS, MAZE_WIDTH, MAZE_HEIGHT,
+    PERSONALITY_CODES, PERSONALITY_RANDOM,
     Difficulty
 )
 
 
-class Pacman:    
-    def __init__(self, x, y):
-        self.x = float(x)
-        self.y = float(y)
+class PacmanBehavior:
+    """Логіка пакмена; стан (x, y, direction, ...) зберігає підклас"""
+    __slots__ = ()
+    
+    def init_state(self):
         self.direction = (0, 0)
         self.next_direction = (0, 0)
         self.speed = PACMAN_SPEED
@@ -41,90 +45,92 @@ class Pacman:
         if not self.auto_mode:
             return
         
-        # Знаходження найближчого привида
-        nearest_ghost_dist = float('inf')
-        for ghost in ghosts:
-            dist = math.sqrt((self.x - ghost.x)**2 + (self.y - ghost.y)**2)
-            if dist < nearest_ghost_dist:
-                nearest_ghost_dist = dist
+        # Стан гри як бітові дошки; небезпека - куди привиди дійдуть за кілька кроків
+        board = BoardState.from_game(maze, self, ghosts)
+        danger = board.danger_zone(AUTO_DANGER_STEPS)
         
         # привид близько -> run
-        if nearest_ghost_dist < 4:
-            best_dir = self.find_escape_direction(maze, ghosts)
+        if board.pacman & danger:
+            best_dir = self.find_escape_direction(maze, board)
         else:
-            best_dir = self.find_dot_direction(maze)
+            best_dir = self.find_dot_direction(maze, board, danger)
         
         if best_dir:
             self.next_direction = best_dir
     
-    def find_escape_direction(self, maze, ghosts):
-        """напрямок втечі від привидів"""
+    def find_escape_direction(self, maze, board):
+        """
+        Напрямок втечі від привидів (прогноз на хід уперед для кожного напрямку)
+        
+        Кращий хід - найдальший від привидів у кроках лабіринту, далі - поза
+        їхньою видимістю, далі - той, що з'їдає точку
+        """
         directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+        cell = (int(round(self.x)), int(round(self.y)))
+        visible = board.ghost_visibility(GHOST_VISION_RANGE)
         best_dir = None
-        max_dist = -1
+        best_score = None
         
         for dx, dy in directions:
-            test_x = self.x + dx * 0.5
-            test_y = self.y + dy * 0.5
+            step = (cell[0] + dx, cell[1] + dy)
+            if maze.is_wall(*step):
+                continue
             
-            if not maze.is_wall(test_x, test_y):
-                #  мінімальнa відстань до привидів
-                min_ghost_dist = float('inf')
-                for ghost in ghosts:
-                    dist = math.sqrt((test_x - ghost.x)**2 + (test_y - ghost.y)**2)
-                    min_ghost_dist = min(min_ghost_dist, dist)
-                
-                if min_ghost_dist > max_dist:
-                    max_dist = min_ghost_dist
-                    best_dir = (dx, dy)
+            after = board.copy()
+            after.move_pacman(step)
+            dist = board.board.distance(step, board.ghosts)
+            score = (float('inf') if dist is None else dist,
+                     not after.pacman & visible,
+                     -after.dots_remaining())
+            
+            if best_score is None or score > best_score:
+                best_score = score
+                best_dir = (dx, dy)
         
         return best_dir
     
-    def find_dot_direction(self, maze):
-        """Знаходить напрямок до найближчої точки"""
-        if not maze.dots:
+    def find_dot_direction(self, maze, board, danger=0):
+        """Знаходить напрямок до найближчої точки (в обхід небезпечних клітинок)"""
+        if not board.dots:
             return None
         
-        # Знаходимо найближчу точку
-        min_dist = float('inf')
-        target = None
-        for dot in maze.dots[:15]:
-            dist = abs(self.x - dot[0]) + abs(self.y - dot[1])
-            if dist < min_dist:
-                min_dist = dist
-                target = dot
-        
-        if not target:
+        # BFS фронтами по бітових дошках - реальна найближча точка
+        cell = (int(round(self.x)), int(round(self.y)))
+        step = board.board.first_step(cell, board.dots, danger)
+        if step is None and danger:
+            step = board.board.first_step(cell, board.dots)
+        if step is None:
             return None
         
-        # Простий напрямок до цілі
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-        best_dir = None
-        min_dist = float('inf')
-        
-        for dx, dy in directions:
-            test_x = self.x + dx * 0.5
-            test_y = self.y + dy * 0.5
-            
-            if not maze.is_wall(test_x, test_y):
-                dist = abs(test_x - target[0]) + abs(test_y - target[1])
-                if dist < min_dist:
-                    min_dist = dist
-                    best_dir = (dx, dy)
-        
-        return best_dir
+        return (step[0] - cell[0], step[1] - cell[1])
 
 
-class Ghost:
+class Pacman(PacmanBehavior):
+    __slots__ = ('x', 'y', 'direction', 'next_direction', 'speed', 'auto_mode', 'target')
     
-    def __init__(self, x, y, color, personality):
+    def __init__(self, x, y):
         self.x = float(x)
         self.y = float(y)
+        self.init_state()
+
+
+def walk_links(links, cell):
+    """Клітинки ланцюжка посилань від cell (до першого None)"""
+    while cell is not None:
+        yield cell
+        cell = links.get(cell)
+
+
+class GhostBehavior:
+    """Логіка привида; позицію та шлях зберігає підклас"""
+    __slots__ = ()
+    
+    def init_state(self, color, personality):
         self.color = color
         self.personality = personality  # 'aggressive', 'strategic', 'random', 'patrol'
+        self.personality_code = PERSONALITY_CODES.get(personality, PERSONALITY_RANDOM)
         self.speed = GHOST_SPEED
         self.target = None
-        self.path = []
         self.last_seen_pacman = None
         self.memory_time = 0
         self.vision_range = GHOST_VISION_RANGE
@@ -134,6 +140,13 @@ class Ghost:
     
     def can_see_pacman(self, pacman, maze):
         """Перевірка чи привид бачить пакмена (з урахуванням стін)"""
+        layout = maze.layout
+        if layout is not None:
+            # Закешована маска видимості клітинки привида - наближення по
+            # центрах клітинок (див. MazeLayout.visibility)
+            visible = layout.visibility((int(round(self.x)), int(round(self.y))), self.vision_range)
+            return bool(visible & layout.bitboard.bit(int(round(pacman.x)), int(round(pacman.y))))
+        
         dist = math.sqrt((self.x - pacman.x)**2 + (self.y - pacman.y)**2)
         
         if dist > self.vision_range:
@@ -182,47 +195,52 @@ class Ghost:
             else:
                 return self.scatter_target
         
-        # Важкий рівень - повна поведінка з особистостями
-        if self.personality == 'aggressive':
-            # Агресивний - переслідує безпосередньо
-            if self.can_see_pacman(pacman, maze):
-                return (int(round(pacman.x)), int(round(pacman.y)))
-            elif self.last_seen_pacman and self.memory_time > 0:
-                return self.last_seen_pacman
-            else:
-                return self.scatter_target
-        
-        elif self.personality == 'strategic':
-            # Стратегічний - намагається перехопити
-            if self.can_see_pacman(pacman, maze):
-                # Прогнозує рух пакмена
-                predict_x = int(round(pacman.x + pacman.direction[0] * 2))
-                predict_y = int(round(pacman.y + pacman.direction[1] * 2))
-                if not maze.is_wall(predict_x, predict_y):
-                    return (predict_x, predict_y)
-                return (int(round(pacman.x)), int(round(pacman.y)))
-            elif self.last_seen_pacman and self.memory_time > 0:
-                return self.last_seen_pacman
-            else:
-                return self.scatter_target
-        
-        elif self.personality == 'patrol':
-            # Патрулює ключові точки
-            if self.can_see_pacman(pacman, maze):
-                return (int(round(pacman.x)), int(round(pacman.y)))
-            else:
-                target = self.patrol_points[self.patrol_index]
-                dist = abs(self.x - target[0]) + abs(self.y - target[1])
-                if dist < 1:
-                    self.patrol_index = (self.patrol_index + 1) % len(self.patrol_points)
-                return target
-        
-        else:  # random
-            # Випадковий - змішана поведінка
-            if self.can_see_pacman(pacman, maze) and random.random() > 0.4:
-                return (int(round(pacman.x)), int(round(pacman.y)))
-            else:
-                return self.scatter_target
+        # Важкий рівень - повна поведінка з особистостями (таблиця стратегій)
+        return self.TARGET_STRATEGIES[self.personality_code](self, pacman, maze)
+    
+    def target_aggressive(self, pacman, maze):
+        """Агресивний - переслідує безпосередньо"""
+        if self.can_see_pacman(pacman, maze):
+            return (int(round(pacman.x)), int(round(pacman.y)))
+        elif self.last_seen_pacman and self.memory_time > 0:
+            return self.last_seen_pacman
+        else:
+            return self.scatter_target
+    
+    def target_strategic(self, pacman, maze):
+        """Стратегічний - намагається перехопити"""
+        if self.can_see_pacman(pacman, maze):
+            # Прогнозує рух пакмена
+            predict_x = int(round(pacman.x + pacman.direction[0] * 2))
+            predict_y = int(round(pacman.y + pacman.direction[1] * 2))
+            if not maze.is_wall(predict_x, predict_y):
+                return (predict_x, predict_y)
+            return (int(round(pacman.x)), int(round(pacman.y)))
+        elif self.last_seen_pacman and self.memory_time > 0:
+            return self.last_seen_pacman
+        else:
+            return self.scatter_target
+    
+    def target_patrol(self, pacman, maze):
+        """Патрулює ключові точки"""
+        if self.can_see_pacman(pacman, maze):
+            return (int(round(pacman.x)), int(round(pacman.y)))
+        else:
+            target = self.patrol_points[self.patrol_index]
+            dist = abs(self.x - target[0]) + abs(self.y - target[1])
+            if dist < 1:
+                self.patrol_index = (self.patrol_index + 1) % len(self.patrol_points)
+            return target
+    
+    def target_random(self, pacman, maze):
+        """Випадковий - змішана поведінка"""
+        if self.can_see_pacman(pacman, maze) and random.random() > 0.4:
+            return (int(round(pacman.x)), int(round(pacman.y)))
+        else:
+            return self.scatter_target
+    
+    # Індекс - код особистості (PERSONALITY_AGGRESSIVE, ...)
+    TARGET_STRATEGIES = (target_aggressive, target_strategic, target_patrol, target_random)
     
     def avoid_collision(self, target, other_ghosts):
         """Уникнення зіткнень з іншими привидами"""
@@ -246,43 +264,61 @@ class Ghost:
         
         return target
     
+    def find_path_table(self, target, layout):
+        """Шлях за таблицею відстаней макета (таблиця рахується один раз на ціль)"""
+        start = (int(round(self.x)), int(round(self.y)))
+        found = layout.path_to(start, target) if target and start != target else None
+        if found is None:
+            self.set_path((), 0)
+            return False
+        
+        self.set_path(*found)
+        return True
+    
     def find_path_bfs(self, target, maze):
-        """Алгоритм BFS для пошуку шляху"""
+        """Алгоритм BFS для пошуку шляху (шлях записується через set_path)"""
         if not target:
-            return []
+            self.set_path((), 0)
+            return False
         
         start = (int(round(self.x)), int(round(self.y)))
         if start == target:
-            return []
+            self.set_path((), 0)
+            return False
         
-        queue = deque([(start, [start])])
-        visited = {start}
+        # Вказівники на батьків замість копії шляху в кожному вузлі черги
+        queue = deque([(start, 0)])
+        parents = {start: None}
         
         max_iterations = 200
         iterations = 0
         
         while queue and iterations < max_iterations:
             iterations += 1
-            (x, y), path = queue.popleft()
+            (x, y), depth = queue.popleft()
             
             if (x, y) == target:
-                return path
+                self.set_path(walk_links(parents, target), depth + 1, reverse=True)
+                return True
             
-            for nx, ny in maze.get_neighbors(x, y):
-                if (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    queue.append(((nx, ny), path + [(nx, ny)]))
+            for neighbor in maze.get_neighbors(x, y):
+                if neighbor not in parents:
+                    parents[neighbor] = (x, y)
+                    queue.append((neighbor, depth + 1))
         
-        return []
+        self.set_path((), 0)
+        return False
     
     def find_path_astar(self, target, maze):
-        """Алгоритм A* для пошуку шляху"""
+        """Алгоритм A* для пошуку шляху (шлях записується через set_path)"""
         if not target:
-            return []
+            self.set_path((), 0)
+            return False
         
         start = (int(round(self.x)), int(round(self.y)))
         if start == target:
-            return []
+            self.set_path((), 0)
+            return False
         
         def heuristic(a, b):
             return abs(a[0] - b[0]) + abs(a[1] - b[1])
@@ -300,13 +336,9 @@ class Ghost:
             _, current = heapq.heappop(open_set)
             
             if current == target:
-                # Відновлення шлях
-                path = [current]
-                while current in came_from:
-                    current = came_from[current]
-                    path.append(current)
-                path.reverse()
-                return path
+                # Шлях відновлюється від цілі за came_from
+                self.set_path(walk_links(came_from, target), g_score[target] + 1, reverse=True)
+                return True
             
             for neighbor in maze.get_neighbors(current[0], current[1]):
                 tentative_g = g_score[current] + 1
@@ -317,7 +349,8 @@ class Ghost:
                     f_score[neighbor] = tentative_g + heuristic(neighbor, target)
                     heapq.heappush(open_set, (f_score[neighbor], neighbor))
         
-        return []
+        self.set_path((), 0)
+        return False
     
     def update(self, pacman, maze, other_ghosts, difficulty):
         """Оновлює позицію привида"""
@@ -329,15 +362,17 @@ class Ghost:
         
         self.target = target
         
-        # Пошук шляху (A* для важкого рівня, BFS для інших)
-        if difficulty == Difficulty.HARD:
-            self.path = self.find_path_astar(target, maze)
+        # Пошук шляху: таблиці відстаней макета, без них - A* для важкого рівня, BFS для інших
+        if maze.layout is not None:
+            self.find_path_table(target, maze.layout)
+        elif difficulty == Difficulty.HARD:
+            self.find_path_astar(target, maze)
         else:
-            self.path = self.find_path_bfs(target, maze)
+            self.find_path_bfs(target, maze)
         
         # Рух по шляху
-        if len(self.path) > 1:
-            next_pos = self.path[1]
+        next_pos = self.next_waypoint()
+        if next_pos is not None:
             dx = next_pos[0] - self.x
             dy = next_pos[1] - self.y
             
@@ -347,4 +382,33 @@ class Ghost:
                 dy = (dy / dist) * self.speed
                 
                 self.x += dx
-                self.y += dy
\ No newline at end of file
+                self.y += dy
+    
+    def set_path(self, cells, length, reverse=False):
+        """Запам'ятовує шлях з length клітинок; reverse - cells ідуть від кінця"""
+        path = list(islice(cells, length))
+        if reverse:
+            path.reverse()
+        self.path = path
+    
+    def iter_path(self):
+        """Клітинки поточного шляху по черзі"""
+        return iter(self.path)
+    
+    def next_waypoint(self):
+        """Наступна клітинка шляху (або None)"""
+        if len(self.path) > 1:
+            return self.path[1]
+        return None
+
+
+class Ghost(GhostBehavior):
+    __slots__ = ('x', 'y', 'path', 'color', 'personality', 'personality_code', 'speed',
+                 'target', 'last_seen_pacman', 'memory_time', 'vision_range',
+                 'scatter_target', 'patrol_points', 'patrol_index')
+    
+    def __init__(self, x, y, color, personality):
+        self.x = float(x)
+        self.y = float(y)
+        self.path = []
+        self.init_state(color, personality)
\ No newline at end of file
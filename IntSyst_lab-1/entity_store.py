@@ -0,0 +1,134 @@
+from array import array
+from itertools import islice
+from entities import PacmanBehavior, GhostBehavior
+from constants import MAZE_WIDTH, PATH_RING_SIZE
+
+
+class EntityStore:
+    """
+    Компактне сховище сутностей (struct-of-arrays)
+    Позиції - колонки array('d'), шляхи - кільцеві буфери id клітинок
+    """
+    __slots__ = ('width', 'path_capacity', 'xs', 'ys',
+                 'path_cells', 'path_start', 'path_len')
+
+    def __init__(self, width=MAZE_WIDTH, path_capacity=PATH_RING_SIZE):
+        self.width = width
+        self.path_capacity = path_capacity
+        self.xs = array('d')
+        self.ys = array('d')
+        self.path_cells = array('i')
+        self.path_start = array('i')
+        self.path_len = array('i')
+
+    def __len__(self):
+        return len(self.xs)
+
+    def allocate(self, x, y):
+        """Додає рядок у всі колонки, повертає індекс сутності"""
+        index = len(self.xs)
+        self.xs.append(float(x))
+        self.ys.append(float(y))
+        self.path_cells.extend(array('i', bytes(4 * self.path_capacity)))
+        self.path_start.append(0)
+        self.path_len.append(0)
+        return index
+
+    def write_path(self, index, cells, length, reverse=False):
+        """
+        Записує шлях з length клітинок прямо в кільцевий буфер як id клітинок
+        reverse - cells ідуть від кінця шляху (відновлення за батьками);
+        довгі шляхи обрізаються до ємності, початок шляху зберігається
+        """
+        capacity = self.path_capacity
+        base = index * capacity
+        # Продовжуємо писати з кінця попереднього шляху - буфер не зсувається
+        start = (self.path_start[index] + self.path_len[index]) % capacity
+        self.path_start[index] = start
+        count = min(length, capacity)
+        self.path_len[index] = count
+        ring = self.path_cells
+        width = self.width
+        for i, (x, y) in enumerate(islice(cells, length)):
+            pos = length - 1 - i if reverse else i
+            if pos >= count:
+                if reverse:
+                    continue
+                break
+            ring[base + (start + pos) % capacity] = y * width + x
+
+    def path_cell(self, index, i):
+        """i-та клітинка шляху як (x, y) або None"""
+        if i >= self.path_len[index]:
+            return None
+        capacity = self.path_capacity
+        cell = self.path_cells[index * capacity + (self.path_start[index] + i) % capacity]
+        return (cell % self.width, cell // self.width)
+
+    def iter_path(self, index):
+        for i in range(self.path_len[index]):
+            yield self.path_cell(index, i)
+
+
+class CompactPacman(PacmanBehavior):
+    """Пакмен з позицією у колонках EntityStore"""
+    __slots__ = ('store', 'index', 'direction', 'next_direction', 'speed', 'auto_mode', 'target')
+
+    def __init__(self, store, x, y):
+        self.store = store
+        self.index = store.allocate(x, y)
+        self.init_state()
+
+    @property
+    def x(self):
+        return self.store.xs[self.index]
+
+    @x.setter
+    def x(self, value):
+        self.store.xs[self.index] = value
+
+    @property
+    def y(self):
+        return self.store.ys[self.index]
+
+    @y.setter
+    def y(self, value):
+        self.store.ys[self.index] = value
+
+
+class CompactGhost(GhostBehavior):
+    """Привид з позицією та шляхом у EntityStore"""
+    __slots__ = ('store', 'index', 'color', 'personality', 'personality_code', 'speed',
+                 'target', 'last_seen_pacman', 'memory_time', 'vision_range',
+                 'scatter_target', 'patrol_points', 'patrol_index')
+
+    def __init__(self, store, x, y, color, personality):
+        self.store = store
+        self.index = store.allocate(x, y)
+        self.init_state(color, personality)
+
+    @property
+    def x(self):
+        return self.store.xs[self.index]
+
+    @x.setter
+    def x(self, value):
+        self.store.xs[self.index] = value
+
+    @property
+    def y(self):
+        return self.store.ys[self.index]
+
+    @y.setter
+    def y(self, value):
+        self.store.ys[self.index] = value
+
+    def set_path(self, cells, length, reverse=False):
+        self.store.write_path(self.index, cells, length, reverse)
+
+    def iter_path(self):
+        return self.store.iter_path(self.index)
+
+    def next_waypoint(self):
+        """Читає кільцевий буфер напряму, без побудови списку"""
+        return self.store.path_cell(self.index, 1)
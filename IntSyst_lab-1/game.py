@@ -1,12 +1,12 @@
 import pygame
 import math
-from maze import Maze
-from entities import Pacman, Ghost
+import threading
+import time
+from simulation import Simulation
 from constants import (
     WIDTH, HEIGHT, CELL_SIZE, MAZE_WIDTH, MAZE_HEIGHT,
     BLACK, WHITE, BLUE, CYAN, YELLOW, RED, GREEN,
-    GHOST_CONFIGS, GHOST_START_POSITIONS,
-    POINTS_PER_DOT, SCORE_THRESHOLD_MEDIUM, SCORE_THRESHOLD_HARD,
+    SIM_TICK_RATE, RENDER_FPS, MAX_CATCHUP_TICKS,
     Difficulty
 )
 
@@ -21,101 +21,48 @@ class Game:
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
         
-        self.difficulty = Difficulty.EASY
-        self.score = 0
-        self.level = 1
         self.debug_mode = False
         self.running = True
-        self.game_over = False
         
-        self.init_game()
+        # Симуляція працює у власному потоці з фіксованим кроком,
+        # рендер інтерполює між двома останніми знімками
+        self.sim = Simulation()
+        self.state_lock = threading.Lock()
+        self.tick_duration = 1.0 / SIM_TICK_RATE
+        self.prev_snapshot = self.curr_snapshot = self.sim.snapshot(time.perf_counter())
+        self.sim_thread = threading.Thread(target=self.simulation_loop, daemon=True)
     
-    def init_game(self):
-        self.maze = Maze()
-        
-        self.pacman = Pacman(2.5, 2.5)
-        
-        self.ghosts = []
-        
-        num_ghosts = 2 if self.difficulty == Difficulty.EASY else \
-                    3 if self.difficulty == Difficulty.MEDIUM else 4
-        
-        for i in range(num_ghosts):
-            color, personality = GHOST_CONFIGS[i]
-            pos = GHOST_START_POSITIONS[i]
-            self.ghosts.append(Ghost(pos[0], pos[1], color, personality))
-    
-    def check_collision(self):
-        """Зіткнення пакмена з привидами"""
-        for ghost in self.ghosts:
-            dist = math.sqrt((self.pacman.x - ghost.x)**2 + (self.pacman.y - ghost.y)**2)
-            if dist < 0.6:
-                return True
-        return False
+    def push_snapshot(self, timestamp):
+        """Зсуває знімки після тіку (скидає інтерполяцію при новому рівні)"""
+        snapshot = self.sim.snapshot(timestamp)
+        if snapshot[1] != self.curr_snapshot[1]:
+            self.prev_snapshot = snapshot
+        else:
+            self.prev_snapshot = self.curr_snapshot
+        self.curr_snapshot = snapshot
     
-    def collect_dots(self):
-        """Збір точок"""
-        pacman_cell = (int(round(self.pacman.x)), int(round(self.pacman.y)))
-        if pacman_cell in self.maze.dots:
-            self.maze.dots.remove(pacman_cell)
-            self.score += POINTS_PER_DOT
+    def simulation_loop(self):
+        """Фіксований крок симуляції, незалежний від швидкості рендерингу"""
+        next_tick = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+                continue
             
-            # Автоматичне підвищення складності
-            if self.score >= SCORE_THRESHOLD_MEDIUM and self.difficulty == Difficulty.EASY:
-                self.difficulty = Difficulty.MEDIUM
-                self.init_game()
-                print("Складність підвищено до СЕРЕДНЬОГО")
-            elif self.score >= SCORE_THRESHOLD_HARD and self.difficulty == Difficulty.MEDIUM:
-                self.difficulty = Difficulty.HARD
-                self.init_game()
-                print("Складність підвищено до ВАЖКОГО")
-    
-    def next_level(self):
-        self.level += 1
-        self.init_game()
+            with self.state_lock:
+                self.sim.update()
+                self.push_snapshot(next_tick)
+            next_tick += self.tick_duration
+            
+            # Якщо відстали занадто сильно - не наздоганяємо нескінченно
+            if now - next_tick > self.tick_duration * MAX_CATCHUP_TICKS:
+                next_tick = now
     
     def handle_events(self):
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            
-            elif event.type == pygame.KEYDOWN:
-                # Керування пакменом
-                if event.key == pygame.K_UP:
-                    self.pacman.next_direction = (0, -1)
-                elif event.key == pygame.K_DOWN:
-                    self.pacman.next_direction = (0, 1)
-                elif event.key == pygame.K_LEFT:
-                    self.pacman.next_direction = (-1, 0)
-                elif event.key == pygame.K_RIGHT:
-                    self.pacman.next_direction = (1, 0)
-                
-                # Перемикання складності
-                elif event.key == pygame.K_1:
-                    self.difficulty = Difficulty.EASY
-                    self.init_game()
-                    print("Складність: ЛЕГКА")
-                elif event.key == pygame.K_2:
-                    self.difficulty = Difficulty.MEDIUM
-                    self.init_game()
-                    print("Складність: СЕРЕДНЯ")
-                elif event.key == pygame.K_3:
-                    self.difficulty = Difficulty.HARD
-                    self.init_game()
-                    print("Складність: ВАЖКА")
-                
-                # Інші функції
-                elif event.key == pygame.K_r:
-                    self.game_over = False
-                    self.score = 0
-                    self.level = 1
-                    self.difficulty = Difficulty.EASY
-                    self.init_game()
-                elif event.key == pygame.K_SPACE:
-                    self.pacman.auto_mode = not self.pacman.auto_mode
-                    print(f"Авто-режим: {'ВКЛ' if self.pacman.auto_mode else 'ВИКЛ'}")
-                elif event.key == pygame.K_d:
-                    self.debug_mode = not self.debug_mode
+            with self.state_lock:
+                self.handle_event(event)
         
         # Перевірка утримання клавіші D
         keys = pygame.key.get_pressed()
@@ -124,62 +71,104 @@ class Game:
         else:
             self.debug_mode = False
     
-    def update(self):
-        """Оновлює стан гри"""
-        if self.game_over:
-            return
-        
-        if self.pacman.auto_mode:
-            self.pacman.auto_move(self.maze, self.ghosts)
-        self.pacman.update(self.maze, self.ghosts)
-        
-        for ghost in self.ghosts:
-            ghost.update(self.pacman, self.maze, self.ghosts, self.difficulty)
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
         
-        if self.check_collision():
-            self.game_over = True
-            print("GAME OVER!")
+        elif event.type == pygame.KEYDOWN:
+            # Керування пакменом
+            if event.key == pygame.K_UP:
+                self.sim.pacman.next_direction = (0, -1)
+            elif event.key == pygame.K_DOWN:
+                self.sim.pacman.next_direction = (0, 1)
+            elif event.key == pygame.K_LEFT:
+                self.sim.pacman.next_direction = (-1, 0)
+            elif event.key == pygame.K_RIGHT:
+                self.sim.pacman.next_direction = (1, 0)
+            
+            # Перемикання складності
+            elif event.key == pygame.K_1:
+                self.sim.set_difficulty(Difficulty.EASY)
+                print("Складність: ЛЕГКА")
+            elif event.key == pygame.K_2:
+                self.sim.set_difficulty(Difficulty.MEDIUM)
+                print("Складність: СЕРЕДНЯ")
+            elif event.key == pygame.K_3:
+                self.sim.set_difficulty(Difficulty.HARD)
+                print("Складність: ВАЖКА")
+            
+            # Інші функції
+            elif event.key == pygame.K_r:
+                self.sim.restart()
+            elif event.key == pygame.K_SPACE:
+                self.sim.pacman.auto_mode = not self.sim.pacman.auto_mode
+                print(f"Авто-режим: {'ВКЛ' if self.sim.pacman.auto_mode else 'ВИКЛ'}")
+            elif event.key == pygame.K_d:
+                self.debug_mode = not self.debug_mode
+    
+    def interpolated_positions(self, now):
+        """Позиції між двома останніми знімками симуляції"""
+        prev, curr = self.prev_snapshot, self.curr_snapshot
+        alpha = (now - curr[0]) / self.tick_duration
+        alpha = max(0.0, min(1.0, alpha))
         
-        self.collect_dots()
+        def lerp(a, b):
+            return (a[0] + (b[0] - a[0]) * alpha, a[1] + (b[1] - a[1]) * alpha)
         
-        if not self.maze.dots and not self.game_over:
-            print(f"Рівень {self.level} пройдено!")
-            self.next_level()
+        pacman_pos = lerp(prev[2], curr[2])
+        ghost_positions = [lerp(a, b) for a, b in zip(prev[3], curr[3])]
+        return pacman_pos, ghost_positions
     
     def draw(self):
+        # Під блокуванням лише знімаємо дані кадру - малюємо без нього
+        now = time.perf_counter()
+        with self.state_lock:
+            sim = self.sim
+            if self.curr_snapshot[1] != sim.generation:
+                self.prev_snapshot = self.curr_snapshot = sim.snapshot(now)
+            pacman_pos, ghost_positions = self.interpolated_positions(now)
+            maze = sim.maze
+            ghosts = list(sim.ghosts)
+            dots = list(maze.dots)
+            # Шляхи живуть у буферах симуляції - копіюємо лише для налагодження
+            paths = [list(ghost.iter_path()) for ghost in ghosts] if self.debug_mode else None
+            pacman_direction = sim.pacman.direction
+            auto_mode = sim.pacman.auto_mode
+            score, level, difficulty, game_over = sim.score, sim.level, sim.difficulty, sim.game_over
+        
         self.screen.fill(BLACK)
         
         #  лабіринт
-        for y in range(self.maze.height):
-            for x in range(self.maze.width):
-                if self.maze.grid[y][x] == 0:
+        for y in range(maze.height):
+            for x in range(maze.width):
+                if maze.grid[y][x] == 0:
                     pygame.draw.rect(self.screen, BLUE, 
                                    (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
                     pygame.draw.rect(self.screen, CYAN, 
                                    (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE), 1)
         
         #  точки
-        for dot in self.maze.dots:
+        for dot in dots:
             pygame.draw.circle(self.screen, WHITE, 
                              (int(dot[0] * CELL_SIZE + CELL_SIZE/2), 
                               int(dot[1] * CELL_SIZE + CELL_SIZE/2)), 4)
         
         # Режим налагодження
         if self.debug_mode:
-            for ghost in self.ghosts:
+            for ghost, (gx, gy), path in zip(ghosts, ghost_positions, paths):
                 # Зона видимості
                 pygame.draw.circle(self.screen, ghost.color,
-                                 (int(ghost.x * CELL_SIZE + CELL_SIZE/2),
-                                  int(ghost.y * CELL_SIZE + CELL_SIZE/2)),
+                                 (int(gx * CELL_SIZE + CELL_SIZE/2),
+                                  int(gy * CELL_SIZE + CELL_SIZE/2)),
                                  int(ghost.vision_range * CELL_SIZE), 1)
                 
                 # Шлях
-                if ghost.path:
-                    for i in range(len(ghost.path) - 1):
-                        start = (ghost.path[i][0] * CELL_SIZE + CELL_SIZE//2,
-                               ghost.path[i][1] * CELL_SIZE + CELL_SIZE//2)
-                        end = (ghost.path[i+1][0] * CELL_SIZE + CELL_SIZE//2,
-                             ghost.path[i+1][1] * CELL_SIZE + CELL_SIZE//2)
+                if path:
+                    for i in range(len(path) - 1):
+                        start = (path[i][0] * CELL_SIZE + CELL_SIZE//2,
+                               path[i][1] * CELL_SIZE + CELL_SIZE//2)
+                        end = (path[i+1][0] * CELL_SIZE + CELL_SIZE//2,
+                             path[i+1][1] * CELL_SIZE + CELL_SIZE//2)
                         pygame.draw.line(self.screen, ghost.color, start, end, 2)
                 
                 # Ціль
@@ -190,34 +179,34 @@ class Game:
                                     CELL_SIZE - 10, CELL_SIZE - 10), 2)
         
         # привиди
-        for ghost in self.ghosts:
+        for ghost, (gx, gy) in zip(ghosts, ghost_positions):
             pygame.draw.circle(self.screen, ghost.color,
-                             (int(ghost.x * CELL_SIZE + CELL_SIZE/2),
-                              int(ghost.y * CELL_SIZE + CELL_SIZE/2)),
+                             (int(gx * CELL_SIZE + CELL_SIZE/2),
+                              int(gy * CELL_SIZE + CELL_SIZE/2)),
                              CELL_SIZE // 2 - 4)
             # Очі
             eye_offset = CELL_SIZE // 6
             pygame.draw.circle(self.screen, WHITE,
-                             (int(ghost.x * CELL_SIZE + CELL_SIZE/2 - eye_offset),
-                              int(ghost.y * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 4)
+                             (int(gx * CELL_SIZE + CELL_SIZE/2 - eye_offset),
+                              int(gy * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 4)
             pygame.draw.circle(self.screen, WHITE,
-                             (int(ghost.x * CELL_SIZE + CELL_SIZE/2 + eye_offset),
-                              int(ghost.y * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 4)
+                             (int(gx * CELL_SIZE + CELL_SIZE/2 + eye_offset),
+                              int(gy * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 4)
             pygame.draw.circle(self.screen, BLACK,
-                             (int(ghost.x * CELL_SIZE + CELL_SIZE/2 - eye_offset),
-                              int(ghost.y * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 2)
+                             (int(gx * CELL_SIZE + CELL_SIZE/2 - eye_offset),
+                              int(gy * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 2)
             pygame.draw.circle(self.screen, BLACK,
-                             (int(ghost.x * CELL_SIZE + CELL_SIZE/2 + eye_offset),
-                              int(ghost.y * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 2)
+                             (int(gx * CELL_SIZE + CELL_SIZE/2 + eye_offset),
+                              int(gy * CELL_SIZE + CELL_SIZE/2 - eye_offset)), 2)
         
         #  пакмена
-        center = (int(self.pacman.x * CELL_SIZE + CELL_SIZE/2),
-                 int(self.pacman.y * CELL_SIZE + CELL_SIZE/2))
+        center = (int(pacman_pos[0] * CELL_SIZE + CELL_SIZE/2),
+                 int(pacman_pos[1] * CELL_SIZE + CELL_SIZE/2))
         pygame.draw.circle(self.screen, YELLOW, center, CELL_SIZE // 2 - 4)
         
-        if self.pacman.direction != (0, 0):
+        if pacman_direction != (0, 0):
             mouth_angle = 30
-            start_angle = math.atan2(-self.pacman.direction[1], self.pacman.direction[0])
+            start_angle = math.atan2(-pacman_direction[1], pacman_direction[0])
             start_angle = math.degrees(start_angle)
             pygame.draw.polygon(self.screen, BLACK, [
                 center,
@@ -230,25 +219,25 @@ class Game:
         # Інтерфейс
         y_offset = MAZE_HEIGHT * CELL_SIZE + 10
         
-        score_text = self.small_font.render(f"Рахунок: {self.score}", True, WHITE)
+        score_text = self.small_font.render(f"Рахунок: {score}", True, WHITE)
         self.screen.blit(score_text, (10, y_offset))
         
-        level_text = self.small_font.render(f"Рівень: {self.level}", True, WHITE)
+        level_text = self.small_font.render(f"Рівень: {level}", True, WHITE)
         self.screen.blit(level_text, (150, y_offset))
         
         diff_names = {Difficulty.EASY: "ЛЕГКА", Difficulty.MEDIUM: "СЕРЕДНЯ", Difficulty.HARD: "ВАЖКА"}
-        diff_text = self.small_font.render(f"Складність: {diff_names[self.difficulty]}", True, WHITE)
+        diff_text = self.small_font.render(f"Складність: {diff_names[difficulty]}", True, WHITE)
         self.screen.blit(diff_text, (280, y_offset))
         
-        mode_text = self.small_font.render(f"Режим: {'АВТО' if self.pacman.auto_mode else 'РУЧНИЙ'}", 
-                                          True, GREEN if self.pacman.auto_mode else WHITE)
+        mode_text = self.small_font.render(f"Режим: {'АВТО' if auto_mode else 'РУЧНИЙ'}", 
+                                          True, GREEN if auto_mode else WHITE)
         self.screen.blit(mode_text, (10, y_offset + 30))
         
         help_text = self.small_font.render("Стрілки-рух | 1/2/3-складність | SPACE-авто | D-debug | R-рестарт", 
                                           True, WHITE)
         self.screen.blit(help_text, (10, y_offset + 55))
         
-        if self.game_over:
+        if game_over:
             game_over_text = self.font.render("GAME OVER! Натисніть R", True, RED)
             text_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 50))
             pygame.draw.rect(self.screen, BLACK, (text_rect.x - 10, text_rect.y - 10, 
@@ -260,13 +249,16 @@ class Game:
         pygame.display.flip()
     
     def run(self):
-        """Головний ігровий цикл"""
+        """Головний цикл рендерингу (симуляція - в окремому потоці)"""
+        self.sim_thread.start()
         while self.running:
             self.handle_events()
-            self.update()
             self.draw()
-            self.clock.tick(60)
+            # Повільний кадр лише пропускає рендер - симуляція не сповільнюється
+            self.clock.tick(RENDER_FPS)
         
+        self.sim_thread.join()
+        self.sim.levels.shutdown()
         pygame.quit()
 
 
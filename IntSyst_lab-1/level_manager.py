@@ -0,0 +1,223 @@
+import math
+import random
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from maze import Maze
+from constants import (
+    MAZE_WIDTH, MAZE_HEIGHT, GHOST_CONFIGS, GHOST_VISION_RANGE,
+    PATROL_POINTS, LEVEL_CACHE_SIZE
+)
+
+
+class MazeLayout:
+    """
+    Лабіринт та похідні структури (лише для читання, спільні між рівнями)
+    Ключ - (ширина, висота): генерація лабіринту не залежить від зерна,
+    тому таблиці відстаней і видимості переносяться з рівня на рівень
+    """
+
+    def __init__(self, width, height):
+        self.key = (width, height)
+        self.width = width
+        self.height = height
+
+        maze = Maze(width, height)
+        self.grid = maze.grid
+        self.bitboard = maze.bitboard
+        self.dots_mask = maze.dots_mask
+
+        # Сусіди для кожної клітинки (у т.ч. стартових позицій у стінах)
+        self.adjacency = {(x, y): tuple(maze.get_neighbors(x, y))
+                          for y in range(height) for x in range(width)}
+
+        self._distances = {}
+        self._visibility = {}
+        self._lock = threading.Lock()
+
+    def distances_from(self, cell):
+        """Таблиця відстаней BFS від клітинки (обчислюється один раз)"""
+        table = self._distances.get(cell)
+        if table is not None:
+            return table
+
+        table = {cell: 0}
+        queue = deque([cell])
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.adjacency.get(current, ()):
+                if neighbor not in table:
+                    table[neighbor] = table[current] + 1
+                    queue.append(neighbor)
+
+        with self._lock:
+            self._distances.setdefault(cell, table)
+        return table
+
+    def path_to(self, start, target):
+        """
+        Найкоротший шлях спуском по таблиці відстаней від цілі
+
+        Returns:
+            (генератор клітинок від start до target, довжина) або None,
+            якщо ціль у стіні чи недосяжна
+        """
+        if not self.bitboard.bit(*target) & self.bitboard.open:
+            return None
+        table = self.distances_from(target)
+        if start in table:
+            return self._descend(start, table), table[start] + 1
+
+        # Старт у стіні (позиції появи привидів) - спершу крок до сусіда
+        reachable = [table[cell] for cell in self.adjacency.get(start, ()) if cell in table]
+        if not reachable:
+            return None
+        return self._descend(start, table), min(reachable) + 2
+
+    def _descend(self, cell, table):
+        adjacency = self.adjacency
+        unreachable = len(table)
+        yield cell
+        while table.get(cell) != 0:
+            cell = min(adjacency[cell], key=lambda neighbor: table.get(neighbor, unreachable))
+            yield cell
+
+    def visibility(self, cell, vision_range=GHOST_VISION_RANGE):
+        """
+        Маска клітинок, видимих з клітинки: raycast між центрами клітинок
+        Наближення GhostBehavior.can_see_pacman - обидві позиції зводяться до
+        центрів клітинок, тому поза центрами дальність і перекриття стінами
+        можуть відрізнятися від точної перевірки
+        """
+        key = (cell, vision_range)
+        mask = self._visibility.get(key)
+        if mask is None:
+            mask = self._raycast(cell, vision_range)
+            with self._lock:
+                self._visibility.setdefault(key, mask)
+        return mask
+
+    def _raycast(self, cell, vision_range):
+        grid = self.grid
+        width, height = self.width, self.height
+        cx, cy = cell
+        reach = int(vision_range)
+        mask = 0
+        for y in range(max(0, cy - reach), min(height, cy + reach + 1)):
+            for x in range(max(0, cx - reach), min(width, cx + reach + 1)):
+                dist = math.sqrt((x - cx)**2 + (y - cy)**2)
+                if dist > vision_range:
+                    continue
+                steps = int(dist * 3)
+                for i in range(1, steps):
+                    t = i / steps
+                    check_x = int(round(cx + (x - cx) * t))
+                    check_y = int(round(cy + (y - cy) * t))
+                    if grid[check_y][check_x] == 0:
+                        break
+                else:
+                    mask |= self.bitboard.bit(x, y)
+        return mask
+
+
+
+class LevelData:
+    """
+    Рівень: спільний макет лабіринту та власні цілі розсіювання привидів
+    Ключ - (ширина, висота, зерно)
+    """
+
+    def __init__(self, layout, seed):
+        self.key = layout.key + (seed,)
+        self.layout = layout
+        width, height = layout.width, layout.height
+        rng = random.Random(seed)
+        self.scatter_targets = [(rng.randint(2, width - 3), rng.randint(2, height - 3))
+                                for _ in GHOST_CONFIGS]
+
+    def prewarm(self):
+        """Обчислює таблиці, потрібні одразу після старту рівня"""
+        for point in PATROL_POINTS:
+            self.layout.distances_from(point)
+        for target in self.scatter_targets:
+            self.layout.distances_from(target)
+
+    def new_maze(self):
+        return Maze.from_layout(self.layout)
+
+
+class LevelManager:
+    """
+    LRU-кеш рівнів з фоновою підготовкою наступного рівня
+    Рівні одного розміру ділять MazeLayout (не витісняється разом з рівнем)
+    """
+
+    def __init__(self, capacity=LEVEL_CACHE_SIZE, width=MAZE_WIDTH, height=MAZE_HEIGHT):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._layouts = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prewarm")
+
+    def key(self, seed):
+        return (self.width, self.height, seed)
+
+    def get(self, seed):
+        """Дані рівня з кешу (чекає на фонову підготовку, якщо вона вже йде)"""
+        key = self.key(seed)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+            future = self._pending.get(key)
+
+        if future is not None:
+            return future.result()
+        return self._build(key)
+
+    def prewarm(self, seed):
+        """Готує рівень у фоновому потоці, поки грається поточний"""
+        key = self.key(seed)
+        with self._lock:
+            if key in self._cache or key in self._pending:
+                return
+            self._pending[key] = self._executor.submit(self._build, key)
+
+    def new_maze(self, seed):
+        return self.get(seed).new_maze()
+
+    def layout(self, width, height):
+        """Спільний макет для розміру (будується один раз)"""
+        key = (width, height)
+        with self._lock:
+            layout = self._layouts.get(key)
+        if layout is None:
+            layout = MazeLayout(width, height)
+            with self._lock:
+                layout = self._layouts.setdefault(key, layout)
+        return layout
+
+    def _build(self, key):
+        width, height, seed = key
+        data = LevelData(self.layout(width, height), seed)
+        data.prewarm()
+        with self._lock:
+            self._cache[key] = data
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+            self._pending.pop(key, None)
+        return data
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, seed):
+        return self.key(seed) in self._cache
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,15 +1,35 @@
 import random
+from bitboard import BitboardMaze
 from constants import MAZE_WIDTH, MAZE_HEIGHT
 
 
 class Maze:    
-    def __init__(self):
-        self.width = MAZE_WIDTH
-        self.height = MAZE_HEIGHT
+    def __init__(self, width=MAZE_WIDTH, height=MAZE_HEIGHT):
+        self.width = width
+        self.height = height
         self.grid = []
-        self.dots = []
+        self._dot_cells = None
+        self._bitboard = None
+        self._dots_mask = None
+        self.adjacency = None
+        # Спільний макет з таблицями відстаней/видимості (лише для from_layout)
+        self.layout = None
         self.generate()
     
+    @classmethod
+    def from_layout(cls, layout):
+        """Лабіринт на основі закешованого макета (без повторної генерації)"""
+        maze = cls.__new__(cls)
+        maze.width = layout.width
+        maze.height = layout.height
+        maze.grid = layout.grid  # спільна, після генерації не змінюється
+        maze._dot_cells = None
+        maze._bitboard = layout.bitboard
+        maze._dots_mask = layout.dots_mask
+        maze.adjacency = layout.adjacency
+        maze.layout = layout
+        return maze
+    
     def generate(self):
         self.grid = [[1 for _ in range(self.width)] for _ in range(self.height)]
         
@@ -40,12 +60,46 @@ class Maze:
                 if 0 < center_x + dx < self.width and 0 < center_y + dy < self.height:
                     self.grid[center_y + dy][center_x + dx] = 0
         
-        # точки для збору
-        self.dots = []
+        # точки для збору (маска будується разом з бітовою дошкою)
+        self._dot_cells = []
         for i in range(1, self.height-1):
             for j in range(1, self.width-1):
                 if self.grid[i][j] == 1:
-                    self.dots.append((j, i))
+                    self._dot_cells.append((j, i))
+        
+        self._bitboard = None
+        self._dots_mask = None
+        self.adjacency = None
+    
+    @property
+    def bitboard(self):
+        """Стіни як бітова дошка (будується при першому зверненні)"""
+        if self._bitboard is None:
+            self._bitboard = BitboardMaze(self)
+        return self._bitboard
+    
+    @property
+    def dots_mask(self):
+        """Точки, що лишилися, як бітова маска"""
+        if self._dots_mask is None:
+            self._dots_mask = self.bitboard.mask_of(self._dot_cells)
+            self._dot_cells = None
+        return self._dots_mask
+    
+    @property
+    def dots(self):
+        """Клітинки точок, що лишилися (з маски; для малювання)"""
+        return list(self.bitboard.cells(self.dots_mask))
+    
+    def dots_remaining(self):
+        return self.dots_mask.bit_count()
+    
+    def has_dot(self, cell):
+        return bool(self.dots_mask & self.bitboard.bit(*cell))
+    
+    def remove_dot(self, cell):
+        """Знімає біт точки - O(1) замість пошуку в списку"""
+        self._dots_mask = self.dots_mask & ~self.bitboard.bit(*cell)
     
     def is_wall(self, x, y):
         grid_x = int(round(x))
@@ -56,6 +110,11 @@ class Maze:
         return self.grid[grid_y][grid_x] == 0
     
     def get_neighbors(self, x, y):
+        if self.adjacency is not None:
+            cached = self.adjacency.get((x, y))
+            if cached is not None:
+                return cached
+        
         neighbors = []
         directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
         for dx, dy in directions:
@@ -0,0 +1,122 @@
+import math
+from level_manager import LevelManager
+from entities import Pacman, Ghost
+from entity_store import EntityStore, CompactPacman, CompactGhost
+from constants import (
+    USE_COMPACT_ENTITIES, GHOST_CONFIGS, GHOST_START_POSITIONS,
+    POINTS_PER_DOT, SCORE_THRESHOLD_MEDIUM, SCORE_THRESHOLD_HARD,
+    Difficulty
+)
+
+
+class Simulation:
+    """Стан гри та логіка одного тіку (без рендерингу)"""
+
+    def __init__(self, levels=None):
+        self.difficulty = Difficulty.EASY
+        self.score = 0
+        self.level = 1
+        self.game_over = False
+        # Лічильник перезапусків рівня - рендер скидає інтерполяцію при зміні
+        self.generation = 0
+        # Лабіринти та похідні структури кешуються між рівнями
+        self.levels = levels if levels is not None else LevelManager()
+
+        self.init_game()
+
+    def init_game(self):
+        level_data = self.levels.get(self.level)
+        self.maze = level_data.new_maze()
+
+        num_ghosts = 2 if self.difficulty == Difficulty.EASY else \
+                    3 if self.difficulty == Difficulty.MEDIUM else 4
+
+        if USE_COMPACT_ENTITIES:
+            self.store = EntityStore(self.maze.width)
+            self.pacman = CompactPacman(self.store, 2.5, 2.5)
+        else:
+            self.store = None
+            self.pacman = Pacman(2.5, 2.5)
+
+        self.ghosts = []
+        for i in range(num_ghosts):
+            color, personality = GHOST_CONFIGS[i]
+            pos = GHOST_START_POSITIONS[i]
+            if self.store is not None:
+                self.ghosts.append(CompactGhost(self.store, pos[0], pos[1], color, personality))
+            else:
+                self.ghosts.append(Ghost(pos[0], pos[1], color, personality))
+            self.ghosts[-1].scatter_target = level_data.scatter_targets[i]
+
+        # Наступний рівень готується у фоні, поки грається цей
+        self.levels.prewarm(self.level + 1)
+
+        self.generation += 1
+
+    def set_difficulty(self, difficulty):
+        self.difficulty = difficulty
+        self.init_game()
+
+    def restart(self):
+        self.game_over = False
+        self.score = 0
+        self.level = 1
+        self.difficulty = Difficulty.EASY
+        self.init_game()
+
+    def check_collision(self):
+        """Зіткнення пакмена з привидами"""
+        for ghost in self.ghosts:
+            dist = math.sqrt((self.pacman.x - ghost.x)**2 + (self.pacman.y - ghost.y)**2)
+            if dist < 0.6:
+                return True
+        return False
+
+    def collect_dots(self):
+        """Збір точок"""
+        pacman_cell = (int(round(self.pacman.x)), int(round(self.pacman.y)))
+        if self.maze.has_dot(pacman_cell):
+            self.maze.remove_dot(pacman_cell)
+            self.score += POINTS_PER_DOT
+
+            # Автоматичне підвищення складності
+            if self.score >= SCORE_THRESHOLD_MEDIUM and self.difficulty == Difficulty.EASY:
+                self.difficulty = Difficulty.MEDIUM
+                self.init_game()
+                print("Складність підвищено до СЕРЕДНЬОГО")
+            elif self.score >= SCORE_THRESHOLD_HARD and self.difficulty == Difficulty.MEDIUM:
+                self.difficulty = Difficulty.HARD
+                self.init_game()
+                print("Складність підвищено до ВАЖКОГО")
+
+    def next_level(self):
+        self.level += 1
+        self.init_game()
+
+    def update(self):
+        """Один фіксований тік симуляції"""
+        if self.game_over:
+            return
+
+        if self.pacman.auto_mode:
+            self.pacman.auto_move(self.maze, self.ghosts)
+        self.pacman.update(self.maze, self.ghosts)
+
+        for ghost in self.ghosts:
+            ghost.update(self.pacman, self.maze, self.ghosts, self.difficulty)
+
+        if self.check_collision():
+            self.game_over = True
+            print("GAME OVER!")
+
+        self.collect_dots()
+
+        if not self.maze.dots_remaining() and not self.game_over:
+            print(f"Рівень {self.level} пройдено!")
+            self.next_level()
+
+    def snapshot(self, timestamp):
+        """Знімок позицій для інтерполяції: (час, покоління, пакмен, привиди)"""
+        return (timestamp, self.generation,
+                (self.pacman.x, self.pacman.y),
+                tuple((ghost.x, ghost.y) for ghost in self.ghosts))
@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Set, Dict, Optional
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import List, Set, Dict, FrozenSet, Iterator, Optional, Tuple
 from enum import Enum
+from itertools import islice
+from graph_store import GraphStore
+from name_index import NameIndex
 
 
 class RelationType(Enum):
@@ -10,18 +15,154 @@ class RelationType(Enum):
     USES = "uses"           # -- Асоціація 
 
 
+class RegistryListener:
+    """
+    Спостерігач за змінами онтології (індекси, кеші)
+    Методи за замовчуванням нічого не роблять
+    """
+    
+    def on_register(self, entity: 'Entity') -> None:
+        """Нова сутність зареєстрована"""
+    
+    def on_unregister(self, entity: 'Entity') -> None:
+        """Сутність витіснена з реєстру (ім'я перереєстровано)"""
+    
+    def on_relation(self, source: 'Entity', relation: RelationType, target: 'Entity') -> None:
+        """Додано відношення source -relation-> target"""
+    
+    def on_clear(self) -> None:
+        """Реєстр очищено"""
+    
+    def on_bulk_change(self) -> None:
+        """Завершено масове оновлення без окремих подій (індекси слід перебудувати)"""
+
+
+class _InstanceView(Mapping):
+    """Реєстр {ім'я: сутність} як представлення над GraphStore (без копії)"""
+    
+    def __init__(self, store: GraphStore):
+        self._store = store
+    
+    def __getitem__(self, name: str) -> 'Entity':
+        node_id = self._store.id_of(name)
+        if node_id is None:
+            raise KeyError(name)
+        return self._store.entity(node_id)
+    
+    def __iter__(self) -> Iterator[str]:
+        store = self._store
+        return (store.name_of(node_id) for node_id in store.ids())
+    
+    def __len__(self) -> int:
+        return len(self._store.name_ids)
+    
+    def __contains__(self, name) -> bool:
+        return name in self._store.name_ids
+
+
 class Entity(ABC):
     """
     РІВЕНЬ 1: Базовий клас для всіх сутностей
     Абстрактний клас - основа онтології
+    
+    Об'єкт - тонке представлення (сховище, id) над GraphStore: ім'я, тип
+    та відношення зберігаються у сховищі, в об'єкті лише атрибути підкласу
     """
-    _instances: Dict[str, 'Entity'] = {}  # Реєстр всіх створених об'єктів
+    __slots__ = ('_graph', '_id')
+    
+    _store = GraphStore(RelationType.HAS_A, RelationType.USES)   # Сховище всіх сутностей
+    _instances = _InstanceView(_store)          # Реєстр всіх створених об'єктів
+    _names = NameIndex()                        # Імена: без регістру, префікси, одруківки
+    _listeners: List[RegistryListener] = []
+    _backends: List[object] = []                # Підключені сховища (SQLite, знімки)
+    _parts_versions: Dict[int, int] = {}        # id -> версія складу (HAS-A нащадків)
+    _parts_cache: Dict[int, Tuple[int, Tuple['Entity', ...], FrozenSet['Entity']]] = {}
     
     def __init__(self, name: str):
-        self.name = name
-        self.has_parts: List['Entity'] = []      # HAS-A відношення
-        self.uses_entities: List['Entity'] = []   # USES відношення
-        Entity._instances[name] = self
+        Entity._register(self, name)
+    
+    @staticmethod
+    def _register(entity: 'Entity', name: str) -> None:
+        """Додає сутність до сховища та індексу типів"""
+        store = Entity._store
+        previous_id = store.id_of(name)
+        entity._graph = store
+        entity._id = store.add_node(name, entity, Entity)
+        Entity._names.add(name)
+        
+        if previous_id is not None:
+            for listener in Entity._listeners:
+                listener.on_unregister(store.entity(previous_id))
+        for listener in Entity._listeners:
+            listener.on_register(entity)
+    
+    @classmethod
+    def add_listener(cls, listener: RegistryListener) -> None:
+        """Підписує спостерігача на реєстрації та нові відношення"""
+        if listener not in Entity._listeners:
+            Entity._listeners.append(listener)
+    
+    @classmethod
+    def remove_listener(cls, listener: RegistryListener) -> None:
+        if listener in Entity._listeners:
+            Entity._listeners.remove(listener)
+    
+    @classmethod
+    @contextmanager
+    def bulk_update(cls) -> Iterator[GraphStore]:
+        """
+        Масове оновлення онтології без подій для кожної зміни
+        
+        Спостерігачі від'єднуються на час оновлення; після нього сховище
+        ущільнюється, а спостерігачі отримують один on_bulk_change.
+        """
+        listeners = Entity._listeners[:]
+        Entity._listeners.clear()
+        try:
+            yield Entity._store
+        finally:
+            Entity._listeners[:0] = listeners
+            Entity._store.compact()
+            Entity._parts_cache.clear()
+            for listener in listeners:
+                listener.on_bulk_change()
+    
+    def _notify_relation(self, relation: RelationType, target: 'Entity') -> None:
+        for listener in Entity._listeners:
+            listener.on_relation(self, relation, target)
+    
+    @property
+    def name(self) -> str:
+        return self._graph.name_of(self._id)
+    
+    @property
+    def node_id(self) -> int:
+        """Щільний id у сховищі (курсор для iter_entities)"""
+        return self._id
+    
+    @property
+    def has_parts(self) -> List['Entity']:
+        """HAS-A відношення"""
+        graph = self._graph
+        return [graph.entity(i) for i in graph.successors(RelationType.HAS_A, self._id)]
+    
+    @property
+    def uses_entities(self) -> List['Entity']:
+        """USES відношення"""
+        graph = self._graph
+        return [graph.entity(i) for i in graph.successors(RelationType.USES, self._id)]
+    
+    @property
+    def part_of(self) -> List['Entity']:
+        """Зворотне HAS-A: сутності, частиною яких є ця"""
+        graph = self._graph
+        return [graph.entity(i) for i in graph.predecessors(RelationType.HAS_A, self._id)]
+    
+    @property
+    def used_by(self) -> List['Entity']:
+        """Зворотне USES: сутності, що використовують цю"""
+        graph = self._graph
+        return [graph.entity(i) for i in graph.predecessors(RelationType.USES, self._id)]
     
     @abstractmethod
     def describe(self) -> str:
@@ -30,84 +171,220 @@ class Entity(ABC):
     
     def add_part(self, part: 'Entity') -> None:
         """ (HAS-A відношення)"""
-        if part not in self.has_parts:
-            self.has_parts.append(part)
+        self._check_same_graph(part)
+        if self._graph.add_edge(RelationType.HAS_A, self._id, part._id):
+            self._bump_parts_version()
+            self._notify_relation(RelationType.HAS_A, part)
     
     def add_usage(self, entity: 'Entity') -> None:
         """(USES відношення)"""
-        if entity not in self.uses_entities:
-            self.uses_entities.append(entity)
+        self._check_same_graph(entity)
+        if self._graph.add_edge(RelationType.USES, self._id, entity._id):
+            self._notify_relation(RelationType.USES, entity)
     
-    def get_all_parts(self) -> List['Entity']:
-        """ всі частини"""
-        all_parts = []
-        for part in self.has_parts:
-            all_parts.append(part)
-            all_parts.extend(part.get_all_parts())
-        return all_parts
+    def _check_same_graph(self, other: 'Entity') -> None:
+        """Id мають сенс лише в межах одного сховища (пам'ять, SQLite, знімок)"""
+        if other._graph is not self._graph:
+            raise ValueError(f"'{self.name}' та '{other.name}' належать різним сховищам - "
+                             f"відношення між ними неможливе")
     
-    def is_related_to(self, target: 'Entity', max_depth: int = 5) -> tuple[bool, List[str]]:
-        return self._find_path(target, set(), [], max_depth)
+    def _bump_parts_version(self) -> None:
+        """Новий склад сутності - застаріває кеш частин її та всіх її контейнерів"""
+        if self._graph is not Entity._store:
+            return
+        versions = Entity._parts_versions
+        versions[self._id] = versions.get(self._id, 0) + 1
+        for container in self.get_all_containers():
+            versions[container._id] = versions.get(container._id, 0) + 1
     
-    def _find_path(self, target: 'Entity', visited: Set[str], 
-                   path: List[str], max_depth: int) -> tuple[bool, List[str]]:
-        """Рекурсивний пошук шляху між сутностями"""
-        if max_depth == 0:
-            return False, []
+    def iter_all_parts(self) -> Iterator['Entity']:
+        """
+        Ліниво видає всі частини (транзитивне HAS-A) в порядку обходу в глибину
         
-        if self.name in visited:
-            return False, []
-        
-        visited.add(self.name)
-        current_path = path + [self.name]
-        
-        # Знайшли цільову сутність!
-        if self == target:
-            return True, current_path
-        
-        # Перевіряємо HAS-A відношення
-        for part in self.has_parts:
-            found, result_path = part._find_path(target, visited.copy(), 
-                                                 current_path + ["HAS-A"], max_depth - 1)
-            if found:
-                return True, result_path
-        
-        # Перевіряємо USES відношення
-        for used in self.uses_entities:
-            found, result_path = used._find_path(target, visited.copy(), 
-                                                  current_path + ["USES"], max_depth - 1)
-            if found:
-                return True, result_path
-        
-        # Перевіряємо IS-A (батьківський клас)
-        parent_classes = self.__class__.__mro__[1:-1]  # Всі батьківські класи крім object
-        for parent_class in parent_classes:
-            if parent_class == Entity or parent_class == ABC:
+        Ітеративно і без повторів: спільні частини видаються один раз,
+        цикли HAS-A не зациклюють обхід.
+        """
+        graph = self._graph
+        seen = {self._id}
+        stack = [iter(graph.successors(RelationType.HAS_A, self._id))]
+        while stack:
+            part_id = next(stack[-1], None)
+            if part_id is None:
+                stack.pop()
                 continue
-            # Шукаємо інстанси батьківського класу
-            for instance in Entity._instances.values():
-                if isinstance(instance, parent_class) and instance != self:
-                    found, result_path = instance._find_path(target, visited.copy(),
-                                                            current_path + ["IS-A"], max_depth - 1)
-                    if found:
-                        return True, result_path
+            if part_id in seen:
+                continue
+            seen.add(part_id)
+            yield graph.entity(part_id)
+            stack.append(iter(graph.successors(RelationType.HAS_A, part_id)))
+    
+    def _cached_parts(self) -> Tuple[Tuple['Entity', ...], FrozenSet['Entity']]:
+        """(частини в порядку обходу, множина частин) з кешу або обчислені"""
+        if self._graph is not Entity._store:
+            parts = tuple(self.iter_all_parts())
+            return parts, frozenset(parts)
+        version = Entity._parts_versions.get(self._id, 0)
+        cached = Entity._parts_cache.get(self._id)
+        if cached is None or cached[0] != version:
+            parts = tuple(self.iter_all_parts())
+            cached = (version, parts, frozenset(parts))
+            Entity._parts_cache[self._id] = cached
+        return cached[1], cached[2]
+    
+    @property
+    def all_parts(self) -> FrozenSet['Entity']:
+        """Всі частини (транзитивне HAS-A), кешовані до зміни складу"""
+        return self._cached_parts()[1]
+    
+    def get_all_parts(self) -> List['Entity']:
+        """ всі частини"""
+        return list(self._cached_parts()[0])
+    
+    def get_all_containers(self) -> List['Entity']:
+        """
+        Всі сутності, що містять цю напряму чи транзитивно (зворотне HAS-A)
+        
+        Returns:
+            Контейнери в порядку обходу в ширину, без повторів (стійко до циклів)
+        """
+        graph = self._graph
+        seen = {self._id}
+        containers = []
+        frontier = [self._id]
+        while frontier:
+            next_frontier = []
+            for node_id in frontier:
+                for owner in graph.predecessors(RelationType.HAS_A, node_id):
+                    if owner not in seen:
+                        seen.add(owner)
+                        containers.append(graph.entity(owner))
+                        next_frontier.append(owner)
+            frontier = next_frontier
+        return containers
+    
+    def is_related_to(self, target: 'Entity', max_depth: int = 5) -> tuple[bool, List[str]]:
+        """
+        Чи пов'язана сутність з target через HAS-A / USES / IS-A
         
-        return False, []
+        Args:
+            target: Цільова сутність
+            max_depth: Максимальна кількість сутностей у шляху
+            
+        Returns:
+            (чи є зв'язок, шлях зв'язку)
+        """
+        from graph import find_path
+        return find_path(self, target, max_depth)
     
     @classmethod
     def get_instance(cls, name: str) -> Optional['Entity']:
-        """Отримує екземпляр за іменем"""
-        return cls._instances.get(name)
+        """
+        Отримує екземпляр за іменем (з пам'яті, інакше - з підключених сховищ);
+        якщо точного імені немає - без урахування регістру (з пам'яті)
+        """
+        node_id = Entity._store.id_of(name)
+        if node_id is not None:
+            return Entity._store.entity(node_id)
+        for backend in Entity._backends:
+            entity = backend.get(name)
+            if entity is not None:
+                return entity
+        resolved = Entity._names.resolve(name)
+        if resolved is not None and resolved != name:
+            return Entity._store.entity(Entity._store.id_of(resolved))
+        return None
+    
+    @classmethod
+    def attach_backend(cls, backend) -> None:
+        """
+        Підключає сховище з інтерфейсом читання GraphStore та методом get(name)
+        Сутності з нього - представлення з _graph = сховище, створюються ліниво
+        """
+        if backend not in Entity._backends:
+            Entity._backends.append(backend)
+    
+    @classmethod
+    def detach_backend(cls, backend) -> None:
+        if backend in Entity._backends:
+            Entity._backends.remove(backend)
+    
+    @classmethod
+    def get_name_index(cls) -> NameIndex:
+        """Індекс імен сутностей у пам'яті (регістр, префікси, одруківки)"""
+        return Entity._names
     
     @classmethod
     def get_all_instances(cls) -> List['Entity']:
         """Отримує всі створені екземпляри"""
-        return list(cls._instances.values())
+        store = Entity._store
+        return [store.entity(node_id) for node_id in store.ids()]
+    
+    @classmethod
+    def iter_entities(cls, entity_type: Optional[type] = None, after: Optional[int] = None,
+                      limit: Optional[int] = None, direct: bool = False) -> Iterator['Entity']:
+        """
+        Потоковий перелік сутностей у порядку створення, без копіювання реєстру
+        
+        Args:
+            entity_type: Лише екземпляри класу (з індексу типів); None - всі
+            after: Курсор - node_id останньої вже отриманої сутності
+            limit: Максимальна кількість сутностей
+            direct: Лише прямі екземпляри entity_type
+        """
+        store = Entity._store
+        return (store.entity(node_id)
+                for node_id in islice(store.iter_ids(entity_type, direct, after), limit))
+    
+    @classmethod
+    def get_instances_of(cls, entity_type: type, direct: bool = False) -> List['Entity']:
+        """
+        Отримує екземпляри класу з індексу типів
+        
+        Args:
+            entity_type: Клас сутностей
+            direct: Лише прямі екземпляри (без підкласів)
+        """
+        store = Entity._store
+        return [store.entity(node_id) for node_id in store.instances_of(entity_type, direct)]
+    
+    @classmethod
+    def count_instances_of(cls, entity_type: type, direct: bool = False) -> int:
+        """Кількість екземплярів класу за O(1)"""
+        return Entity._store.count_of(entity_type, direct)
+    
+    @classmethod
+    def count_all_instances(cls) -> int:
+        """Кількість живих сутностей за O(1)"""
+        return Entity._store.live_count
+    
+    @classmethod
+    def count_relations(cls, relation: RelationType) -> int:
+        """Кількість відношень (HAS-A / USES) від живих сутностей за O(1)"""
+        return Entity._store.live_edge_count(relation)
+    
+    @classmethod
+    def get_most_connected(cls, k: int = 3) -> List[Tuple['Entity', int]]:
+        """
+        k сутностей з найбільшою кількістю HAS-A та USES відношень
+        (при рівності - у порядку створення), з живого топу сховища
+        """
+        store = Entity._store
+        return [(store.entity(node_id), degree) for node_id, degree in store.most_connected(k)]
+    
+    @classmethod
+    def get_indexed_types(cls) -> List[type]:
+        """Класи, що мають прямі екземпляри"""
+        return Entity._store.types()
     
     @classmethod
     def clear_instances(cls) -> None:
         """Очищає всі створені екземпляри (для тестування)"""
-        cls._instances.clear()
+        Entity._store.clear()
+        Entity._names.clear()
+        Entity._parts_versions.clear()
+        Entity._parts_cache.clear()
+        for listener in Entity._listeners:
+            listener.on_clear()
     
     def __repr__(self):
         return f"{self.__class__.__name__}('{self.name}')"
@@ -119,6 +396,7 @@ class Entity(ABC):
 
 class LivingBeing(Entity):
     """РІВЕНЬ 2: Жива істота"""
+    __slots__ = ('age',)
     
     def __init__(self, name: str, age: int):
         super().__init__(name)
@@ -135,6 +413,7 @@ class LivingBeing(Entity):
 
 class Building(Entity):
     """РІВЕНЬ 2: Будівля"""
+    __slots__ = ('address', 'floors')
     
     def __init__(self, name: str, address: str, floors: int):
         super().__init__(name)
@@ -147,6 +426,7 @@ class Building(Entity):
 
 class Vehicle(Entity):
     """РІВЕНЬ 2: Транспортний засіб"""
+    __slots__ = ('max_speed',)
     
     def __init__(self, name: str, max_speed: int):
         super().__init__(name)
@@ -163,6 +443,7 @@ class Vehicle(Entity):
 
 class Part(Entity):
     """РІВЕНЬ 2: Частина/компонент"""
+    __slots__ = ('material',)
     
     def __init__(self, name: str, material: str):
         super().__init__(name)
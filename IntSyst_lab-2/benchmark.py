@@ -0,0 +1,235 @@
+"""
+Бенчмарк запитів до онтології
+Запуск: python benchmark.py --entities 100000 --queries 200 --out results.json
+
+Будує синтетичну онтологію (generator.py) і для кожного типу запиту
+вимірює пропускну здатність, перцентилі затримки, частку знайдених
+результатів та пікову пам'ять (tracemalloc, окремим проходом на частині
+запитів - трасування сповільнює виконання). Результат - JSON.
+
+Пари запитів - власник і одна з його частин: між ними точно є шлях,
+тож запити шляху вимірюють пошук, а не миттєве "шляху немає".
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from base import Entity, RelationType
+from generator import OntologyGenerator, add_arguments
+from query import OntologyQuery
+
+try:
+    import resource
+except ImportError:  # Windows: пікова пам'ять процесу недоступна
+    resource = None
+
+DEFAULT_QUERIES = 100
+DEFAULT_MAX_DEPTH = 5
+# Частка запитів, що виконуються повторно під tracemalloc
+MEMORY_SAMPLE = 0.1
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Перцентиль за найближчим рангом"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _random_entities(count: int, rng: random.Random) -> List[Entity]:
+    """Випадкові живі сутності (вибір за id, без копіювання реєстру)"""
+    store = Entity._store
+    chosen = []
+    while len(chosen) < count and store.live_count:
+        node_id = rng.randrange(len(store))
+        if store.is_alive(node_id):
+            chosen.append(store.entity(node_id))
+    return chosen
+
+
+def _connected_pairs(count: int, rng: random.Random) -> List[Tuple[Entity, Entity]]:
+    """
+    Пари (корінь дерева частин, одна з його частин) - пов'язані через HAS-A
+    Якщо частин в онтології немає (depth=0), решта пар - випадкові
+    """
+    pairs = []
+    attempts = 0
+    while len(pairs) < count and attempts < count * 100:
+        attempts += 1
+        for source in _random_entities(1, rng):
+            if source.part_of:
+                continue
+            parts = list(source.iter_all_parts())
+            if parts:
+                pairs.append((source, rng.choice(parts)))
+    missing = count - len(pairs)
+    if missing:
+        pairs.extend(zip(_random_entities(missing, rng), _random_entities(missing, rng)))
+    return pairs
+
+
+def query_types(max_depth: int) -> Dict[str, Callable[[Entity, Entity], bool]]:
+    """Назва -> запит над парою сутностей; результат - чи знайдено щось"""
+    def select(source: Entity, target: Entity) -> bool:
+        # Шаблон від source: частини його частин (target не використовується)
+        text = f'"{source.name}" HAS-A ?part . ?part HAS-A ?sub'
+        return any(True for _ in OntologyQuery.select(text, limit=100))
+
+    return {
+        "find_path": lambda source, target: source.is_related_to(target, max_depth)[0],
+        "find_connection": lambda source, target:
+            OntologyQuery.find_connection(source.name, target.name, verbose=False)[0],
+        "find_shortest_path": lambda source, target:
+            OntologyQuery.find_shortest_path(source.name, target.name) is not None,
+        "find_all_connections": lambda source, target:
+            sum(1 for _ in OntologyQuery.iter_connections(source.name)) > 0,
+        "k_shortest_paths": lambda source, target:
+            len(list(OntologyQuery.iter_shortest_paths(
+                source.name, target.name, k=3,
+                relations=(RelationType.HAS_A, RelationType.USES)))) > 0,
+        "select": select,
+    }
+
+
+def measure(query: Callable[[Entity, Entity], bool], pairs: List[Tuple[Entity, Entity]],
+            with_memory: bool = True) -> dict:
+    """Час кожного запиту; пам'ять - окремим проходом на частині пар"""
+    latencies = []
+    found = 0
+    started = time.perf_counter()
+    for source, target in pairs:
+        query_started = time.perf_counter()
+        found += bool(query(source, target))
+        latencies.append(time.perf_counter() - query_started)
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "count": len(pairs),
+        "found": found,
+        "hit_rate": round(found / len(pairs), 4) if pairs else 0.0,
+        "seconds": round(seconds, 6),
+        "throughput_qps": round(len(pairs) / seconds, 2) if seconds else None,
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "p50": round(1000 * percentile(latencies, 0.50), 4),
+            "p90": round(1000 * percentile(latencies, 0.90), 4),
+            "p99": round(1000 * percentile(latencies, 0.99), 4),
+            "max": round(1000 * latencies[-1], 4) if latencies else 0.0,
+        },
+    }
+    if with_memory:
+        sample = pairs[:max(1, int(len(pairs) * MEMORY_SAMPLE))]
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for source, target in sample:
+            query(source, target)
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+    return result
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Пікова резидентна пам'ять процесу (None, якщо недоступна)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux повідомляє кілобайти, macOS - байти
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def build_world(generator: OntologyGenerator) -> dict:
+    """
+    Генерує онтологію; звіт про завантаження
+    Завантаження не трасується (tracemalloc сповільнив би його в рази) -
+    пам'ять оцінюється піком резидентної пам'яті процесу
+    """
+    Entity.clear_instances()
+    report = generator.load()
+    return {
+        "entities": Entity.count_all_instances(),
+        "has_a": Entity.count_relations(RelationType.HAS_A),
+        "uses": Entity.count_relations(RelationType.USES),
+        "build_seconds": round(report.seconds, 6),
+        "rows_per_sec": round(report.rows_per_sec, 2),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def run(generator: OntologyGenerator, queries: int = DEFAULT_QUERIES,
+        max_depth: int = DEFAULT_MAX_DEPTH, only: Optional[Iterable[str]] = None,
+        with_memory: bool = True) -> dict:
+    """
+    Повний прогін бенчмарку
+
+    Args:
+        generator: Параметри онтології
+        queries: Кількість запитів кожного типу
+        max_depth: Глибина для find_path (find_all_connections - з глибиною за замовчуванням)
+        only: Лише ці типи запитів (None - всі)
+        with_memory: Вимірювати пам'ять (tracemalloc)
+    """
+    types = query_types(max_depth)
+    selected = list(only) if only is not None else list(types)
+    unknown = [name for name in selected if name not in types]
+    if unknown:
+        raise ValueError(f"Невідомі типи запитів: {', '.join(unknown)}")
+
+    # Кеш запитів спотворив би затримки повторних пар
+    OntologyQuery.disable_query_cache()
+    world = build_world(generator)
+
+    rng = random.Random(generator.seed)
+    pairs = _connected_pairs(queries, rng)
+
+    return {
+        "config": {
+            "entities": generator.entity_count,
+            "depth": generator.depth,
+            "branching": generator.branching,
+            "uses": generator.uses,
+            "seed": generator.seed,
+            "queries": queries,
+            "max_depth": max_depth,
+            "python": sys.version.split()[0],
+        },
+        "world": world,
+        "queries": {name: measure(types[name], pairs, with_memory) for name in selected},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк запитів до онтології")
+    add_arguments(parser)
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES,
+                        help="кількість запитів кожного типу")
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH)
+    parser.add_argument('--only', nargs='+', metavar='QUERY',
+                        help=f"типи запитів: {', '.join(query_types(DEFAULT_MAX_DEPTH))}")
+    parser.add_argument('--no-memory', action='store_true', help="без вимірювання пам'яті")
+    parser.add_argument('--out', help="файл для JSON (інакше - stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        generator = OntologyGenerator(args.entities, args.depth, args.branching, args.uses, args.seed)
+        results = run(generator, args.queries, args.max_depth, args.only, not args.no_memory)
+    except ValueError as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""
+Матриця зв'язності всіх пар сутностей (довжини найкоротших шляхів)
+Запуск: python connectivity.py entities.jsonl relations.csv --out matrix.npy
+
+Масиви суміжності (CSR HAS-A / USES, коди типів, класи для IS-A)
+копіюються один раз у спільну пам'ять; процеси пулу під'єднуються до неї
+лише для читання і виконують BFS з кожної сутності свого діапазону рядків.
+Рядки записуються одразу у спільний буфер результату або у файл .npy
+(поступово, частинами) - без пересилання графа чи результатів через pickle.
+
+Клітинка [i, j] - кількість відношень у найкоротшому шляху від i-ї сутності
+до j-ї (0 - сама сутність), UNREACHABLE - зв'язку немає.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import Pool, shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+from base import Entity, RelationType
+from graph import RelationView
+from graph_store import GraphStore
+
+try:
+    import numpy as np
+except ImportError:  # Без numpy матриця - список рядків array
+    np = None
+
+UNREACHABLE = -1
+DEFAULT_CHUNK_SIZE = 64
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+class SharedAdjacency:
+    """
+    Граф онтології у спільній пам'яті: іменовані секції array('i' / 'H')
+
+    Секції:
+        has_a.offsets / has_a.targets, uses.offsets / uses.targets - CSR;
+        type_codes - код класу кожного id;
+        parents.offsets / parents.classes - код класу -> батьківські класи (IS-A);
+        members.offsets / members.ids - батьківський клас -> живі екземпляри;
+        sources / columns - id сутностей рядків та стовпців матриці.
+    """
+
+    RELATIONS = (("has_a", RelationType.HAS_A), ("uses", RelationType.USES))
+
+    def __init__(self, memory: shared_memory.SharedMemory,
+                 layout: Dict[str, Tuple[int, int, str]], owner: bool):
+        self.memory = memory
+        self.layout = layout
+        self.owner = owner
+        self.sections = {name: memory.buf[position:position + size].cast(typecode)
+                         for name, (position, size, typecode) in layout.items()}
+        self.relations = [(self.sections[f"{label}.offsets"], self.sections[f"{label}.targets"])
+                          for label, _ in self.RELATIONS]
+        self.node_count = len(self.sections["type_codes"])
+
+    @classmethod
+    def create(cls, store: GraphStore, source_ids: Iterable[int]) -> 'SharedAdjacency':
+        """Копіює суміжність сховища у новий блок спільної пам'яті"""
+        store.compact()
+        view = RelationView(store)
+        sections: List[Tuple[str, array]] = []
+        for label, relation in cls.RELATIONS:
+            csr = store.relations[relation]
+            sections.append((f"{label}.offsets", csr.offsets))
+            sections.append((f"{label}.targets", csr.targets))
+        sections.append(("type_codes", store.type_codes))
+
+        # IS-A: код типу -> батьківські класи -> всі їх живі екземпляри
+        class_index: Dict[type, int] = {}
+        parent_offsets, parent_classes = array('i', [0]), array('i')
+        member_offsets, member_ids = array('i', [0]), array('i')
+        for entity_type in store.classes:
+            for parent in view.parent_classes(entity_type):
+                if parent not in class_index:
+                    class_index[parent] = len(class_index)
+                    member_ids.extend(store.instances_of(parent))
+                    member_offsets.append(len(member_ids))
+                parent_classes.append(class_index[parent])
+            parent_offsets.append(len(parent_classes))
+        sections += [("parents.offsets", parent_offsets), ("parents.classes", parent_classes),
+                     ("members.offsets", member_offsets), ("members.ids", member_ids),
+                     ("sources", array('i', source_ids)), ("columns", array('i', store.ids()))]
+
+        layout = {}
+        position = 0
+        for name, data in sections:
+            size = len(data) * data.itemsize
+            layout[name] = (position, size, data.typecode)
+            position = (position + size + 7) & ~7
+        memory = shared_memory.SharedMemory(create=True, size=max(position, 1))
+        for name, data in sections:
+            start, size, _ = layout[name]
+            memory.buf[start:start + size] = data.tobytes()
+        return cls(memory, layout, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, layout: Dict[str, Tuple[int, int, str]]) -> 'SharedAdjacency':
+        return cls(shared_memory.SharedMemory(name=name), layout, owner=False)
+
+    def distances(self, source_id: int, max_edges: Optional[int] = None) -> array:
+        """BFS з однієї сутності: кількість відношень до кожного id"""
+        sections = self.sections
+        type_codes = sections["type_codes"]
+        parent_offsets, parent_classes = sections["parents.offsets"], sections["parents.classes"]
+        member_offsets, member_ids = sections["members.offsets"], sections["members.ids"]
+
+        distance = array('i', [UNREACHABLE]) * self.node_count
+        distance[source_id] = 0
+        expanded = bytearray(len(member_offsets))
+        frontier = [source_id]
+        depth = 0
+        while frontier and (max_edges is None or depth < max_edges):
+            depth += 1
+            next_frontier = []
+            for node_id in frontier:
+                for offsets, targets in self.relations:
+                    for target in targets[offsets[node_id]:offsets[node_id + 1]]:
+                        if distance[target] == UNREACHABLE:
+                            distance[target] = depth
+                            next_frontier.append(target)
+                code = type_codes[node_id]
+                # Екземпляри класу видаються один раз за обхід
+                for parent in parent_classes[parent_offsets[code]:parent_offsets[code + 1]]:
+                    if expanded[parent]:
+                        continue
+                    expanded[parent] = 1
+                    for target in member_ids[member_offsets[parent]:member_offsets[parent + 1]]:
+                        if distance[target] == UNREACHABLE:
+                            distance[target] = depth
+                            next_frontier.append(target)
+            frontier = next_frontier
+        return distance
+
+    def close(self) -> None:
+        self.relations = []
+        for view in self.sections.values():
+            view.release()
+        self.sections = {}
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+# ----------------------------------------------------------------------
+# Буфер результату: спільна пам'ять або файл .npy
+# ----------------------------------------------------------------------
+
+def _npy_header(typecode: str, shape: Tuple[int, int]) -> bytes:
+    """Заголовок формату .npy версії 1.0 (дані - рядки підряд, C-порядок)"""
+    order = "<" if sys.byteorder == "little" else ">"
+    descr = f"{order}i{array(typecode).itemsize}"
+    text = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({shape[0]}, {shape[1]}), }}"
+    padding = -(len(_NPY_MAGIC) + 2 + len(text) + 1) % 64
+    text = (text + " " * padding + "\n").encode("latin1")
+    return _NPY_MAGIC + struct.pack("<H", len(text)) + text
+
+
+class _Output:
+    """Рядки матриці (typecode) у спільній пам'яті чи у змапленому файлі"""
+
+    def __init__(self, typecode: str, shape: Tuple[int, int], path: Optional[str] = None,
+                 memory_name: Optional[str] = None, create: bool = False):
+        self.typecode = typecode
+        self.shape = shape
+        self.path = path
+        size = shape[0] * shape[1] * array(typecode).itemsize
+        self._file = self._mmap = self.memory = None
+        if path is not None:
+            header = _npy_header(typecode, shape)
+            if create:
+                with open(path, "wb") as file:
+                    file.write(header)
+                    file.truncate(len(header) + size)
+            self._file = open(path, "r+b")
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+            self._raw = memoryview(self._mmap)
+            self.rows = self._raw[len(header):len(header) + size].cast(typecode)
+        else:
+            self.memory = shared_memory.SharedMemory(name=memory_name, create=create,
+                                                     size=max(size, 1))
+            self._raw = self.memory.buf
+            self.rows = self._raw[:size].cast(typecode)
+
+    def write(self, row_index: int, values: array) -> None:
+        width = self.shape[1]
+        self.rows[row_index * width:(row_index + 1) * width] = values
+
+    def flush(self) -> None:
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self, unlink: bool = False) -> None:
+        self.rows.release()
+        if self._mmap is not None:
+            self._raw.release()
+            self._mmap.close()
+            self._file.close()
+        else:
+            self.memory.close()
+            if unlink:
+                self.memory.unlink()
+
+
+# ----------------------------------------------------------------------
+# Процеси пулу
+# ----------------------------------------------------------------------
+
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(graph_name: str, layout, output_args: dict, max_edges: Optional[int]) -> None:
+    _worker["graph"] = SharedAdjacency.attach(graph_name, layout)
+    _worker["output"] = _Output(**output_args)
+    _worker["max_edges"] = max_edges
+
+
+def _fill_rows(task: Tuple[int, int]) -> int:
+    """Обчислює рядки [start, stop) і записує їх у буфер результату"""
+    graph: SharedAdjacency = _worker["graph"]
+    output: _Output = _worker["output"]
+    max_edges = _worker["max_edges"]
+    sources, columns = graph.sections["sources"], graph.sections["columns"]
+    all_columns = len(columns) == graph.node_count
+    start, stop = task
+    for row_index in range(start, stop):
+        distance = graph.distances(sources[row_index], max_edges)
+        if not all_columns:
+            distance = array('i', (distance[column] for column in columns))
+        output.write(row_index, distance if output.typecode == 'i'
+                     else array(output.typecode, distance))
+    output.flush()
+    return stop - start
+
+
+def _close_worker() -> None:
+    if _worker:
+        _worker.pop("output").close()
+        _worker.pop("graph").close()
+        _worker.clear()
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+
+class ConnectivityMatrix:
+    """
+    Результат: matrix[i][j] - відстань від sources[i] до columns[j]
+
+    matrix - numpy.ndarray (для path - відкритий через mmap), без numpy -
+    список рядків array.
+    """
+
+    def __init__(self, sources: List[str], columns: List[str], matrix, path: Optional[str] = None):
+        self.sources = sources
+        self.columns = columns
+        self.matrix = matrix
+        self.path = path
+        self._rows = {name: index for index, name in enumerate(sources)}
+        self._columns = {name: index for index, name in enumerate(columns)}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.sources), len(self.columns)
+
+    def distance(self, source_name: str, target_name: str) -> Optional[int]:
+        """Кількість відношень у найкоротшому шляху; None - зв'язку немає"""
+        value = int(self.matrix[self._rows[source_name]][self._columns[target_name]])
+        return None if value == UNREACHABLE else value
+
+    def is_related(self, source_name: str, target_name: str) -> bool:
+        return self.distance(source_name, target_name) is not None
+
+    def reachable_pairs(self) -> int:
+        """Кількість пар (без діагоналі), між якими є зв'язок"""
+        if np is not None:
+            reachable = int(np.count_nonzero(self.matrix > 0))
+        else:
+            reachable = sum(1 for row in self.matrix for value in row if value > 0)
+        return reachable
+
+
+def connectivity_matrix(sources: Optional[Iterable[str]] = None,
+                        max_depth: Optional[int] = None,
+                        processes: Optional[int] = None,
+                        path: Optional[str] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        store: Optional[GraphStore] = None) -> ConnectivityMatrix:
+    """
+    Матриця відстаней (HAS-A, USES, IS-A) між сутностями
+
+    Args:
+        sources: Імена сутностей рядків (за замовчуванням - всі живі)
+        max_depth: Як у find_path - максимальна кількість сутностей у шляху;
+            довші шляхи вважаються відсутніми. None - без обмеження
+        processes: Кількість процесів пулу (за замовчуванням - кількість ядер;
+            1 - обчислення в поточному процесі)
+        path: Файл .npy, куди рядки записуються поступово (частинами по chunk_size)
+        chunk_size: Кількість рядків в одному завданні пулу
+        store: Сховище (за замовчуванням - сховище сутностей у пам'яті)
+
+    Raises:
+        KeyError: Невідоме ім'я серед sources
+    """
+    store = store if store is not None else Entity._store
+    if sources is None:
+        source_ids = list(store.ids())
+    else:
+        source_ids = []
+        for name in sources:
+            node_id = store.id_of(name)
+            if node_id is None:
+                raise KeyError(name)
+            source_ids.append(node_id)
+    max_edges = None if max_depth is None else max(max_depth - 1, 0)
+
+    graph = SharedAdjacency.create(store, source_ids)
+    shape = (len(source_ids), len(graph.sections["columns"]))
+    # Відстань не перевищує кількості вершин
+    typecode = 'h' if graph.node_count < 2 ** 15 else 'i'
+    output = _Output(typecode, shape, path=path, create=True)
+    output_args = {"typecode": typecode, "shape": shape, "path": path,
+                   "memory_name": output.memory.name if path is None else None}
+    tasks = [(start, min(start + chunk_size, shape[0]))
+             for start in range(0, shape[0], chunk_size)]
+
+    try:
+        processes = processes or os.cpu_count() or 1
+        if processes <= 1 or len(tasks) <= 1:
+            _init_worker(graph.memory.name, graph.layout, output_args, max_edges)
+            try:
+                for task in tasks:
+                    _fill_rows(task)
+            finally:
+                _close_worker()
+        else:
+            with Pool(min(processes, len(tasks)), _init_worker,
+                      (graph.memory.name, graph.layout, output_args, max_edges)) as pool:
+                for _ in pool.imap_unordered(_fill_rows, tasks):
+                    pass
+        output.flush()
+
+        if np is not None and path is not None:
+            matrix = np.load(path, mmap_mode="r")
+        elif np is not None:
+            matrix = np.frombuffer(output.rows, dtype=np.dtype(typecode)).reshape(shape).copy()
+        else:
+            width = shape[1]
+            matrix = [array(typecode, output.rows[row * width:(row + 1) * width])
+                      for row in range(shape[0])]
+    finally:
+        output.close(unlink=path is None)
+        graph.close()
+
+    names = [store.name_of(node_id) for node_id in source_ids]
+    columns = names if sources is None else list(map(store.name_of, store.ids()))
+    return ConnectivityMatrix(names, columns, matrix, path)
+
+
+def main(argv=None):
+    from loader import load
+
+    parser = argparse.ArgumentParser(description="Матриця зв'язності всіх пар сутностей")
+    parser.add_argument('paths', nargs='+', help="файли сутностей, потім відношень")
+    parser.add_argument('--out', help="файл .npy для результату")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        report = load(*args.paths)
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}")
+        return 1
+    print(f"✅ {report}")
+
+    started = time.perf_counter()
+    result = connectivity_matrix(max_depth=args.max_depth, processes=args.processes,
+                                 path=args.out, chunk_size=args.chunk_size)
+    seconds = time.perf_counter() - started
+    print(f"✅ Матриця {result.shape[0]}×{result.shape[1]}: "
+          f"{result.reachable_pairs()} пов'язаних пар, {seconds:.2f} с")
+    if args.out:
+        print(f"   Записано у {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ from base import LivingBeing, Building, Vehicle, Part
 
 class Human(LivingBeing):
     """РІВЕНЬ 3: Людина"""
+    __slots__ = ('profession',)
     
     def __init__(self, name: str, age: int, profession: str):
         super().__init__(name, age)
@@ -26,6 +27,7 @@ class Human(LivingBeing):
 
 class Animal(LivingBeing):
     """РІВЕНЬ 3: Тварина"""
+    __slots__ = ('species',)
     
     def __init__(self, name: str, age: int, species: str):
         super().__init__(name, age)
@@ -41,6 +43,7 @@ class Animal(LivingBeing):
 
 class ResidentialBuilding(Building):
     """РІВЕНЬ 3: Житлова будівля"""
+    __slots__ = ('apartments_count',)
     
     def __init__(self, name: str, address: str, floors: int, apartments_count: int):
         super().__init__(name, address, floors)
@@ -52,6 +55,7 @@ class ResidentialBuilding(Building):
 
 class PublicBuilding(Building):
     """РІВЕНЬ 3: Громадська будівля"""
+    __slots__ = ('building_type',)
     
     def __init__(self, name: str, address: str, floors: int, building_type: str):
         super().__init__(name, address, floors)
@@ -63,6 +67,7 @@ class PublicBuilding(Building):
 
 class GroundVehicle(Vehicle):
     """РІВЕНЬ 3: Наземний транспорт"""
+    __slots__ = ('wheels_count',)
     
     def __init__(self, name: str, max_speed: int, wheels_count: int):
         super().__init__(name, max_speed)
@@ -77,6 +82,7 @@ class GroundVehicle(Vehicle):
 
 class BodyPart(Part):
     """РІВЕНЬ 3: Частина тіла"""
+    __slots__ = ('function',)
     
     def __init__(self, name: str, material: str, function: str):
         super().__init__(name, material)
@@ -88,6 +94,7 @@ class BodyPart(Part):
 
 class MechanicalPart(Part):
     """РІВЕНЬ 3: Механічна частина"""
+    __slots__ = ('weight',)
     
     def __init__(self, name: str, material: str, weight: float):
         super().__init__(name, material)
@@ -103,6 +110,7 @@ class MechanicalPart(Part):
 
 class Teacher(Human):
     """РІВЕНЬ 4: Вчитель"""
+    __slots__ = ('subject',)
     
     def __init__(self, name: str, age: int, subject: str):
         super().__init__(name, age, "Вчитель")
@@ -117,6 +125,7 @@ class Teacher(Human):
 
 class Driver(Human):
     """РІВЕНЬ 4: Водій"""
+    __slots__ = ('license_type',)
     
     def __init__(self, name: str, age: int, license_type: str):
         super().__init__(name, age, "Водій")
@@ -135,6 +144,7 @@ class Driver(Human):
 
 class Dog(Animal):
     """РІВЕНЬ 4: Собака"""
+    __slots__ = ('breed',)
     
     def __init__(self, name: str, age: int, breed: str):
         super().__init__(name, age, "Собака")
@@ -149,6 +159,7 @@ class Dog(Animal):
 
 class Cat(Animal):
     """РІВЕНЬ 4: Кіт"""
+    __slots__ = ('color',)
     
     def __init__(self, name: str, age: int, color: str):
         super().__init__(name, age, "Кіт")
@@ -167,6 +178,7 @@ class Cat(Animal):
 
 class Apartment(ResidentialBuilding):
     """РІВЕНЬ 4: Квартира"""
+    __slots__ = ('rooms',)
     
     def __init__(self, name: str, address: str, floor: int, rooms: int):
         super().__init__(name, address, floor, 1)
@@ -178,6 +190,7 @@ class Apartment(ResidentialBuilding):
 
 class School(PublicBuilding):
     """РІВЕНЬ 4: Школа"""
+    __slots__ = ('students_count',)
     
     def __init__(self, name: str, address: str, floors: int, students_count: int):
         super().__init__(name, address, floors, "Школа")
@@ -189,6 +202,7 @@ class School(PublicBuilding):
 
 class Hospital(PublicBuilding):
     """РІВЕНЬ 4: Лікарня"""
+    __slots__ = ('beds_count',)
     
     def __init__(self, name: str, address: str, floors: int, beds_count: int):
         super().__init__(name, address, floors, "Лікарня")
@@ -204,6 +218,7 @@ class Hospital(PublicBuilding):
 
 class Car(GroundVehicle):
     """РІВЕНЬ 4: Автомобіль"""
+    __slots__ = ('brand',)
     
     def __init__(self, name: str, max_speed: int, brand: str):
         super().__init__(name, max_speed, 4)
@@ -215,6 +230,7 @@ class Car(GroundVehicle):
 
 class Bus(GroundVehicle):
     """РІВЕНЬ 4: Автобус"""
+    __slots__ = ('capacity',)
     
     def __init__(self, name: str, max_speed: int, capacity: int):
         super().__init__(name, max_speed, 6)
@@ -230,6 +246,7 @@ class Bus(GroundVehicle):
 
 class Engine(MechanicalPart):
     """РІВЕНЬ 4: Двигун"""
+    __slots__ = ('power',)
     
     def __init__(self, name: str, material: str, power: int):
         super().__init__(name, material, 150.0)
@@ -244,6 +261,7 @@ class Engine(MechanicalPart):
 
 class Wheel(MechanicalPart):
     """РІВЕНЬ 4: Колесо"""
+    __slots__ = ('diameter',)
     
     def __init__(self, name: str, diameter: int):
         super().__init__(name, "Гума+Метал", 15.0)
@@ -262,6 +280,7 @@ class Wheel(MechanicalPart):
 
 class Tail(BodyPart):
     """РІВЕНЬ 4: Хвіст"""
+    __slots__ = ('length',)
     
     def __init__(self, name: str, length: float):
         super().__init__(name, "М'язи та кістки", "Баланс та комунікація")
@@ -276,6 +295,7 @@ class Tail(BodyPart):
 
 class Fur(BodyPart):
     """РІВЕНЬ 4: Шерсть"""
+    __slots__ = ('color',)
     
     def __init__(self, name: str, color: str):
         super().__init__(name, "Кератин", "Захист та теплоізоляція")
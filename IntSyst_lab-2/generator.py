@@ -0,0 +1,179 @@
+"""
+Генератор синтетичних онтологій заданого розміру (10³ - 10⁷ сутностей)
+Запуск: python generator.py --entities 100000 --depth 3 --branching 2 --uses 1.5 --out world.jsonl
+
+Використовує справжню ієрархію класів з entities.py:
+    власники (люди, тварини, будівлі, транспорт) мають дерева частин HAS-A
+    заданої глибини - тварини з частин тіла, решта з механічних частин;
+    люди та тварини використовують (USES) будівлі й транспорт.
+Записи видаються потоком у форматі loader.py, тож пам'ять генератора не
+залежить від розміру онтології (окрім індексів цілей USES).
+"""
+import argparse
+import inspect
+import json
+import random
+import sys
+from array import array
+from typing import Dict, Iterator, List, Tuple, get_type_hints
+import entities
+from base import LivingBeing
+from loader import DEFAULT_BATCH_SIZE, LoadReport, OntologyLoader
+
+DEFAULT_ENTITIES = 1000
+DEFAULT_DEPTH = 2
+DEFAULT_BRANCHING = 2
+DEFAULT_USES = 1.5
+
+
+def _values(cls: type) -> List[Tuple[str, type]]:
+    """(параметр, тип) конструктора без name"""
+    hints = get_type_hints(cls.__init__)
+    return [(name, hints.get(name, str))
+            for name in list(inspect.signature(cls.__init__).parameters)[1:] if name != "name"]
+
+
+class OntologyGenerator:
+    """
+    Потік записів синтетичної онтології
+
+    Кожен власник отримує дерево частин: branching частин на рівні,
+    depth рівнів; кожна жива істота - в середньому uses відношень USES
+    до вже створених будівель і транспорту. Імена - "<Клас> <номер>".
+    """
+
+    OWNERS = (entities.Teacher, entities.Driver, entities.Dog, entities.Cat,
+              entities.Apartment, entities.School, entities.Hospital,
+              entities.Car, entities.Bus)
+    BODY_PARTS = (entities.Tail, entities.Fur)
+    MECHANICAL_PARTS = (entities.Engine, entities.Wheel)
+
+    def __init__(self, entity_count: int = DEFAULT_ENTITIES, depth: int = DEFAULT_DEPTH,
+                 branching: int = DEFAULT_BRANCHING, uses: float = DEFAULT_USES, seed: int = 0):
+        """
+        Args:
+            entity_count: Загальна кількість сутностей
+            depth: Глибина дерев HAS-A (0 - без частин)
+            branching: Кількість частин у кожної сутності дерева
+            uses: Середня кількість USES на живу істоту
+            seed: Зерно генератора випадкових чисел
+        """
+        if entity_count < 0 or depth < 0 or branching < 0 or uses < 0:
+            raise ValueError("Параметри генератора мають бути невід'ємними")
+        self.entity_count = entity_count
+        self.depth = depth
+        self.branching = branching
+        self.uses = uses
+        self.seed = seed
+        self._parameters: Dict[type, List[Tuple[str, type]]] = {}
+
+    def _record(self, cls: type, number: int, rng: random.Random) -> dict:
+        parameters = self._parameters.get(cls)
+        if parameters is None:
+            parameters = self._parameters[cls] = _values(cls)
+        record = {"type": cls.__name__, "name": f"{cls.__name__} {number}"}
+        for name, annotation in parameters:
+            if annotation is int:
+                record[name] = rng.randint(1, 100)
+            elif annotation is float:
+                record[name] = round(rng.uniform(0.5, 100.0), 1)
+            else:
+                record[name] = f"{name} {rng.randint(1, 20)}"
+        return record
+
+    def records(self) -> Iterator[dict]:
+        """Записи сутностей та відношень (відношення - після обох своїх сутностей)"""
+        rng = random.Random(self.seed)
+        # Будівлі та транспорт для USES: номер і код класу (ім'я відновлюється з них)
+        target_numbers, target_classes = array('q'), array('B')
+        produced = 0
+        whole_uses = int(self.uses)
+        extra_use = self.uses - whole_uses
+
+        while produced < self.entity_count:
+            owner_cls = rng.choice(self.OWNERS)
+            owner = self._record(owner_cls, produced, rng)
+            owner_number = produced
+            produced += 1
+            yield owner
+
+            # Дерево частин: рівень за рівнем, поки не вичерпано ліміт сутностей
+            families = self.BODY_PARTS if issubclass(owner_cls, entities.Animal) else self.MECHANICAL_PARTS
+            level = [owner["name"]]
+            for _ in range(self.depth):
+                next_level = []
+                for container in level:
+                    for _ in range(self.branching):
+                        if produced >= self.entity_count:
+                            break
+                        part = self._record(rng.choice(families), produced, rng)
+                        produced += 1
+                        yield part
+                        yield {"subject": container, "relation": "has_a", "object": part["name"]}
+                        next_level.append(part["name"])
+                level = next_level
+
+            if issubclass(owner_cls, LivingBeing):
+                count = whole_uses + (rng.random() < extra_use)
+                for _ in range(min(count, len(target_numbers))):
+                    target = rng.randrange(len(target_numbers))
+                    target_cls = self.OWNERS[target_classes[target]]
+                    yield {"subject": owner["name"], "relation": "uses",
+                           "object": f"{target_cls.__name__} {target_numbers[target]}"}
+            else:
+                target_numbers.append(owner_number)
+                target_classes.append(self.OWNERS.index(owner_cls))
+
+    def load(self, batch_size: int = DEFAULT_BATCH_SIZE) -> LoadReport:
+        """Завантажує згенеровану онтологію у сховище сутностей"""
+        return OntologyLoader(batch_size, strict=True).load_records(self.records())
+
+    def write_jsonl(self, path: str) -> int:
+        """Записує онтологію у файл JSON-lines; повертає кількість рядків"""
+        rows = 0
+        with open(path, "w", encoding="utf-8") as file:
+            for record in self.records():
+                file.write(json.dumps(record, ensure_ascii=False))
+                file.write("\n")
+                rows += 1
+        return rows
+
+
+def generate(entity_count: int = DEFAULT_ENTITIES, depth: int = DEFAULT_DEPTH,
+             branching: int = DEFAULT_BRANCHING, uses: float = DEFAULT_USES,
+             seed: int = 0) -> LoadReport:
+    """Генерує онтологію і завантажує її в пам'ять"""
+    return OntologyGenerator(entity_count, depth, branching, uses, seed).load()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Параметри генератора (спільні з benchmark.py)"""
+    parser.add_argument('--entities', type=int, default=DEFAULT_ENTITIES)
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH, help="глибина дерев HAS-A")
+    parser.add_argument('--branching', type=int, default=DEFAULT_BRANCHING,
+                        help="кількість частин на рівні дерева")
+    parser.add_argument('--uses', type=float, default=DEFAULT_USES,
+                        help="середня кількість USES на живу істоту")
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генератор синтетичної онтології")
+    add_arguments(parser)
+    parser.add_argument('--out', help="файл JSON-lines (інакше - завантаження в пам'ять)")
+    args = parser.parse_args(argv)
+
+    try:
+        generator = OntologyGenerator(args.entities, args.depth, args.branching, args.uses, args.seed)
+    except ValueError as error:
+        print(f"❌ {error}")
+        return 1
+    if args.out:
+        print(f"✅ Записано {generator.write_jsonl(args.out)} рядків у {args.out}")
+    else:
+        print(f"✅ {generator.load()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
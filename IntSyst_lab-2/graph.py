@@ -0,0 +1,526 @@
+"""
+Пошук зв'язків між сутностями
+Ітеративні обходи графа відношень HAS-A, USES та IS-A
+"""
+from abc import ABC
+import heapq
+from itertools import count
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+from base import Entity, RelationType
+from graph_store import GraphStore
+
+
+# Позначки відношень у шляхах
+RELATION_LABELS = {
+    RelationType.HAS_A: "HAS-A",
+    RelationType.USES: "USES",
+    RelationType.IS_A: "IS-A",
+}
+
+
+class RelationView:
+    """
+    Явне представлення суміжності графа онтології над GraphStore
+    Для кожної вершини (id) видає пари (відношення, id сусіда) у порядку HAS-A, USES, IS-A
+    """
+
+    def __init__(self, store: Optional[GraphStore] = None):
+        self._store = store
+        self._parents_cache: Dict[type, Tuple[type, ...]] = {}
+
+    @property
+    def store(self) -> GraphStore:
+        return self._store if self._store is not None else Entity._store
+
+    def parent_classes(self, entity_type: type) -> Tuple[type, ...]:
+        """Батьківські класи для IS-A (без самого класу, Entity, ABC та object)"""
+        parents = self._parents_cache.get(entity_type)
+        if parents is None:
+            parents = tuple(cls for cls in entity_type.__mro__[1:-1]
+                            if cls is not Entity and cls is not ABC)
+            self._parents_cache[entity_type] = parents
+        return parents
+
+    def neighbors(self, node_id: int,
+                  expanded_classes: Optional[Set[type]] = None,
+                  relations: Optional[FrozenSet[RelationType]] = None) -> Iterator[Tuple[RelationType, int]]:
+        """
+        Сусіди вершини
+
+        Args:
+            node_id: id сутності у сховищі
+            expanded_classes: Класи, чиї екземпляри вже видані в цьому обході -
+                повторно їх не перебираємо (всі вони вже відвідані)
+            relations: Лише ці відношення (None - всі)
+        """
+        store = self.store
+        if relations is None or RelationType.HAS_A in relations:
+            for part_id in store.successors(RelationType.HAS_A, node_id):
+                yield RelationType.HAS_A, part_id
+        if relations is None or RelationType.USES in relations:
+            for used_id in store.successors(RelationType.USES, node_id):
+                yield RelationType.USES, used_id
+        if relations is not None and RelationType.IS_A not in relations:
+            return
+        for parent_class in self.parent_classes(store.type_of(node_id)):
+            if expanded_classes is not None:
+                if parent_class in expanded_classes:
+                    continue
+                expanded_classes.add(parent_class)
+            for instance_id in store.instances_of(parent_class):
+                if instance_id != node_id:
+                    yield RelationType.IS_A, instance_id
+
+    def predecessors(self, node_id: int,
+                     expanded_classes: Optional[Set[type]] = None) -> Iterator[Tuple[RelationType, int]]:
+        """
+        Зворотні сусіди: пари (відношення, id), з яких є ребро до node_id
+
+        IS-A: X -> Y, якщо Y - екземпляр батьківського класу P типу X.
+        Отже, для кожного класу C з ієрархії Y - всі екземпляри C, для яких
+        C є батьківським класом (тобто не прямі екземпляри C).
+        """
+        store = self.store
+        for source_id in store.predecessors(RelationType.HAS_A, node_id):
+            yield RelationType.HAS_A, source_id
+        for source_id in store.predecessors(RelationType.USES, node_id):
+            yield RelationType.USES, source_id
+        node_type = store.type_of(node_id)
+        for cls in (node_type,) + self.parent_classes(node_type):
+            if expanded_classes is not None:
+                if cls in expanded_classes:
+                    continue
+                expanded_classes.add(cls)
+            for instance_id in store.instances_of(cls):
+                if instance_id != node_id and store.type_of(instance_id) is not cls:
+                    yield RelationType.IS_A, instance_id
+
+
+_default_view = RelationView()
+
+
+def view_for(entity: Entity) -> RelationView:
+    """Представлення графа, якому належить сутність (сховище в пам'яті чи бекенд)"""
+    if entity._graph is Entity._store:
+        return _default_view
+    return RelationView(entity._graph)
+
+
+def build_path(parents: Dict[int, Optional[Tuple[int, RelationType]]],
+               target_id: int, store: GraphStore) -> List[str]:
+    """Відновлює шлях [ім'я, відношення, ім'я, ...] за вказівниками на батьків"""
+    path = [store.name_of(target_id)]
+    link = parents[target_id]
+    while link is not None:
+        previous_id, relation = link
+        path.append(RELATION_LABELS[relation])
+        path.append(store.name_of(previous_id))
+        link = parents[previous_id]
+    path.reverse()
+    return path
+
+
+def iter_reachable(source: Entity, max_depth: int = 3,
+                   view: Optional[RelationView] = None) -> Iterator[Tuple[Entity, List[str]]]:
+    """
+    Один обхід BFS від source з обмеженням глибини
+
+    Видає (сутність, перший знайдений шлях до неї) в міру виявлення;
+    сама source не видається. Семантика max_depth - як у find_path.
+    """
+    if max_depth <= 1:
+        return
+
+    view = view or view_for(source)
+    store = view.store
+    parents: Dict[int, Optional[Tuple[int, RelationType]]] = {source._id: None}
+    expanded_classes: Set[type] = set()
+    frontier = [source._id]
+    depth = 1
+
+    while frontier and depth < max_depth:
+        next_frontier = []
+        for node_id in frontier:
+            for relation, neighbor_id in view.neighbors(node_id, expanded_classes):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (node_id, relation)
+                yield store.entity(neighbor_id), build_path(parents, neighbor_id, store)
+                next_frontier.append(neighbor_id)
+        frontier = next_frontier
+        depth += 1
+
+
+def find_path(source: Entity, target: Entity, max_depth: int = 5,
+              view: Optional[RelationView] = None) -> Tuple[bool, List[str]]:
+    """
+    Ітеративний BFS від source до target
+
+    Один набір відвіданих вершин (цілі id) і вказівники на батьків - шлях
+    відновлюється лише у разі успіху. max_depth - максимальна кількість
+    сутностей у шляху (як і раніше: 0 - нічого не знайдено, 1 - лише сама сутність).
+
+    Returns:
+        (чи є зв'язок, шлях зв'язку)
+    """
+    if max_depth <= 0:
+        return False, []
+    if source is target:
+        return True, [source.name]
+    if target._graph is not source._graph:
+        return False, []
+
+    view = view or view_for(source)
+    store = view.store
+    target_id = target._id
+    parents: Dict[int, Optional[Tuple[int, RelationType]]] = {source._id: None}
+    expanded_classes: Set[type] = set()
+    frontier = [source._id]
+    depth = 1
+
+    while frontier and depth < max_depth:
+        next_frontier = []
+        for node_id in frontier:
+            for relation, neighbor_id in view.neighbors(node_id, expanded_classes):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (node_id, relation)
+                if neighbor_id == target_id:
+                    return True, build_path(parents, target_id, store)
+                next_frontier.append(neighbor_id)
+        frontier = next_frontier
+        depth += 1
+
+    return False, []
+
+
+def _join_path(forward: Dict[int, Optional[Tuple[int, RelationType]]],
+               backward: Dict[int, Optional[Tuple[int, RelationType]]],
+               meeting_id: int, store) -> List[str]:
+    """Шлях source -> meeting (вказівники вперед) + meeting -> target (вказівники назад)"""
+    path = build_path(forward, meeting_id, store)
+    link = backward[meeting_id]
+    while link is not None:
+        next_id, relation = link
+        path.append(RELATION_LABELS[relation])
+        path.append(store.name_of(next_id))
+        link = backward[next_id]
+    return path
+
+
+def _bidirectional_bfs(source_id: int, target_id: int, view: RelationView,
+                       max_cost: Optional[float]) -> Optional[Tuple[float, List[str]]]:
+    """Двобічний BFS: щоразу розширюємо менший фронт на один повний шар"""
+    store = view.store
+    forward: Dict[int, Optional[Tuple[int, RelationType]]] = {source_id: None}
+    backward: Dict[int, Optional[Tuple[int, RelationType]]] = {target_id: None}
+    forward_depth = {source_id: 0}
+    backward_depth = {target_id: 0}
+    forward_frontier, backward_frontier = [source_id], [target_id]
+    forward_classes: Set[type] = set()
+    backward_classes: Set[type] = set()
+    depth_sum = 0
+
+    while forward_frontier and backward_frontier:
+        if max_cost is not None and depth_sum >= max_cost:
+            return None
+        depth_sum += 1
+
+        # Повний шар з меншого боку; найкраща зустріч - мінімум по шару
+        best = None
+        next_frontier = []
+        if len(forward_frontier) <= len(backward_frontier):
+            for node_id in forward_frontier:
+                for relation, neighbor_id in view.neighbors(node_id, forward_classes):
+                    if neighbor_id in forward:
+                        continue
+                    forward[neighbor_id] = (node_id, relation)
+                    forward_depth[neighbor_id] = forward_depth[node_id] + 1
+                    next_frontier.append(neighbor_id)
+                    if neighbor_id in backward:
+                        cost = forward_depth[neighbor_id] + backward_depth[neighbor_id]
+                        if best is None or cost < best[0]:
+                            best = (cost, neighbor_id)
+            forward_frontier = next_frontier
+        else:
+            for node_id in backward_frontier:
+                for relation, neighbor_id in view.predecessors(node_id, backward_classes):
+                    if neighbor_id in backward:
+                        continue
+                    backward[neighbor_id] = (node_id, relation)
+                    backward_depth[neighbor_id] = backward_depth[node_id] + 1
+                    next_frontier.append(neighbor_id)
+                    if neighbor_id in forward:
+                        cost = forward_depth[neighbor_id] + backward_depth[neighbor_id]
+                        if best is None or cost < best[0]:
+                            best = (cost, neighbor_id)
+            backward_frontier = next_frontier
+
+        if best is not None:
+            return best[0], _join_path(forward, backward, best[1], store)
+    return None
+
+
+def _bidirectional_dijkstra(source_id: int, target_id: int, view: RelationView,
+                            weights: Dict[RelationType, float],
+                            max_cost: Optional[float]) -> Optional[Tuple[float, List[str]]]:
+    """Двобічний Дейкстра з вагами відношень; зупинка, коли сума вершин черг >= найкращого"""
+    store = view.store
+    parents = ({source_id: None}, {target_id: None})
+    costs = ({source_id: 0.0}, {target_id: 0.0})
+    settled = (set(), set())
+    heaps = ([(0.0, source_id)], [(0.0, target_id)])
+    expanded = (set(), set())
+    expand = (view.neighbors, view.predecessors)
+    best_cost, meeting_id = float("inf"), None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best_cost:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        cost, node_id = heapq.heappop(heaps[side])
+        if node_id in settled[side]:
+            continue
+        if max_cost is not None and cost > max_cost:
+            break
+        settled[side].add(node_id)
+
+        side_costs, other_costs = costs[side], costs[1 - side]
+        for relation, neighbor_id in expand[side](node_id, expanded[side]):
+            new_cost = cost + weights.get(relation, 1.0)
+            if new_cost < side_costs.get(neighbor_id, float("inf")):
+                side_costs[neighbor_id] = new_cost
+                parents[side][neighbor_id] = (node_id, relation)
+                heapq.heappush(heaps[side], (new_cost, neighbor_id))
+            if neighbor_id in other_costs:
+                total = side_costs[neighbor_id] + other_costs[neighbor_id]
+                if total < best_cost:
+                    best_cost, meeting_id = total, neighbor_id
+
+    if meeting_id is None or (max_cost is not None and best_cost > max_cost):
+        return None
+    return best_cost, _join_path(parents[0], parents[1], meeting_id, store)
+
+
+def shortest_path(source: Entity, target: Entity,
+                  weights: Optional[Dict[RelationType, float]] = None,
+                  max_cost: Optional[float] = None,
+                  view: Optional[RelationView] = None) -> Optional[Tuple[float, List[str]]]:
+    """
+    Найкоротший шлях через HAS-A, USES та IS-A двобічним пошуком
+
+    Прямий пошук іде від source по ребрах, зворотний - від target по
+    зворотній суміжності; кожен бік розширює лише свої вершини, тож на
+    графах з великим розгалуженням обходиться порядку sqrt вершин
+    одностороннього пошуку.
+
+    Args:
+        source: Початкова сутність
+        target: Цільова сутність
+        weights: Вага кожного відношення (за замовчуванням усі 1 - BFS);
+            ваги мають бути додатними
+        max_cost: Максимальна вартість шляху (кількість ребер для BFS)
+        view: Представлення графа
+
+    Returns:
+        (вартість, шлях) або None, якщо шляху немає
+    """
+    if source is target or (source._graph is target._graph and source._id == target._id):
+        return 0.0, [source.name]
+    if target._graph is not source._graph:
+        return None
+    view = view or view_for(source)
+    if weights is None:
+        return _bidirectional_bfs(source._id, target._id, view, max_cost)
+    return _bidirectional_dijkstra(source._id, target._id, view, weights, max_cost)
+
+
+# ----------------------------------------------------------------------
+# Перелік шляхів
+# ----------------------------------------------------------------------
+
+def _relation_filter(relations: Optional[Iterable[RelationType]]) -> Optional[FrozenSet[RelationType]]:
+    return frozenset(relations) if relations is not None else None
+
+
+def _distinct_neighbors(view: RelationView, node_id: int,
+                        relations: Optional[FrozenSet[RelationType]]) -> Iterator[Tuple[RelationType, int]]:
+    """Сусіди без повторів (екземпляр підкласу видається IS-A для кожного батьківського класу)"""
+    seen: Set[Tuple[RelationType, int]] = set()
+    for step in view.neighbors(node_id, None, relations):
+        if step not in seen:
+            seen.add(step)
+            yield step
+
+
+def _named_path(nodes: List[int], relations: List[RelationType], store) -> List[str]:
+    """[ім'я, відношення, ім'я, ...] за id вершин та відношеннями між ними"""
+    path = [store.name_of(nodes[0])]
+    for relation, node_id in zip(relations, nodes[1:]):
+        path.append(RELATION_LABELS[relation])
+        path.append(store.name_of(node_id))
+    return path
+
+
+def _spur_path(view: RelationView, source_id: int, target_id: int,
+               blocked_nodes: Set[int], blocked_edges: Set[Tuple[RelationType, int]],
+               relations: Optional[FrozenSet[RelationType]],
+               weights: Optional[Dict[RelationType, float]]
+               ) -> Optional[Tuple[float, List[int], List[RelationType]]]:
+    """
+    Дейкстра source -> target в обхід заблокованих вершин та ребер з source
+
+    Returns:
+        (вартість, id вершин, відношення) або None
+    """
+    costs = {source_id: 0.0}
+    parents: Dict[int, Optional[Tuple[int, RelationType]]] = {source_id: None}
+    settled: Set[int] = set()
+    expanded_classes: Set[type] = set()
+    heap = [(0.0, source_id)]
+
+    while heap:
+        cost, node_id = heapq.heappop(heap)
+        if node_id in settled:
+            continue
+        settled.add(node_id)
+        if node_id == target_id:
+            nodes, path_relations = [node_id], []
+            link = parents[node_id]
+            while link is not None:
+                previous_id, relation = link
+                nodes.append(previous_id)
+                path_relations.append(relation)
+                link = parents[previous_id]
+            nodes.reverse()
+            path_relations.reverse()
+            return cost, nodes, path_relations
+
+        # Частина ребер з source заблокована - її класи не вважаються розширеними
+        restricted = node_id == source_id and blocked_edges
+        for relation, neighbor_id in view.neighbors(
+                node_id, None if restricted else expanded_classes, relations):
+            if neighbor_id in settled or neighbor_id in blocked_nodes:
+                continue
+            if restricted and (relation, neighbor_id) in blocked_edges:
+                continue
+            new_cost = cost + (weights.get(relation, 1.0) if weights else 1.0)
+            if new_cost < costs.get(neighbor_id, float("inf")):
+                costs[neighbor_id] = new_cost
+                parents[neighbor_id] = (node_id, relation)
+                heapq.heappush(heap, (new_cost, neighbor_id))
+    return None
+
+
+def k_shortest_paths(source: Entity, target: Entity,
+                     relations: Optional[Iterable[RelationType]] = None,
+                     weights: Optional[Dict[RelationType, float]] = None,
+                     view: Optional[RelationView] = None) -> Iterator[Tuple[float, List[str]]]:
+    """
+    Прості шляхи від source до target у порядку зростання вартості (алгоритм Йена)
+
+    Кожен наступний шлях обчислюється лише на запит, тож перші k коштують
+    O(k * довжина шляху) пошуків Дейкстри, а не повного перебору.
+
+    Args:
+        source: Початкова сутність
+        target: Цільова сутність
+        relations: Дозволені відношення (None - HAS-A, USES та IS-A)
+        weights: Вага кожного відношення (за замовчуванням 1)
+        view: Представлення графа
+
+    Yields:
+        (вартість, шлях)
+    """
+    if target._graph is not source._graph:
+        return
+    if source is target or source._id == target._id:
+        yield 0.0, [source.name]
+        return
+    view = view or view_for(source)
+    store = view.store
+    relations = _relation_filter(relations)
+    target_id = target._id
+
+    first = _spur_path(view, source._id, target_id, set(), set(), relations, weights)
+    if first is None:
+        return
+    accepted = [first]
+    yield first[0], _named_path(first[1], first[2], store)
+
+    candidates: List[Tuple[float, int, List[int], List[RelationType]]] = []
+    seen = {(tuple(first[1]), tuple(first[2]))}
+    order = count()
+    while True:
+        _, nodes, path_relations = accepted[-1]
+        root_cost = 0.0
+        for spur_index in range(len(nodes) - 1):
+            root_nodes = nodes[:spur_index + 1]
+            root_relations = path_relations[:spur_index]
+            # Ребра, якими прийняті шляхи з тим самим коренем виходять зі spur-вершини
+            blocked_edges = {(accepted_relations[spur_index], accepted_nodes[spur_index + 1])
+                             for _, accepted_nodes, accepted_relations in accepted
+                             if accepted_nodes[:spur_index + 1] == root_nodes
+                             and accepted_relations[:spur_index] == root_relations}
+            spur = _spur_path(view, nodes[spur_index], target_id, set(root_nodes[:-1]),
+                              blocked_edges, relations, weights)
+            if spur is not None:
+                spur_cost, spur_nodes, spur_relations = spur
+                candidate_nodes = root_nodes[:-1] + spur_nodes
+                candidate_relations = root_relations + spur_relations
+                key = (tuple(candidate_nodes), tuple(candidate_relations))
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(candidates, (root_cost + spur_cost, next(order),
+                                                candidate_nodes, candidate_relations))
+            relation = path_relations[spur_index]
+            root_cost += weights.get(relation, 1.0) if weights else 1.0
+
+        if not candidates:
+            return
+        cost, _, nodes, path_relations = heapq.heappop(candidates)
+        accepted.append((cost, nodes, path_relations))
+        yield cost, _named_path(nodes, path_relations, store)
+
+
+def simple_paths(source: Entity, target: Entity, max_depth: int = 5,
+                 relations: Optional[Iterable[RelationType]] = None,
+                 view: Optional[RelationView] = None) -> Iterator[List[str]]:
+    """
+    Всі прості шляхи (без повторних сутностей) від source до target
+
+    Ітеративний DFS зі стеком генераторів сусідів: шляхи видаються в
+    порядку обходу, пам'ять - O(max_depth). max_depth - як у find_path.
+    """
+    if max_depth <= 0 or target._graph is not source._graph:
+        return
+    if source is target or source._id == target._id:
+        yield [source.name]
+        return
+    view = view or view_for(source)
+    store = view.store
+    relations = _relation_filter(relations)
+    target_id = target._id
+
+    nodes, path_relations = [source._id], []
+    on_path = {source._id}
+    stack = [_distinct_neighbors(view, source._id, relations)]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            on_path.discard(nodes.pop())
+            if path_relations:
+                path_relations.pop()
+            continue
+        relation, neighbor_id = step
+        if neighbor_id in on_path:
+            continue
+        if neighbor_id == target_id:
+            yield _named_path(nodes + [neighbor_id], path_relations + [relation], store)
+            continue
+        if len(nodes) + 1 < max_depth:
+            nodes.append(neighbor_id)
+            path_relations.append(relation)
+            on_path.add(neighbor_id)
+            stack.append(_distinct_neighbors(view, neighbor_id, relations))
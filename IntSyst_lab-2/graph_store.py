@@ -0,0 +1,445 @@
+"""
+Компактне сховище графа онтології
+Щільні цілі id, інтерновані імена, відношення у форматі CSR (array('i'))
+"""
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Мінімальний розмір буфера нових ребер, після якого робимо ущільнення
+COMPACT_THRESHOLD = 4096
+
+# Скільки найбільш зв'язаних сутностей відстежується інкрементально
+TOP_DEGREES = 10
+
+
+class CSRRelation:
+    """
+    Одне відношення (HAS-A або USES) у форматі compressed sparse row
+
+    Ущільнена частина: offsets[id]..offsets[id + 1] - відсортований рядок
+    у targets. Нові ребра накопичуються у невідсортованих буферах по
+    вершинах і зливаються в CSR за потреби (compact).
+    """
+    __slots__ = ('offsets', 'targets', 'pending', 'pending_count')
+
+    def __init__(self):
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        self.pending: Dict[int, array] = {}
+        self.pending_count = 0
+
+    def __len__(self) -> int:
+        return len(self.targets) + self.pending_count
+
+    def row_bounds(self, node_id: int):
+        if node_id + 1 < len(self.offsets):
+            return self.offsets[node_id], self.offsets[node_id + 1]
+        return 0, 0
+
+    def contains(self, source: int, target: int) -> bool:
+        start, end = self.row_bounds(source)
+        pos = bisect_left(self.targets, target, start, end)
+        if pos < end and self.targets[pos] == target:
+            return True
+        buffer = self.pending.get(source)
+        return buffer is not None and target in buffer
+
+    def add(self, source: int, target: int) -> bool:
+        """Додає ребро; False, якщо воно вже є"""
+        if self.contains(source, target):
+            return False
+        self.append(source, target)
+        return True
+
+    def append(self, source: int, target: int) -> None:
+        """Додає ребро без перевірки на дублікат"""
+        buffer = self.pending.get(source)
+        if buffer is None:
+            buffer = self.pending[source] = array('i')
+        buffer.append(target)
+        self.pending_count += 1
+
+    def degree(self, node_id: int) -> int:
+        start, end = self.row_bounds(node_id)
+        buffer = self.pending.get(node_id)
+        return end - start + (len(buffer) if buffer is not None else 0)
+
+    def row(self, node_id: int) -> Sequence[int]:
+        """Сусіди вершини (ущільнений рядок + буфер)"""
+        start, end = self.row_bounds(node_id)
+        buffer = self.pending.get(node_id)
+        if buffer is None:
+            return self.targets[start:end]
+        return self.targets[start:end] + buffer
+
+    def needs_compaction(self, node_count: int) -> bool:
+        """Буфер більший за чверть графа - ущільнення амортизовано O(1) на ребро"""
+        return self.pending_count > max(COMPACT_THRESHOLD, (len(self.targets) + node_count) // 4)
+
+    def compact(self, node_count: int) -> None:
+        """
+        Зливає буфери в CSR; рядки з новими ребрами сортуються
+
+        Незмінені рядки між ними копіюються одним зрізом, їх зміщення
+        зсуваються на кількість вже вставлених ребер.
+        """
+        if not self.pending and len(self.offsets) == node_count + 1:
+            return
+        old_offsets, old_targets = self.offsets, self.targets
+        old_rows = len(old_offsets) - 1
+        # Рядки поза старим CSR порожні - зміщення як у кінці targets
+        if old_rows < node_count:
+            old_offsets = old_offsets + array('i', [old_offsets[-1]]) * (node_count - old_rows)
+        offsets = array('i')
+        targets = array('i')
+
+        row = 0
+        for node_id in sorted(self.pending):
+            # Незмінені рядки row..node_id-1
+            delta = len(targets) - old_offsets[row]
+            if delta:
+                offsets.extend(offset + delta for offset in old_offsets[row:node_id])
+            else:
+                offsets.extend(old_offsets[row:node_id])
+            start, end = old_offsets[row], old_offsets[node_id]
+            targets.extend(old_targets[start:end])
+
+            offsets.append(len(targets))
+            start, end = old_offsets[node_id], old_offsets[node_id + 1]
+            targets.extend(sorted(old_targets[start:end] + self.pending[node_id]))
+            row = node_id + 1
+
+        delta = len(targets) - old_offsets[row]
+        offsets.extend(offset + delta for offset in old_offsets[row:node_count + 1])
+        targets.extend(old_targets[old_offsets[row]:old_offsets[node_count]])
+
+        self.offsets = offsets
+        self.targets = targets
+        self.pending = {}
+        self.pending_count = 0
+
+
+class TopDegrees:
+    """
+    k вершин з найбільшим степенем (при рівності - з меншим id)
+
+    Степені лише зростають, тож вершина може потрапити до топу тільки в
+    момент власного оновлення: досить порівняти її з найгіршою в топі.
+    Оновлення - O(1), або O(k), якщо склад топу змінився. Вилучення
+    вершини з топу (витіснена сутність) позначає його застарілим -
+    він перебудовується повним проходом при наступному запиті.
+    """
+    __slots__ = ('k', 'members', 'floor', 'stale')
+
+    def __init__(self, k: int = TOP_DEGREES):
+        self.k = k
+        self.members: Dict[int, int] = {}         # id -> степінь
+        self.floor: Optional[Tuple[int, int]] = None   # найгірший (степінь, -id)
+        self.stale = False
+
+    def _update_floor(self) -> None:
+        self.floor = min((degree, -node_id) for node_id, degree in self.members.items())
+
+    def update(self, node_id: int, degree: int) -> None:
+        members = self.members
+        if node_id in members:
+            members[node_id] = degree
+            if self.floor[1] == -node_id:
+                self._update_floor()
+        elif len(members) < self.k:
+            members[node_id] = degree
+            self._update_floor()
+        elif (degree, -node_id) > self.floor:
+            del members[-self.floor[1]]
+            members[node_id] = degree
+            self._update_floor()
+
+    def discard(self, node_id: int) -> None:
+        if node_id in self.members:
+            self.stale = True
+
+    def rebuild(self, degrees: Sequence[int], alive: bytearray) -> None:
+        best = heapq.nlargest(self.k, ((degree, -node_id) for node_id, degree in enumerate(degrees)
+                                       if degree and alive[node_id]))
+        self.members = {-negative_id: degree for degree, negative_id in best}
+        self.floor = best[-1] if best else None
+        self.stale = False
+
+    def top(self) -> List[Tuple[int, int]]:
+        """[(id, степінь)] від найбільшого степеня"""
+        return [(node_id, degree) for node_id, degree in
+                sorted(self.members.items(), key=lambda item: (-item[1], item[0]))]
+
+
+class GraphStore:
+    """
+    Сховище сутностей онтології
+
+    Кожна сутність має щільний id; ім'я, тип та відношення зберігаються
+    тут, а об'єкти Entity - тонкі представлення (graph, id) над сховищем.
+    Перереєстрація імені створює новий id, старий стає "мертвим":
+    він лишається у графі (на нього можуть посилатися ребра), але зникає
+    з пошуку за іменем та з індексу типів.
+    """
+
+    def __init__(self, *relation_types):
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.entities: List[object] = []
+        self.alive = bytearray()
+        self.dead_count = 0
+
+        # Типи: код класу на кожен id
+        self.classes: List[type] = []
+        self.class_codes: Dict[type, int] = {}
+        self.lineages: List[tuple] = []          # код -> індексовані класи MRO
+        self.type_codes = array('H')
+
+        # Індекс типів: клас -> id (прямі та успадковані / лише прямі екземпляри)
+        self.members: Dict[type, array] = {}
+        self.direct_members: Dict[type, array] = {}
+        self.member_counts: Dict[type, int] = {}
+        self.direct_counts: Dict[type, int] = {}
+
+        # Живі лічильники: вихідний степінь вершини (всі відношення),
+        # ребра від живих вершин за відношенням, топ за степенем
+        self.degrees = array('i')
+        self.live_edges: Dict[object, int] = {relation: 0 for relation in relation_types}
+        self.top_degrees = TopDegrees()
+
+        self.relations: Dict[object, CSRRelation] = {
+            relation: CSRRelation() for relation in relation_types
+        }
+        # Зворотна суміжність: target -> source (ті самі ребра)
+        self.reverse: Dict[object, CSRRelation] = {
+            relation: CSRRelation() for relation in relation_types
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ------------------------------------------------------------------
+    # Вершини
+    # ------------------------------------------------------------------
+
+    def add_node(self, name: str, entity, base_class: type) -> int:
+        """
+        Реєструє сутність
+
+        Args:
+            name: Ім'я
+            entity: Об'єкт-представлення
+            base_class: Корінь ієрархії (класи вище нього не індексуються)
+
+        Returns:
+            Новий id
+        """
+        previous = self.name_ids.get(name)
+        if previous is not None:
+            self.retire(previous)
+
+        node_id = len(self.names)
+        self.names.append(name)
+        self.name_ids[name] = node_id
+        self.entities.append(entity)
+        self.alive.append(1)
+        self.degrees.append(0)
+
+        entity_type = type(entity)
+        code = self.class_codes.get(entity_type)
+        if code is None:
+            code = self.class_codes[entity_type] = len(self.classes)
+            self.classes.append(entity_type)
+            self.lineages.append(tuple(cls for cls in entity_type.__mro__
+                                       if issubclass(cls, base_class)))
+        self.type_codes.append(code)
+
+        members, member_counts = self.members, self.member_counts
+        for cls in self.lineages[code]:
+            bucket = members.get(cls)
+            if bucket is None:
+                bucket = members[cls] = array('i')
+            bucket.append(node_id)
+            member_counts[cls] = member_counts.get(cls, 0) + 1
+        self.direct_members.setdefault(entity_type, array('i')).append(node_id)
+        self.direct_counts[entity_type] = self.direct_counts.get(entity_type, 0) + 1
+        return node_id
+
+    def retire(self, node_id: int) -> None:
+        """Прибирає id з пошуку за іменем та з індексу типів"""
+        if not self.alive[node_id]:
+            return
+        self.alive[node_id] = 0
+        self.dead_count += 1
+        if self.name_ids.get(self.names[node_id]) == node_id:
+            del self.name_ids[self.names[node_id]]
+        code = self.type_codes[node_id]
+        for cls in self.lineages[code]:
+            self.member_counts[cls] -= 1
+        self.direct_counts[self.classes[code]] -= 1
+        for relation, store in self.relations.items():
+            self.live_edges[relation] -= store.degree(node_id)
+        self.top_degrees.discard(node_id)
+
+    @property
+    def live_count(self) -> int:
+        """Кількість живих сутностей"""
+        return len(self.names) - self.dead_count
+
+    def is_alive(self, node_id: int) -> bool:
+        return bool(self.alive[node_id])
+
+    def id_of(self, name: str) -> Optional[int]:
+        return self.name_ids.get(name)
+
+    def name_of(self, node_id: int) -> str:
+        return self.names[node_id]
+
+    def type_of(self, node_id: int) -> type:
+        return self.classes[self.type_codes[node_id]]
+
+    def entity(self, node_id: int):
+        return self.entities[node_id]
+
+    def ids(self) -> Iterator[int]:
+        """Живі id у порядку реєстрації"""
+        if not self.dead_count:
+            return iter(range(len(self.names)))
+        alive = self.alive
+        return (node_id for node_id in range(len(self.names)) if alive[node_id])
+
+    # ------------------------------------------------------------------
+    # Індекс типів
+    # ------------------------------------------------------------------
+
+    def instances_of(self, cls: type, direct: bool = False) -> Iterator[int]:
+        bucket = (self.direct_members if direct else self.members).get(cls)
+        if bucket is None:
+            return iter(())
+        if not self.dead_count:
+            return iter(bucket)
+        alive = self.alive
+        return (node_id for node_id in bucket if alive[node_id])
+
+    def iter_ids(self, cls: Optional[type] = None, direct: bool = False,
+                 after: Optional[int] = None) -> Iterator[int]:
+        """
+        Живі id (всі або екземпляри класу) у порядку реєстрації, починаючи
+        після курсора after; нічого не копіюється - відділи індексу типів
+        відсортовані за id, тож початок знаходиться бінарним пошуком
+        """
+        start = 0 if after is None else after + 1
+        alive = self.alive
+        if cls is None:
+            return (node_id for node_id in range(start, len(self.names)) if alive[node_id])
+        bucket = (self.direct_members if direct else self.members).get(cls)
+        if bucket is None:
+            return iter(())
+        return (bucket[position] for position in range(bisect_left(bucket, start), len(bucket))
+                if alive[bucket[position]])
+
+    def count_of(self, cls: type, direct: bool = False) -> int:
+        return (self.direct_counts if direct else self.member_counts).get(cls, 0)
+
+    def types(self) -> List[type]:
+        """Класи, що мають живі прямі екземпляри"""
+        return [cls for cls, count in self.direct_counts.items() if count]
+
+    # ------------------------------------------------------------------
+    # Ребра
+    # ------------------------------------------------------------------
+
+    def add_edge(self, relation, source: int, target: int) -> bool:
+        store = self.relations[relation]
+        if not store.add(source, target):
+            return False
+        reverse = self.reverse[relation]
+        reverse.append(target, source)
+        self._count_edge(relation, source)
+        node_count = len(self.names)
+        if store.needs_compaction(node_count):
+            store.compact(node_count)
+        if reverse.needs_compaction(node_count):
+            reverse.compact(node_count)
+        return True
+
+    def add_edges(self, relation, edges, compact: bool = True) -> int:
+        """
+        Пакетне додавання ребер (source, target)
+
+        Args:
+            compact: Ущільнити за потреби після пакета; False - залишити
+                ущільнення на потім (масове завантаження, див. compact())
+
+        Returns:
+            Кількість нових ребер (дублікати пропускаються)
+        """
+        store = self.relations[relation]
+        reverse = self.reverse[relation]
+        added = 0
+        for source, target in edges:
+            if store.add(source, target):
+                reverse.append(target, source)
+                self._count_edge(relation, source)
+                added += 1
+        if compact:
+            node_count = len(self.names)
+            for csr in (store, reverse):
+                if csr.needs_compaction(node_count):
+                    csr.compact(node_count)
+        return added
+
+    def _count_edge(self, relation, source: int) -> None:
+        self.degrees[source] += 1
+        if self.alive[source]:
+            self.live_edges[relation] += 1
+            self.top_degrees.update(source, self.degrees[source])
+
+    def has_edge(self, relation, source: int, target: int) -> bool:
+        return self.relations[relation].contains(source, target)
+
+    def successors(self, relation, node_id: int) -> Sequence[int]:
+        return self.relations[relation].row(node_id)
+
+    def predecessors(self, relation, node_id: int) -> Sequence[int]:
+        """Сутності, що мають відношення relation до node_id"""
+        return self.reverse[relation].row(node_id)
+
+    def degree(self, relation, node_id: int) -> int:
+        return self.relations[relation].degree(node_id)
+
+    def in_degree(self, relation, node_id: int) -> int:
+        return self.reverse[relation].degree(node_id)
+
+    def edge_count(self, relation) -> int:
+        return len(self.relations[relation])
+
+    def live_edge_count(self, relation) -> int:
+        """Кількість ребер від живих вершин"""
+        return self.live_edges[relation]
+
+    def most_connected(self, k: int) -> List[Tuple[int, int]]:
+        """
+        k живих вершин з найбільшим вихідним степенем, [(id, степінь)]
+        Для k <= TOP_DEGREES - з інкрементального топу за O(k)
+        """
+        top = self.top_degrees
+        if k > top.k:
+            best = heapq.nlargest(k, ((degree, -node_id) for node_id, degree in enumerate(self.degrees)
+                                      if degree and self.alive[node_id]))
+            return [(-negative_id, degree) for degree, negative_id in best]
+        if top.stale:
+            top.rebuild(self.degrees, self.alive)
+        return top.top()[:k]
+
+    def compact(self) -> None:
+        """Ущільнює всі відношення (напр. після масового завантаження)"""
+        for relation in self.relations:
+            self.relations[relation].compact(len(self.names))
+            self.reverse[relation].compact(len(self.names))
+
+    def clear(self) -> None:
+        self.__init__(*self.relations)
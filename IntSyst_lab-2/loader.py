@@ -0,0 +1,267 @@
+"""
+Потокове завантаження онтології з JSON-lines та CSV
+Запуск: python loader.py entities.jsonl relations.csv
+
+Формати записів:
+    сутність: {"type": "Dog", "name": "Рекс", "age": 5, "breed": "Вівчарка"}
+    відношення: {"subject": "Рекс", "relation": "has_a", "object": "Хвіст Рекса"}
+У CSV ті самі поля - колонки заголовка. Файл читається построково,
+тож пам'ять не залежить від розміру файлу (окрім самих сутностей).
+"""
+import argparse
+import csv
+import inspect
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, get_type_hints
+import entities
+from base import Entity, RelationType
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Назви відношень у файлах -> тип відношення (IS-A випливає з класів)
+RELATION_NAMES = {
+    "has_a": RelationType.HAS_A,
+    "has-a": RelationType.HAS_A,
+    "uses": RelationType.USES,
+}
+
+
+def entity_types() -> Dict[str, type]:
+    """Конкретні класи з entities.py за іменем"""
+    return {name: cls for name, cls in vars(entities).items()
+            if isinstance(cls, type) and issubclass(cls, Entity)
+            and not inspect.isabstract(cls)}
+
+
+def attribute_names(cls: type) -> Tuple[str, ...]:
+    """Атрибути сутності - всі __slots__ підкласів Entity"""
+    names = []
+    for klass in reversed(cls.__mro__):
+        if klass is not Entity and issubclass(klass, Entity):
+            names.extend(klass.__dict__.get('__slots__', ()))
+    return tuple(names)
+
+
+def _converter(annotation) -> Callable[[object], object]:
+    """Перетворення значення з файлу до типу параметра конструктора"""
+    if annotation in (int, float):
+        return lambda value: value if type(value) is annotation else annotation(value)
+    if annotation is str:
+        return lambda value: value if isinstance(value, str) else str(value)
+    return lambda value: value
+
+
+class LoadReport:
+    """Підсумок завантаження"""
+
+    def __init__(self):
+        self.rows = 0
+        self.entities = 0
+        self.relations = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"рядків: {self.rows}, сутностей: {self.entities}, "
+                f"відношень: {self.relations} (дублікатів: {self.duplicates}), "
+                f"помилок: {self.errors}, {self.seconds:.2f} с, "
+                f"{self.rows_per_sec:,.0f} рядків/с")
+
+
+class OntologyLoader:
+    """
+    Завантажувач сутностей та відношень
+
+    Відношення накопичуються пакетами і додаються прямо у сховище за id;
+    спостерігачі (індекс досяжності тощо) від'єднані на час завантаження
+    і перебудовуються один раз наприкінці (Entity.bulk_update).
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, strict: bool = False):
+        """
+        Args:
+            batch_size: Кількість відношень в одному пакеті
+            strict: Кидати ValueError на некоректному записі (інакше - пропустити)
+        """
+        self.batch_size = batch_size
+        self.strict = strict
+        self.types = entity_types()
+        self._constructors: Dict[type, List[Tuple[str, Callable, bool]]] = {}
+        self._pending: Dict[RelationType, List[Tuple[str, str]]] = {
+            RelationType.HAS_A: [], RelationType.USES: []
+        }
+        self._pending_count = 0
+        self.report = LoadReport()
+
+    # ------------------------------------------------------------------
+    # Читання файлів
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def read_jsonl(path: str) -> Iterator[dict]:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    @staticmethod
+    def read_csv(path: str) -> Iterator[dict]:
+        with open(path, encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                # Порожні клітинки - відсутні значення
+                yield {key: value for key, value in row.items() if value not in ("", None)}
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[dict]:
+        """Записи файлу; формат визначається за розширенням"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            return cls.read_csv(path)
+        if extension in (".jsonl", ".ndjson", ".json"):
+            return cls.read_jsonl(path)
+        raise ValueError(f"Невідомий формат файлу: {path}")
+
+    # ------------------------------------------------------------------
+    # Записи
+    # ------------------------------------------------------------------
+
+    def _parameters(self, cls: type) -> List[Tuple[str, Callable, bool]]:
+        """(ім'я, перетворення, обов'язковий) для параметрів конструктора"""
+        parameters = self._constructors.get(cls)
+        if parameters is None:
+            hints = get_type_hints(cls.__init__)
+            signature = inspect.signature(cls.__init__)
+            parameters = [(name, _converter(hints.get(name)),
+                           param.default is inspect.Parameter.empty)
+                          for name, param in list(signature.parameters.items())[1:]]
+            self._constructors[cls] = parameters
+        return parameters
+
+    def _fail(self, message: str) -> None:
+        self.report.errors += 1
+        if self.strict:
+            raise ValueError(message)
+
+    def add_entity(self, record: dict) -> Optional[Entity]:
+        """Створює сутність із запису {"type": ..., "name": ..., атрибути}"""
+        cls = self.types.get(record.get("type"))
+        if cls is None:
+            self._fail(f"Невідомий тип: {record.get('type')!r}")
+            return None
+
+        kwargs = {}
+        for name, convert, required in self._parameters(cls):
+            if name in record:
+                try:
+                    kwargs[name] = convert(record[name])
+                except (TypeError, ValueError):
+                    self._fail(f"{record.get('name')!r}: некоректне значення {name}={record[name]!r}")
+                    return None
+            elif required:
+                self._fail(f"{record.get('name')!r}: відсутнє поле {name}")
+                return None
+
+        self.report.entities += 1
+        return cls(**kwargs)
+
+    def add_relation(self, record: dict) -> None:
+        """Додає відношення до поточного пакета"""
+        relation = RELATION_NAMES.get(str(record.get("relation", "")).lower())
+        if relation is None:
+            self._fail(f"Невідоме відношення: {record.get('relation')!r}")
+            return
+        subject, obj = record.get("subject"), record.get("object")
+        if subject is None or obj is None:
+            self._fail(f"Відношення без subject/object: {record!r}")
+            return
+        self._pending[relation].append((subject, obj))
+        self._pending_count += 1
+        if self._pending_count >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Додає накопичені відношення у сховище"""
+        store = Entity._store
+        id_of = store.id_of
+        for relation, pairs in self._pending.items():
+            if not pairs:
+                continue
+            edges = []
+            for subject, obj in pairs:
+                source, target = id_of(subject), id_of(obj)
+                if source is None or target is None:
+                    self._fail(f"Відношення з невідомою сутністю: {subject!r} -> {obj!r}")
+                    continue
+                edges.append((source, target))
+            # Ущільнення - один раз наприкінці (Entity.bulk_update)
+            added = store.add_edges(relation, edges, compact=False)
+            self.report.relations += added
+            self.report.duplicates += len(edges) - added
+            pairs.clear()
+        self._pending_count = 0
+
+    def add_record(self, record: dict) -> None:
+        self.report.rows += 1
+        if "relation" in record:
+            self.add_relation(record)
+        else:
+            self.add_entity(record)
+
+    # ------------------------------------------------------------------
+    # Завантаження
+    # ------------------------------------------------------------------
+
+    def load_records(self, records: Iterable[dict]) -> LoadReport:
+        """
+        Завантажує потік записів
+
+        Відношення можуть посилатися лише на сутності, завантажені раніше
+        (в тому ж чи попередньому потоці).
+        """
+        started = time.perf_counter()
+        with Entity.bulk_update():
+            for record in records:
+                self.add_record(record)
+            self.flush()
+        self.report.seconds += time.perf_counter() - started
+        return self.report
+
+    def load(self, *paths: str) -> LoadReport:
+        """Завантажує файли по черзі (спершу файли сутностей)"""
+        for path in paths:
+            self.load_records(self.read(path))
+        return self.report
+
+
+def load(*paths: str, batch_size: int = DEFAULT_BATCH_SIZE, strict: bool = False) -> LoadReport:
+    """Завантажує онтологію з файлів JSON-lines / CSV"""
+    return OntologyLoader(batch_size, strict).load(*paths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Завантаження онтології з JSON-lines / CSV")
+    parser.add_argument('paths', nargs='+', help="файли сутностей, потім відношень")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--strict', action='store_true', help="зупинятися на першій помилці")
+    args = parser.parse_args(argv)
+
+    try:
+        report = load(*args.paths, batch_size=args.batch_size, strict=args.strict)
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}")
+        return 1
+    print(f"✅ {report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
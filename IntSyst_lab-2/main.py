@@ -8,6 +8,8 @@ from entities import (
     Car, Bus, Engine, Wheel,
     Tail, Fur
 )
+from base import Entity
+from pattern_query import ontology_classes
 from query import OntologyQuery
 
 
@@ -223,6 +225,22 @@ def demo_custom_queries():
             print(f"   • {vehicle.describe()}")
 
 
+def resolve_name(text: str) -> str:
+    """
+    Ім'я сутності з введеного тексту (без урахування регістру)
+    Якщо такого імені немає - виводить схожі імена та повертає текст як є
+    """
+    text = text.strip()
+    index = Entity.get_name_index()
+    name = index.resolve(text)
+    if name is not None:
+        return name
+    suggestions = [suggestion for _, suggestion in index.fuzzy(text)]
+    if suggestions:
+        print(f"💡 Можливо, ви мали на увазі: {', '.join(suggestions)}")
+    return text
+
+
 def interactive_mode():
     """Інтерактивний режим запитів"""
     print("\n" + "=" * 70)
@@ -233,14 +251,26 @@ def interactive_mode():
     print("  hierarchy <сутність>         - показати ієрархію")
     print("  parts <сутність>             - показати частини")
     print("  uses <сутність>              - показати використання")
+    print("  owners <сутність>            - частиною чого є сутність")
+    print("  users <сутність>             - хто використовує сутність")
     print("  analyze <сутність>           - повний аналіз")
-    print("  list                         - список всіх сутностей")
+    print("  query <шаблони>              - запит, напр. ?x IS-A Driver . ?x USES ?v")
+    print("  complete <початок імені>     - імена з таким початком")
+    print("  list [клас]                  - список сутностей (посторінково)")
+    print("  more                         - наступна сторінка списку")
     print("  stats                        - статистика")
     print("  exit                         - вихід")
     
+    # Повторні запити відповідаються з кешу
+    OntologyQuery.enable_query_cache()
+    
+    # Поточний посторінковий список: клас та курсор наступної сторінки
+    listing_type, listing_cursor = None, None
+    
     while True:
         try:
-            cmd = input("\n> ").strip().lower()
+            raw = input("\n> ").strip()
+            cmd = raw.lower()
             
             if not cmd:
                 continue
@@ -249,53 +279,60 @@ def interactive_mode():
                 print("До побачення! 👋")
                 break
             
-            elif cmd == "list":
-                OntologyQuery.show_all_entities(group_by_type=True)
+            elif cmd == "list" or cmd.startswith("list "):
+                type_name = raw[4:].strip()
+                classes = {name.casefold(): cls for name, cls in ontology_classes().items()}
+                listing_type = classes.get(type_name.casefold()) if type_name else None
+                if type_name and listing_type is None:
+                    print(f"❌ Невідомий клас: {type_name}")
+                    continue
+                listing_cursor = OntologyQuery.show_entities_page(listing_type)
+            
+            elif cmd == "more":
+                if listing_cursor is None:
+                    print("❌ Немає наступної сторінки (спершу 'list')")
+                    continue
+                listing_cursor = OntologyQuery.show_entities_page(listing_type, listing_cursor)
             
             elif cmd == "stats":
                 OntologyQuery.statistics()
+                print(f"🗄️  Кеш запитів: {OntologyQuery.cache}")
             
             elif cmd.startswith("find "):
-                parts = cmd.split()
+                parts = raw.split()
                 if len(parts) >= 3:
-                    from base import Entity
-                    entity1 = " ".join(parts[1:-1])
-                    entity2 = parts[-1]
-                    # Спробуємо знайти з великої літери
-                    entities = {e.name.lower(): e.name for e in Entity.get_all_instances()}
-                    entity1_real = entities.get(entity1.lower(), entity1)
-                    entity2_real = entities.get(entity2.lower(), entity2)
-                    OntologyQuery.find_connection(entity1_real, entity2_real)
+                    # Імена можуть містити пробіли - шукаємо поділ на два відомих імені
+                    pair = Entity.get_name_index().split_pair(" ".join(parts[1:]))
+                    if pair is None:
+                        pair = (resolve_name(" ".join(parts[1:-1])), resolve_name(parts[-1]))
+                    OntologyQuery.find_connection(*pair)
                 else:
                     print("❌ Використання: find <сутність1> <сутність2>")
             
             elif cmd.startswith("hierarchy "):
-                from base import Entity
-                entity_name = cmd[10:].strip()
-                entities = {e.name.lower(): e.name for e in Entity.get_all_instances()}
-                entity_real = entities.get(entity_name.lower(), entity_name)
-                OntologyQuery.show_hierarchy(entity_real)
+                OntologyQuery.show_hierarchy(resolve_name(raw[10:]))
             
             elif cmd.startswith("parts "):
-                from base import Entity
-                entity_name = cmd[6:].strip()
-                entities = {e.name.lower(): e.name for e in Entity.get_all_instances()}
-                entity_real = entities.get(entity_name.lower(), entity_name)
-                OntologyQuery.show_parts(entity_real)
+                OntologyQuery.show_parts(resolve_name(raw[6:]))
             
             elif cmd.startswith("uses "):
-                from base import Entity
-                entity_name = cmd[5:].strip()
-                entities = {e.name.lower(): e.name for e in Entity.get_all_instances()}
-                entity_real = entities.get(entity_name.lower(), entity_name)
-                OntologyQuery.show_usage(entity_real)
+                OntologyQuery.show_usage(resolve_name(raw[5:]))
+            
+            elif cmd.startswith("owners "):
+                OntologyQuery.show_owners(resolve_name(raw[7:]))
+            
+            elif cmd.startswith("users "):
+                OntologyQuery.show_users(resolve_name(raw[6:]))
             
             elif cmd.startswith("analyze "):
-                from base import Entity
-                entity_name = cmd[8:].strip()
-                entities = {e.name.lower(): e.name for e in Entity.get_all_instances()}
-                entity_real = entities.get(entity_name.lower(), entity_name)
-                OntologyQuery.analyze_entity(entity_real)
+                OntologyQuery.analyze_entity(resolve_name(raw[8:]))
+            
+            elif cmd.startswith("complete "):
+                completions = Entity.get_name_index().complete(raw[9:].strip())
+                print("   " + (", ".join(completions) if completions else "(немає збігів)"))
+            
+            elif cmd.startswith("query "):
+                OntologyQuery.show_matches(raw[6:].strip())
             
             else:
                 print("❌ Невідома команда. Введіть 'exit' для виходу.")
@@ -0,0 +1,159 @@
+"""
+Індекс імен сутностей: пошук без урахування регістру, за префіксом та з одруківками
+"""
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Символ, більший за будь-який інший - верхня межа діапазону ключів з префіксом
+_MAX_CHAR = "\U0010ffff"
+
+
+def fold(text: str) -> str:
+    """Ключ імені: без урахування регістру та зайвих пробілів"""
+    return " ".join(text.split()).casefold()
+
+
+class NameIndex:
+    """
+    Ключ (fold) -> оригінальні імена; ключі також зберігаються
+    відсортованими - це неявне префіксне дерево: всі ключі з префіксом p
+    займають суцільний діапазон [p, p + _MAX_CHAR).
+
+    Нові ключі накопичуються в буфері і зливаються з відсортованим
+    списком при першому запиті за префіксом / з одруківками (як буфери
+    ребер у CSRRelation), тож реєстрація сутності - O(довжини імені).
+    """
+
+    def __init__(self):
+        self._names: Dict[str, List[str]] = {}
+        self._sorted: List[str] = []
+        self._pending: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str) -> None:
+        key = fold(name)
+        originals = self._names.get(key)
+        if originals is None:
+            self._names[key] = [name]
+            self._pending.append(key)
+        elif name not in originals:
+            originals.append(name)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def _keys(self) -> List[str]:
+        """Відсортовані ключі (з урахуванням буфера)"""
+        if self._pending:
+            # Timsort зливає відсортований список з відсортованим буфером за O(n)
+            self._pending.sort()
+            self._sorted += self._pending
+            self._sorted.sort()
+            self._pending = []
+        return self._sorted
+
+    # ------------------------------------------------------------------
+    # Пошук
+    # ------------------------------------------------------------------
+
+    def lookup(self, text: str) -> List[str]:
+        """Всі імена, що збігаються з text без урахування регістру"""
+        return list(self._names.get(fold(text), ()))
+
+    def resolve(self, text: str) -> Optional[str]:
+        """
+        Точне ім'я для введеного тексту
+
+        Returns:
+            text, якщо таке ім'я є; інакше - єдине ім'я, що збігається без
+            урахування регістру; None - немає або неоднозначно
+        """
+        originals = self._names.get(fold(text))
+        if not originals:
+            return None
+        if text in originals:
+            return text
+        return originals[0] if len(originals) == 1 else None
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Імена, що починаються з prefix (у порядку ключів)"""
+        key = fold(prefix)
+        keys = self._keys()
+        completions = []
+        for position in range(bisect_left(keys, key), len(keys)):
+            if not keys[position].startswith(key) or len(completions) >= limit:
+                break
+            completions.extend(self._names[keys[position]])
+        return completions[:limit]
+
+    def fuzzy(self, text: str, max_distance: int = 2, limit: int = 5) -> List[Tuple[int, str]]:
+        """
+        Імена на відстані редагування (Левенштейна) не більше max_distance
+
+        Обхід відсортованих ключів як префіксного дерева: рядки таблиці
+        відстаней для спільного з попереднім ключем префікса повторно
+        використовуються, а піддерево відкидається цілком, щойно всі
+        значення рядка перевищили max_distance.
+
+        Returns:
+            [(відстань, ім'я)] від найближчих
+        """
+        query = fold(text)
+        keys = self._keys()
+        matches: List[Tuple[int, str]] = []
+        rows = [list(range(len(query) + 1))]     # rows[k] - для prefix[:k]
+        prefix = ""
+        position = 0
+        while position < len(keys):
+            key = keys[position]
+            common = 0
+            limit_common = min(len(prefix), len(key))
+            while common < limit_common and prefix[common] == key[common]:
+                common += 1
+            del rows[common + 1:]
+
+            pruned = False
+            for depth in range(common, len(key)):
+                char = key[depth]
+                previous = rows[-1]
+                row = [previous[0] + 1]
+                for column in range(1, len(query) + 1):
+                    row.append(min(row[column - 1] + 1, previous[column] + 1,
+                                   previous[column - 1] + (query[column - 1] != char)))
+                rows.append(row)
+                if min(row) > max_distance:
+                    pruned = True
+                    break
+
+            if pruned:
+                # Жоден ключ з цим префіксом не підходить
+                prefix = key[:len(rows) - 1]
+                position = bisect_left(keys, prefix + _MAX_CHAR, position + 1)
+                continue
+            prefix = key
+            distance = rows[-1][-1]
+            if distance <= max_distance:
+                matches.extend((distance, name) for name in self._names[key])
+            position += 1
+
+        matches.sort()
+        return matches[:limit]
+
+    def split_pair(self, text: str) -> Optional[Tuple[str, str]]:
+        """
+        Ділить "ім'я1 ім'я2" (імена можуть містити пробіли) на два відомих імені
+
+        Returns:
+            (ім'я1, ім'я2) або None
+        """
+        words = text.split()
+        for split in range(1, len(words)):
+            first = self.resolve(" ".join(words[:split]))
+            if first is None:
+                continue
+            second = self.resolve(" ".join(words[split:]))
+            if second is not None:
+                return first, second
+        return None
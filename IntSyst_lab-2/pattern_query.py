@@ -0,0 +1,324 @@
+"""
+Мова запитів за шаблонами трійок
+Приклад: ?x IS-A Driver . ?x USES ?v . ?v HAS-A ?e
+
+Кожен шаблон - "суб'єкт відношення об'єкт"; шаблони розділяються " . ".
+Терми: ?змінна, ім'я сутності (в лапках, якщо містить пробіли) або,
+для об'єкта IS-A, ім'я класу. Відношення: HAS-A, USES, IS-A.
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from base import Entity, RelationType
+
+# Назви відношень у запитах
+RELATION_TOKENS = {
+    "HAS-A": RelationType.HAS_A,
+    "HAS_A": RelationType.HAS_A,
+    "USES": RelationType.USES,
+    "IS-A": RelationType.IS_A,
+    "IS_A": RelationType.IS_A,
+}
+
+_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+# Середня кількість класів онтології на сутність (оцінка для IS-A без прив'язок)
+_LINEAGE_ESTIMATE = 4
+
+
+class Variable:
+    """Змінна шаблону (?ім'я)"""
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Variable) and other.name == self.name
+
+    def __hash__(self):
+        return hash(('?', self.name))
+
+    def __repr__(self):
+        return f"?{self.name}"
+
+
+Term = Union[Variable, str]
+
+
+class Pattern:
+    """Один шаблон трійки"""
+    __slots__ = ('subject', 'relation', 'object')
+
+    def __init__(self, subject: Term, relation: RelationType, obj: Term):
+        self.subject = subject
+        self.relation = relation
+        self.object = obj
+
+    def variables(self) -> List[Variable]:
+        return [term for term in (self.subject, self.object) if isinstance(term, Variable)]
+
+    def __repr__(self):
+        def show(term):
+            if isinstance(term, Variable) or " " not in term:
+                return str(term)
+            return f'"{term}"'
+        label = next(token for token, relation in RELATION_TOKENS.items()
+                     if relation is self.relation)
+        return f"{show(self.subject)} {label} {show(self.object)}"
+
+
+def ontology_classes() -> Dict[str, type]:
+    """Всі класи онтології (нащадки Entity) за іменем"""
+    classes = {Entity.__name__: Entity}
+    pending = [Entity]
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            if subclass.__name__ not in classes:
+                classes[subclass.__name__] = subclass
+                pending.append(subclass)
+    return classes
+
+
+def parse(text: str) -> List[Pattern]:
+    """
+    Розбирає текст запиту
+
+    Raises:
+        ValueError: Синтаксична помилка
+    """
+    patterns = []
+    terms: List[Term] = []
+    relation = None
+
+    def finish():
+        if not terms and relation is None:
+            return
+        if len(terms) != 2 or relation is None:
+            raise ValueError(f"Шаблон має бути 'суб'єкт відношення об'єкт': {text!r}")
+        patterns.append(Pattern(terms[0], relation, terms[1]))
+
+    for match in _TOKEN.finditer(text):
+        quoted, bare = match.groups()
+        if bare == ".":
+            finish()
+            terms, relation = [], None
+            continue
+        if quoted is None and len(terms) == 1 and relation is None:
+            relation = RELATION_TOKENS.get(bare.upper())
+            if relation is None:
+                raise ValueError(f"Невідоме відношення: {bare!r}")
+            continue
+        if len(terms) == 2:
+            raise ValueError(f"Бракує ' . ' між шаблонами перед {match.group(0)!r}")
+        if quoted is None and bare.startswith("?"):
+            if len(bare) == 1:
+                raise ValueError("Порожнє ім'я змінної")
+            terms.append(Variable(bare[1:]))
+        else:
+            terms.append(quoted if quoted is not None else bare)
+    finish()
+
+    if not patterns:
+        raise ValueError("Порожній запит")
+    return patterns
+
+
+class PatternQuery:
+    """
+    Запит із кількох шаблонів над GraphStore
+
+    Індекси:
+        SPO - прямі рядки CSR (суб'єкт -> відношення -> відсортовані об'єкти,
+              перевірка трійки бінарним пошуком);
+        POS / OSP - зворотна суміжність сховища (об'єкт -> відношення -> суб'єкти);
+        IS-A - індекс типів (клас -> екземпляри) та MRO класу сутності.
+    Планувальник жадібно обирає наступним шаблон з найменшою оцінкою
+    кількості результатів з урахуванням вже прив'язаних змінних;
+    результати видаються ліниво (вкладені цикли генераторів).
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.patterns = parse(text)
+        self._classes = ontology_classes()
+        self._lineages: Dict[type, Tuple[type, ...]] = {}
+
+    # ------------------------------------------------------------------
+    # Терми
+    # ------------------------------------------------------------------
+
+    def _class(self, name: str) -> type:
+        cls = self._classes.get(name)
+        if cls is None:
+            raise ValueError(f"Невідомий клас: {name!r}")
+        return cls
+
+    def _lineage(self, entity_type: type) -> Tuple[type, ...]:
+        """Класи онтології, екземпляром яких є сутність типу entity_type"""
+        lineage = self._lineages.get(entity_type)
+        if lineage is None:
+            lineage = tuple(cls for cls in entity_type.__mro__ if issubclass(cls, Entity))
+            self._lineages[entity_type] = lineage
+        return lineage
+
+    def _resolve(self, pattern: Pattern, term: Term, store, is_object: bool):
+        """Константа -> id сутності (або клас для об'єкта IS-A); None - не існує"""
+        if is_object and pattern.relation is RelationType.IS_A:
+            return self._class(term)
+        return store.id_of(term)
+
+    # ------------------------------------------------------------------
+    # Планування
+    # ------------------------------------------------------------------
+
+    def _estimate(self, pattern: Pattern, bound: set, store) -> float:
+        """Оцінка кількості рядків, які видасть шаблон"""
+        subject_known = not isinstance(pattern.subject, Variable) or pattern.subject in bound
+        object_known = not isinstance(pattern.object, Variable) or pattern.object in bound
+        node_count = max(len(store.name_ids), 1)
+
+        if pattern.relation is RelationType.IS_A:
+            if subject_known:
+                return 1 if object_known else _LINEAGE_ESTIMATE
+            if not isinstance(pattern.object, Variable):
+                return store.count_of(self._class(pattern.object))
+            if object_known:
+                return node_count / max(len(self._classes), 1)
+            return node_count * _LINEAGE_ESTIMATE
+
+        if subject_known and object_known:
+            return 1
+        edges = store.edge_count(pattern.relation)
+        if subject_known:
+            if not isinstance(pattern.subject, Variable):
+                node_id = store.id_of(pattern.subject)
+                return store.degree(pattern.relation, node_id) if node_id is not None else 0
+            return edges / node_count
+        if object_known:
+            if not isinstance(pattern.object, Variable):
+                node_id = store.id_of(pattern.object)
+                return store.in_degree(pattern.relation, node_id) if node_id is not None else 0
+            return edges / node_count
+        return edges
+
+    def plan(self, store=None) -> List[Tuple[Pattern, float]]:
+        """Порядок виконання шаблонів з оцінками"""
+        store = store if store is not None else Entity._store
+        remaining = list(self.patterns)
+        bound: set = set()
+        plan = []
+        while remaining:
+            # Спершу шаблони, зв'язані з уже прив'язаними змінними (без декартових добутків)
+            connected = [pattern for pattern in remaining
+                         if any(variable in bound for variable in pattern.variables())]
+            candidates = connected or remaining
+            estimates = [(self._estimate(pattern, bound, store), position)
+                         for position, pattern in enumerate(candidates)]
+            estimate, position = min(estimates)
+            pattern = candidates[position]
+            remaining.remove(pattern)
+            bound.update(pattern.variables())
+            plan.append((pattern, estimate))
+        return plan
+
+    def explain(self, store=None) -> List[str]:
+        return [f"{step}. {pattern!r}  (~{estimate:.3g})"
+                for step, (pattern, estimate) in enumerate(self.plan(store), 1)]
+
+    # ------------------------------------------------------------------
+    # Виконання
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bind(binding: dict, term: Term, value) -> Optional[dict]:
+        """Прив'язує змінну; None - якщо вона вже має інше значення"""
+        current = binding.get(term)
+        if current is None:
+            extended = dict(binding)
+            extended[term] = value
+            return extended
+        return binding if current == value else None
+
+    def _value(self, pattern: Pattern, term: Term, binding: dict, store, is_object: bool):
+        if isinstance(term, Variable):
+            return binding.get(term)
+        return self._resolve(pattern, term, store, is_object)
+
+    def _match(self, pattern: Pattern, binding: dict, store) -> Iterator[dict]:
+        """Всі розширення прив'язки, що задовольняють шаблон"""
+        subject = self._value(pattern, pattern.subject, binding, store, False)
+        obj = self._value(pattern, pattern.object, binding, store, True)
+        subject_fixed = not isinstance(pattern.subject, Variable) or subject is not None
+        object_fixed = not isinstance(pattern.object, Variable) or obj is not None
+        if (subject_fixed and subject is None) or (object_fixed and obj is None):
+            return  # Константа не існує
+        alive = store.alive
+
+        if pattern.relation is RelationType.IS_A:
+            if subject_fixed:
+                lineage = self._lineage(store.type_of(subject))
+                if object_fixed:
+                    if obj in lineage:
+                        yield binding
+                    return
+                for cls in lineage:
+                    yield self._bind(binding, pattern.object, cls)
+                return
+            if object_fixed:
+                for node_id in store.instances_of(obj):
+                    yield self._bind(binding, pattern.subject, node_id)
+                return
+            for node_id in store.ids():
+                extended = self._bind(binding, pattern.subject, node_id)
+                for cls in self._lineage(store.type_of(node_id)):
+                    result = self._bind(extended, pattern.object, cls)
+                    if result is not None:
+                        yield result
+            return
+
+        relation = pattern.relation
+        if subject_fixed and object_fixed:
+            if store.has_edge(relation, subject, obj):
+                yield binding
+        elif subject_fixed:
+            for target in store.successors(relation, subject):
+                if alive[target]:
+                    result = self._bind(binding, pattern.object, target)
+                    if result is not None:
+                        yield result
+        elif object_fixed:
+            for source in store.predecessors(relation, obj):
+                if alive[source]:
+                    result = self._bind(binding, pattern.subject, source)
+                    if result is not None:
+                        yield result
+        else:
+            for source in store.ids():
+                extended = self._bind(binding, pattern.subject, source)
+                for target in store.successors(relation, source):
+                    if alive[target]:
+                        result = self._bind(extended, pattern.object, target)
+                        if result is not None:
+                            yield result
+
+    def _execute(self, plan: List[Pattern], step: int, binding: dict, store) -> Iterator[dict]:
+        if step == len(plan):
+            yield binding
+            return
+        for extended in self._match(plan[step], binding, store):
+            yield from self._execute(plan, step + 1, extended, store)
+
+    def execute(self, store=None) -> Iterator[Dict[str, object]]:
+        """
+        Ліниво видає результати: {ім'я змінної: сутність або клас}
+        """
+        store = store if store is not None else Entity._store
+        plan = [pattern for pattern, _ in self.plan(store)]
+        for binding in self._execute(plan, 0, {}, store):
+            yield {variable.name: (value if isinstance(value, type) else store.entity(value))
+                   for variable, value in binding.items()}
+
+
+def select(text: str, store=None) -> Iterator[Dict[str, object]]:
+    """Виконує запит за шаблонами (див. PatternQuery)"""
+    return PatternQuery(text).execute(store)
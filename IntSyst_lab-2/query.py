@@ -3,14 +3,93 @@
 Виконання складних запитів та аналізу зв'язків
 """
 from base import Entity, RelationType
-from typing import List, Dict, Set, Optional
+from connectivity import ConnectivityMatrix, connectivity_matrix
+from graph import iter_reachable, k_shortest_paths, shortest_path, simple_paths
+from pattern_query import PatternQuery
+from query_cache import DEFAULT_CAPACITY, QueryCache, weights_key
+from reachability import ReachabilityIndex
+from itertools import islice
+from typing import List, Dict, Set, Optional, Iterable, Iterator, Tuple
+
+
+# Кількість сутностей на сторінці списку
+PAGE_SIZE = 20
 
 
 class OntologyQuery:
     """Система для виконання запитів до онтології"""
     
+    # Необов'язковий індекс досяжності (див. enable_reachability_index)
+    reachability: Optional[ReachabilityIndex] = None
+    # Необов'язковий кеш результатів (див. enable_query_cache)
+    cache: Optional[QueryCache] = None
+    
+    @staticmethod
+    def enable_reachability_index() -> ReachabilityIndex:
+        """Будує індекс досяжності та підписує його на зміни онтології"""
+        if OntologyQuery.reachability is None:
+            index = ReachabilityIndex()
+            index.build()
+            Entity.add_listener(index)
+            OntologyQuery.reachability = index
+        return OntologyQuery.reachability
+    
+    @staticmethod
+    def disable_reachability_index() -> None:
+        if OntologyQuery.reachability is not None:
+            Entity.remove_listener(OntologyQuery.reachability)
+            OntologyQuery.reachability = None
+    
     @staticmethod
-    def find_connection(entity1_name: str, entity2_name: str, verbose: bool = True) -> tuple[bool, List[str]]:
+    def enable_query_cache(capacity: int = DEFAULT_CAPACITY) -> QueryCache:
+        """
+        Вмикає LRU-кеш для find_connection, find_shortest_path та
+        find_all_connections; кеш підписується на зміни онтології
+        """
+        if OntologyQuery.cache is None:
+            cache = QueryCache(capacity)
+            Entity.add_listener(cache)
+            OntologyQuery.cache = cache
+        return OntologyQuery.cache
+    
+    @staticmethod
+    def disable_query_cache() -> None:
+        if OntologyQuery.cache is not None:
+            Entity.remove_listener(OntologyQuery.cache)
+            OntologyQuery.cache = None
+    
+    @staticmethod
+    def _cached(key: tuple, compute):
+        """Результат compute() з кешу запитів (якщо він увімкнений)"""
+        cache = OntologyQuery.cache
+        if cache is None:
+            return compute()
+        found, value = cache.get(key)
+        if not found:
+            value = compute()
+            cache.put(key, value)
+        return value
+    
+    @staticmethod
+    def attach_backend(backend) -> None:
+        """
+        Підключає сховище (SQLiteGraph, SnapshotGraph): сутності, яких немає
+        в пам'яті, завантажуються з нього ліниво, а пошук зв'язку між ними
+        виконує саме сховище (рекурсивний CTE / BFS над масивами знімка)
+        """
+        Entity.attach_backend(backend)
+        if OntologyQuery.cache is not None:
+            OntologyQuery.cache.invalidate()
+    
+    @staticmethod
+    def detach_backend(backend) -> None:
+        Entity.detach_backend(backend)
+        if OntologyQuery.cache is not None:
+            OntologyQuery.cache.invalidate()
+    
+    @staticmethod
+    def find_connection(entity1_name: str, entity2_name: str, verbose: bool = True,
+                        with_path: bool = True, max_depth: Optional[int] = 5) -> tuple[bool, List[str]]:
         """
         Знаходить зв'язок між двома сутностями
         
@@ -18,6 +97,11 @@ class OntologyQuery:
             entity1_name: Ім'я першої сутності
             entity2_name: Ім'я другої сутності
             verbose: Чи виводити детальну інформацію
+            with_path: Чи потрібен шлях (False - лише так/ні, шлях порожній)
+            max_depth: Максимальна кількість сутностей у шляху (None - без обмеження).
+                Увімкнений індекс досяжності одразу відкидає недосяжні пари; для
+                with_path=False і max_depth=None відповідь береться з індексу за O(1),
+                інакше обмеження глибини перевіряє пошук шляху
             
         Returns:
             (чи є зв'язок, шлях зв'язку)
@@ -39,17 +123,151 @@ class OntologyQuery:
             print(f"   {entity1.describe()}")
             print(f"   {entity2.describe()}")
         
-        is_related, path = entity1.is_related_to(entity2)
+        key = ("connection", entity1_name, entity2_name, with_path, max_depth)
+        is_related, path = OntologyQuery._cached(
+            key, lambda: OntologyQuery._connection(entity1, entity2, with_path, max_depth))
+        path = list(path)
         
         if verbose:
             if is_related:
                 print(f"✅ ТАК, є зв'язок!")
-                print(f"   Шлях: {' → '.join(path)}")
+                if path:
+                    print(f"   Шлях: {' → '.join(path)}")
             else:
                 print(f"❌ НІ, зв'язку не знайдено")
         
         return is_related, path
     
+    @staticmethod
+    def _connection(entity1: Entity, entity2: Entity, with_path: bool,
+                    max_depth: Optional[int] = 5) -> Tuple[bool, Tuple[str, ...]]:
+        """Обчислення для find_connection (шлях - кортеж, придатний для кешу)"""
+        index = OntologyQuery.reachability
+        if entity1._graph is not Entity._store or entity2._graph is not Entity._store:
+            # Робочий набір не в пам'яті - обхід виконує база
+            is_related, path = OntologyQuery._find_in_backend(entity1, entity2, max_depth)
+        elif index is not None and not index.is_reachable(entity1, entity2):
+            # Індекс гарантує відсутність шляху будь-якої довжини
+            is_related, path = False, []
+        elif index is not None and max_depth is None and not with_path:
+            # Без обмеження глибини відповідь індексу точна
+            is_related, path = True, []
+        else:
+            is_related, path = entity1.is_related_to(
+                entity2, OntologyQuery._depth_limit(entity1._graph, max_depth))
+        if not with_path:
+            path = []
+        return is_related, tuple(path)
+    
+    @staticmethod
+    def _depth_limit(graph, max_depth: Optional[int]) -> int:
+        """None - без обмеження: простий шлях не довший за кількість вершин сховища"""
+        return len(graph) if max_depth is None else max_depth
+    
+    @staticmethod
+    def _find_in_backend(entity1: Entity, entity2: Entity,
+                         max_depth: Optional[int] = 5) -> tuple[bool, List[str]]:
+        """Пошук зв'язку в сховищі, що містить обидві сутності"""
+        graph = entity1._graph
+        if entity2._graph is not graph:
+            # Сутності з різних сховищ - шукаємо сховище, де є обидва імені
+            for graph in Entity._backends:
+                source_id = graph.id_of(entity1.name)
+                target_id = graph.id_of(entity2.name)
+                if source_id is not None and target_id is not None:
+                    return graph.find_path(source_id, target_id,
+                                           OntologyQuery._depth_limit(graph, max_depth))
+            return False, []
+        max_depth = OntologyQuery._depth_limit(graph, max_depth)
+        if graph is Entity._store:
+            return entity1.is_related_to(entity2, max_depth)
+        return graph.find_path(entity1._id, entity2._id, max_depth)
+    
+    # ------------------------------------------------------------------
+    # Результати без виводу (для query_service та інших клієнтів);
+    # None - сутність не знайдена
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def get_hierarchy(entity_name: str) -> Optional[List[str]]:
+        """Класи сутності від власного до кореневого (IS-A)"""
+        entity = Entity.get_instance(entity_name)
+        if not entity:
+            return None
+        return [cls.__name__ for cls in entity.__class__.__mro__[:-2]]  # Без object та ABC
+    
+    @staticmethod
+    def get_parts(entity_name: str, recursive: bool = True) -> Optional[List[Entity]]:
+        """Частини сутності (HAS-A); recursive - разом з вкладеними"""
+        entity = Entity.get_instance(entity_name)
+        if not entity:
+            return None
+        return entity.get_all_parts() if recursive else list(entity.has_parts)
+    
+    @staticmethod
+    def get_usage(entity_name: str) -> Optional[List[Entity]]:
+        """Що використовує сутність (USES)"""
+        entity = Entity.get_instance(entity_name)
+        if not entity:
+            return None
+        return list(entity.uses_entities)
+    
+    @staticmethod
+    def get_owners(entity_name: str, recursive: bool = True) -> Optional[List[Entity]]:
+        """Частиною чого є сутність (зворотне HAS-A); recursive - транзитивно"""
+        entity = Entity.get_instance(entity_name)
+        if not entity:
+            return None
+        return list(entity.get_all_containers() if recursive else entity.part_of)
+    
+    @staticmethod
+    def get_users(entity_name: str) -> Optional[List[Entity]]:
+        """Хто використовує сутність (зворотне USES)"""
+        entity = Entity.get_instance(entity_name)
+        if not entity:
+            return None
+        return list(entity.used_by)
+    
+    @staticmethod
+    def get_all_connections(entity_name: str, max_depth: int = 3) -> Optional[Dict[str, List[str]]]:
+        """{ім'я_сутності: шлях_до_неї} для всіх досяжних сутностей (через кеш запитів)"""
+        if not Entity.get_instance(entity_name):
+            return None
+        found = OntologyQuery._cached(
+            ("connections", entity_name, max_depth),
+            lambda: tuple((name, tuple(path))
+                          for name, path in OntologyQuery.iter_connections(entity_name, max_depth)))
+        return {name: list(path) for name, path in found}
+    
+    @staticmethod
+    def get_statistics(top: int = 3) -> Dict[str, object]:
+        """
+        Статистика онтології з живих лічильників сховища
+        
+        Returns:
+            {"entities": кількість, "types": {клас: кількість},
+             "relations": {відношення: кількість}, "most_connected": [(ім'я, зв'язків)]}
+        """
+        # Підраховуємо за типами - з індексу типів
+        type_counts: Dict[str, int] = {}
+        for entity_type in Entity.get_indexed_types():
+            class_name = entity_type.__name__
+            type_counts[class_name] = type_counts.get(class_name, 0) + \
+                Entity.count_instances_of(entity_type, direct=True)
+        
+        return {
+            "entities": Entity.count_all_instances(),
+            "types": {name: type_counts[name] for name in sorted(type_counts)},
+            "relations": {relation.name: Entity.count_relations(relation)
+                          for relation in (RelationType.HAS_A, RelationType.USES)},
+            "most_connected": [(entity.name, count)
+                               for entity, count in Entity.get_most_connected(top)],
+        }
+    
+    # ------------------------------------------------------------------
+    # Виведення
+    # ------------------------------------------------------------------
+    
     @staticmethod
     def show_hierarchy(entity_name: str) -> None:
         """
@@ -58,13 +276,12 @@ class OntologyQuery:
         Args:
             entity_name: Ім'я сутності
         """
-        entity = Entity.get_instance(entity_name)
-        if not entity:
+        classes = OntologyQuery.get_hierarchy(entity_name)
+        if classes is None:
             print(f"❌ Сутність '{entity_name}' не знайдена")
             return
         
         print(f"\n📊 Ієрархія класів для '{entity_name}':")
-        classes = [cls.__name__ for cls in entity.__class__.__mro__[:-2]]  # Без object та ABC
         for i, cls_name in enumerate(classes):
             indent = "  " * i
             level = i + 1
@@ -79,24 +296,19 @@ class OntologyQuery:
             entity_name: Ім'я сутності
             recursive: Чи показувати вкладені частини
         """
-        entity = Entity.get_instance(entity_name)
-        if not entity:
+        parts = OntologyQuery.get_parts(entity_name, recursive)
+        if parts is None:
             print(f"❌ Сутність '{entity_name}' не знайдена")
             return
         
         print(f"\n🔧 Частини '{entity_name}':")
         
-        if not entity.has_parts:
+        if not parts:
             print("   (немає частин)")
             return
         
-        if recursive:
-            parts = entity.get_all_parts()
-            for part in parts:
-                print(f"   • {part.describe()}")
-        else:
-            for part in entity.has_parts:
-                print(f"   • {part.describe()}")
+        for part in parts:
+            print(f"   • {part.describe()}")
     
     @staticmethod
     def show_usage(entity_name: str) -> None:
@@ -106,53 +318,150 @@ class OntologyQuery:
         Args:
             entity_name: Ім'я сутності
         """
-        entity = Entity.get_instance(entity_name)
-        if not entity:
+        used_entities = OntologyQuery.get_usage(entity_name)
+        if used_entities is None:
             print(f"❌ Сутність '{entity_name}' не знайдена")
             return
         
         print(f"\n🔗 '{entity_name}' використовує:")
         
-        if not entity.uses_entities:
+        if not used_entities:
             print("   (нічого не використовує)")
             return
         
-        for used in entity.uses_entities:
+        for used in used_entities:
             print(f"   • {used.describe()}")
     
+    @staticmethod
+    def show_owners(entity_name: str, recursive: bool = True) -> None:
+        """
+        Показує, частиною чого є сутність (зворотне HAS-A)
+        
+        Args:
+            entity_name: Ім'я сутності
+            recursive: Чи показувати всі контейнери (транзитивно)
+        """
+        owners = OntologyQuery.get_owners(entity_name, recursive)
+        if owners is None:
+            print(f"❌ Сутність '{entity_name}' не знайдена")
+            return
+        
+        print(f"\n📦 '{entity_name}' є частиною:")
+        
+        if not owners:
+            print("   (ні в що не входить)")
+            return
+        
+        for owner in owners:
+            print(f"   • {owner.describe()}")
+    
+    @staticmethod
+    def show_users(entity_name: str) -> None:
+        """
+        Показує, хто використовує сутність (зворотне USES)
+        
+        Args:
+            entity_name: Ім'я сутності
+        """
+        users = OntologyQuery.get_users(entity_name)
+        if users is None:
+            print(f"❌ Сутність '{entity_name}' не знайдена")
+            return
+        
+        print(f"\n👥 '{entity_name}' використовують:")
+        
+        if not users:
+            print("   (ніхто не використовує)")
+            return
+        
+        for user in users:
+            print(f"   • {user.describe()}")
+    
     @staticmethod
     def show_all_entities(group_by_type: bool = False) -> None:
         """
-        Показує всі створені сутності
+        Показує всі створені сутності (потоково, див. show_entities_page)
         
         Args:
             group_by_type: Чи групувати за типом класу
         """
-        entities = Entity.get_all_instances()
+        total = Entity.count_all_instances()
         
-        if not entities:
+        if not total:
             print("\n📋 Немає створених сутностей")
             return
         
-        print(f"\n📋 Всі сутності в системі ({len(entities)}):")
+        print(f"\n📋 Всі сутності в системі ({total}):")
         
         if group_by_type:
-            # Групуємо за класами
-            grouped: Dict[str, List[Entity]] = {}
-            for entity in entities:
-                class_name = entity.__class__.__name__
-                if class_name not in grouped:
-                    grouped[class_name] = []
-                grouped[class_name].append(entity)
+            # Групуємо за класами - з індексу типів
+            grouped = {t.__name__: t for t in Entity.get_indexed_types()}
             
             for class_name in sorted(grouped.keys()):
                 print(f"\n  [{class_name}]:")
-                for entity in grouped[class_name]:
+                for entity in Entity.iter_entities(grouped[class_name], direct=True):
                     print(f"    • {entity.describe()}")
         else:
-            for entity in entities:
+            for entity in Entity.iter_entities():
                 print(f"  • {entity.describe()}")
     
+    @staticmethod
+    def page_entities(entity_type: Optional[type] = None, after: Optional[int] = None,
+                      limit: int = PAGE_SIZE) -> Tuple[List[Entity], Optional[int]]:
+        """
+        Одна сторінка сутностей
+        
+        Returns:
+            (сутності сторінки, курсор наступної сторінки або None, якщо це остання)
+        """
+        page = list(Entity.iter_entities(entity_type, after, limit + 1))
+        if len(page) > limit:
+            return page[:limit], page[limit - 1].node_id
+        return page, None
+    
+    @staticmethod
+    def show_entities_page(entity_type: Optional[type] = None, after: Optional[int] = None,
+                           limit: int = PAGE_SIZE) -> Optional[int]:
+        """
+        Показує сторінку сутностей; describe() викликається лише для показаних
+        
+        Returns:
+            Курсор наступної сторінки або None
+        """
+        page, cursor = OntologyQuery.page_entities(entity_type, after, limit)
+        if not page:
+            print("\n📋 Немає сутностей")
+            return None
+        
+        total = (Entity.count_instances_of(entity_type) if entity_type is not None
+                 else Entity.count_all_instances())
+        label = entity_type.__name__ if entity_type is not None else "всі"
+        print(f"\n📋 Сутності ({label}, всього {total}):")
+        for entity in page:
+            print(f"  • [{entity.__class__.__name__}] {entity.describe()}")
+        if cursor is not None:
+            print("   ... ('more' - наступна сторінка)")
+        return cursor
+    
+    @staticmethod
+    def iter_connections(entity_name: str, max_depth: int = 3) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Генератор зв'язків від сутності: один обхід графа
+        
+        Args:
+            entity_name: Ім'я сутності
+            max_depth: Максимальна глибина пошуку
+            
+        Yields:
+            (ім'я_сутності, шлях_до_неї) в порядку виявлення
+        """
+        entity = Entity.get_instance(entity_name)
+        if not entity:
+            return
+        
+        for target, path in iter_reachable(entity, max_depth):
+            yield target.name, path
+    
     @staticmethod
     def find_all_connections(entity_name: str, max_depth: int = 3) -> Dict[str, List[str]]:
         """
@@ -165,24 +474,13 @@ class OntologyQuery:
         Returns:
             Словник {ім'я_сутності: шлях_до_неї}
         """
-        entity = Entity.get_instance(entity_name)
-        if not entity:
+        connections = OntologyQuery.get_all_connections(entity_name, max_depth)
+        if connections is None:
             print(f"❌ Сутність '{entity_name}' не знайдена")
             return {}
         
-        connections = {}
-        all_entities = Entity.get_all_instances()
-        
         print(f"\n🌐 Пошук всіх зв'язків від '{entity_name}'...")
         
-        for target in all_entities:
-            if target == entity:
-                continue
-            
-            is_related, path = entity.is_related_to(target, max_depth)
-            if is_related:
-                connections[target.name] = path
-        
         if connections:
             print(f"✅ Знайдено {len(connections)} зв'язків:")
             for target_name, path in connections.items():
@@ -192,6 +490,51 @@ class OntologyQuery:
         
         return connections
     
+    @staticmethod
+    def select(query: str, limit: Optional[int] = None) -> Iterator[Dict[str, object]]:
+        """
+        Запит за шаблонами трійок (див. pattern_query)
+        
+        Args:
+            query: Напр. "?x IS-A Driver . ?x USES ?v . ?v HAS-A ?e"
+            limit: Максимальна кількість результатів
+            
+        Yields:
+            {ім'я змінної: сутність або клас} - ліниво, в міру знаходження
+        """
+        # islice зупиняє з'єднання одразу після limit-го рядка
+        yield from islice(PatternQuery(query).execute(), limit)
+    
+    @staticmethod
+    def show_matches(query: str, limit: int = 20) -> None:
+        """Виводить план та результати запиту за шаблонами"""
+        try:
+            pattern_query = PatternQuery(query)
+            plan = pattern_query.explain()
+        except ValueError as error:
+            print(f"❌ {error}")
+            return
+        
+        print(f"\n🧩 Запит: {query}")
+        print("   План:")
+        for step in plan:
+            print(f"     {step}")
+        
+        count = 0
+        for row in pattern_query.execute():
+            if count >= limit:
+                print(f"   ... (показано перші {limit})")
+                break
+            count += 1
+            if not row:
+                print("   ✅ ТАК, всі шаблони виконуються")
+                continue
+            values = ", ".join(f"?{name} = {value.__name__ if isinstance(value, type) else value.name}"
+                               for name, value in row.items())
+            print(f"   • {values}")
+        if not count:
+            print("❌ Немає результатів")
+    
     @staticmethod
     def analyze_entity(entity_name: str) -> None:
         """
@@ -224,13 +567,18 @@ class OntologyQuery:
         print("\n" + "=" * 70)
     
     @staticmethod
-    def find_shortest_path(entity1_name: str, entity2_name: str) -> Optional[List[str]]:
+    def find_shortest_path(entity1_name: str, entity2_name: str,
+                           weights: Optional[Dict[RelationType, float]] = None,
+                           max_cost: Optional[float] = None) -> Optional[List[str]]:
         """
-        Знаходить найкоротший шлях між двома сутностями
+        Знаходить найкоротший шлях між двома сутностями (HAS-A, USES, IS-A)
         
         Args:
             entity1_name: Ім'я першої сутності
             entity2_name: Ім'я другої сутності
+            weights: Вага кожного відношення, напр. {RelationType.IS_A: 3};
+                без ваг - кількість кроків
+            max_cost: Шляхи дорожчі за max_cost не розглядаються
             
         Returns:
             Найкоротший шлях або None
@@ -241,68 +589,96 @@ class OntologyQuery:
         if not entity1 or not entity2:
             return None
         
-        # BFS для пошуку найкоротшого шляху
-        from collections import deque
+        # Двобічний пошук з вказівниками на батьків (graph.shortest_path)
+        def compute():
+            result = shortest_path(entity1, entity2, weights, max_cost)
+            return tuple(result[1]) if result is not None else None
         
-        queue = deque([(entity1, [entity1.name])])
-        visited = {entity1.name}
+        path = OntologyQuery._cached(
+            ("shortest_path", entity1_name, entity2_name, weights_key(weights), max_cost), compute)
+        return list(path) if path is not None else None
+    
+    @staticmethod
+    def iter_shortest_paths(entity1_name: str, entity2_name: str, k: Optional[int] = None,
+                            relations: Optional[Iterable[RelationType]] = None,
+                            weights: Optional[Dict[RelationType, float]] = None) -> Iterator[List[str]]:
+        """
+        Генератор k найкоротших простих шляхів (алгоритм Йена), від найкоротшого
         
-        while queue:
-            current, path = queue.popleft()
-            
-            if current == entity2:
-                return path
-            
-            # Перевіряємо всі зв'язки
-            for part in current.has_parts:
-                if part.name not in visited:
-                    visited.add(part.name)
-                    queue.append((part, path + ["HAS-A", part.name]))
+        Args:
+            entity1_name: Ім'я першої сутності
+            entity2_name: Ім'я другої сутності
+            k: Максимальна кількість шляхів (None - поки вони є)
+            relations: Дозволені відношення, напр. {RelationType.HAS_A, RelationType.USES}
+            weights: Вага кожного відношення (за замовчуванням 1)
             
-            for used in current.uses_entities:
-                if used.name not in visited:
-                    visited.add(used.name)
-                    queue.append((used, path + ["USES", used.name]))
+        Yields:
+            Шлях [ім'я, відношення, ім'я, ...]; наступний обчислюється лише на запит
+        """
+        entity1 = Entity.get_instance(entity1_name)
+        entity2 = Entity.get_instance(entity2_name)
+        if not entity1 or not entity2:
+            return
         
-        return None
+        for _, path in islice(k_shortest_paths(entity1, entity2, relations, weights), k):
+            yield path
     
     @staticmethod
-    def statistics() -> None:
-        """Показує статистику онтології"""
-        entities = Entity.get_all_instances()
+    def iter_simple_paths(entity1_name: str, entity2_name: str, max_depth: int = 5,
+                          relations: Optional[Iterable[RelationType]] = None) -> Iterator[List[str]]:
+        """
+        Генератор всіх простих шляхів (без повторних сутностей) у порядку обходу в глибину
+        
+        Args:
+            entity1_name: Ім'я першої сутності
+            entity2_name: Ім'я другої сутності
+            max_depth: Максимальна кількість сутностей у шляху
+            relations: Дозволені відношення (None - всі)
+        """
+        entity1 = Entity.get_instance(entity1_name)
+        entity2 = Entity.get_instance(entity2_name)
+        if not entity1 or not entity2:
+            return
         
+        yield from simple_paths(entity1, entity2, max_depth, relations)
+    
+    @staticmethod
+    def connectivity_matrix(max_depth: Optional[int] = None, processes: Optional[int] = None,
+                            path: Optional[str] = None) -> ConnectivityMatrix:
+        """
+        Відстані між всіма парами сутностей (паралельно, див. connectivity.py)
+        
+        Args:
+            max_depth: Максимальна кількість сутностей у шляху (None - без обмеження)
+            processes: Кількість процесів (None - кількість ядер)
+            path: Файл .npy для поступового запису результату
+        """
+        return connectivity_matrix(max_depth=max_depth, processes=processes, path=path)
+    
+    @staticmethod
+    def statistics() -> None:
+        """Показує статистику онтології (з живих лічильників сховища, O(k))"""
         print("\n📈 СТАТИСТИКА ОНТОЛОГІЇ")
         print("=" * 70)
         
-        print(f"\n📊 Загальна кількість сутностей: {len(entities)}")
+        stats = OntologyQuery.get_statistics(3)
         
-        # Підраховуємо за типами
-        type_counts: Dict[str, int] = {}
-        for entity in entities:
-            class_name = entity.__class__.__name__
-            type_counts[class_name] = type_counts.get(class_name, 0) + 1
+        print(f"\n📊 Загальна кількість сутностей: {stats['entities']}")
         
         print(f"\n🏷️  Розподіл за типами:")
-        for class_name in sorted(type_counts.keys()):
-            count = type_counts[class_name]
+        for class_name, count in stats["types"].items():
             print(f"   • {class_name}: {count}")
         
-        # Підраховуємо відношення
-        has_a_count = sum(len(e.has_parts) for e in entities)
-        uses_count = sum(len(e.uses_entities) for e in entities)
+        # Відношення
+        relations = stats["relations"]
         
         print(f"\n🔗 Відношення:")
-        print(f"   • HAS-A (композиція): {has_a_count}")
-        print(f"   • USES (асоціація): {uses_count}")
+        print(f"   • HAS-A (композиція): {relations['HAS_A']}")
+        print(f"   • USES (асоціація): {relations['USES']}")
         
         # Знаходимо найбільш зв'язані сутності
         print(f"\n⭐ Топ-3 найбільш зв'язаних сутностей:")
-        entity_connections = [(e.name, len(e.has_parts) + len(e.uses_entities)) 
-                             for e in entities]
-        entity_connections.sort(key=lambda x: x[1], reverse=True)
-        
-        for i, (name, count) in enumerate(entity_connections[:3], 1):
-            if count > 0:
-                print(f"   {i}. {name}: {count} зв'язків")
+        for i, (name, count) in enumerate(stats["most_connected"], 1):
+            print(f"   {i}. {name}: {count} зв'язків")
         
         print("\n" + "=" * 70)
\ No newline at end of file
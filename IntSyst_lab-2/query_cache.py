@@ -0,0 +1,122 @@
+"""
+Кеш результатів запитів
+LRU за ключем (операція, аргументи) з позначкою покоління онтології
+"""
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from base import Entity, RegistryListener, RelationType
+
+DEFAULT_CAPACITY = 1024
+
+
+class QueryCache(RegistryListener):
+    """
+    Кожен запис позначений поколінням онтології, в якому його обчислено.
+    Реєстрації, нові відношення, очищення та масові оновлення збільшують
+    покоління, тож застарілий запис ніколи не повертається - він
+    відкидається при першому зверненні або витісняється LRU.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: Максимальна кількість записів
+        """
+        if capacity < 1:
+            raise ValueError("Місткість кешу має бути додатною")
+        self.capacity = capacity
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Записи
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable) -> Tuple[bool, object]:
+        """
+        Returns:
+            (чи знайдено актуальний запис, значення)
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            generation, value = entry
+            if generation == self.generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del self._entries[key]
+            self.stale += 1
+        self.misses += 1
+        return False, None
+
+    def put(self, key: Hashable, value) -> None:
+        self._entries[key] = (self.generation, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Нове покоління: всі наявні записи застарівають"""
+        self.generation += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.invalidate()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Лічильники для підбору місткості"""
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale": self.stale,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __str__(self):
+        return (f"записів: {len(self._entries)}/{self.capacity}, "
+                f"влучань: {self.hits}, промахів: {self.misses} "
+                f"({self.hit_rate:.0%}), витіснень: {self.evictions}, "
+                f"застарілих: {self.stale}")
+
+    # ------------------------------------------------------------------
+    # Зміни онтології
+    # ------------------------------------------------------------------
+
+    def on_register(self, entity: Entity) -> None:
+        self.invalidate()
+
+    def on_unregister(self, entity: Entity) -> None:
+        self.invalidate()
+
+    def on_relation(self, source: Entity, relation: RelationType, target: Entity) -> None:
+        self.invalidate()
+
+    def on_clear(self) -> None:
+        self.clear()
+
+    def on_bulk_change(self) -> None:
+        self.invalidate()
+
+
+def weights_key(weights: Optional[Dict[RelationType, float]]) -> Optional[tuple]:
+    """Ваги відношень у вигляді, придатному для ключа кешу"""
+    if not weights:
+        return None
+    return tuple(sorted((relation.name, weight) for relation, weight in weights.items()))
@@ -0,0 +1,524 @@
+"""
+Асинхронний сервіс запитів до онтології
+Запуск: python query_service.py --load entities.jsonl relations.csv --port 8765
+        python query_service.py --entities 100000 --port 8765   (синтетична онтологія)
+
+Протокол - JSON-рядки через TCP, один запит / одна відповідь на рядок:
+    {"id": 1, "op": "find_connection", "args": {"source": "Петро", "target": "Рекс"}, "timeout": 2}
+    {"id": 1, "ok": true, "result": {"related": true, "path": [...]}}
+    {"id": 1, "ok": false, "error": "Сутність 'Рекс' не знайдена"}
+Запити одного з'єднання виконуються одночасно, відповіді надходять у міру
+готовності - клієнт зіставляє їх за id. Списки довші за max_results
+обрізаються, тоді у відповіді є "truncated": true.
+
+Обходи графа виконує пул процесів (fork - кожен процес успадковує
+онтологію, завантажену до start()), тож цикл подій лишається вільним.
+Сервіс лише читає онтологію: зміни після start() процесам не видно.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import signal
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, takewhile
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from base import Entity, RelationType
+from generator import OntologyGenerator, add_arguments
+from loader import load
+from pattern_query import ontology_classes
+from query import OntologyQuery
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Ліміти на запит: клієнт може лише зменшити їх
+MAX_DEPTH = 6
+MAX_RESULTS = 1000
+DEFAULT_TIMEOUT = 5.0
+# Запас на доставку часткового результату після дедлайну обходу
+RESULT_GRACE = 0.5
+
+
+class Limits:
+    """Ліміти одного запиту (передаються у процес пулу)"""
+
+    def __init__(self, max_depth: int = MAX_DEPTH, max_results: int = MAX_RESULTS,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.max_depth = max_depth
+        self.max_results = max_results
+        self.timeout = timeout
+
+    def key(self) -> Tuple[int, int, float]:
+        return self.max_depth, self.max_results, self.timeout
+
+    def depth(self, args: dict, default: int) -> int:
+        """Глибина з аргументів запиту (не більша за ліміт)"""
+        depth = args.get("max_depth", min(default, self.max_depth))
+        if not isinstance(depth, int) or depth < 1:
+            raise ValueError("max_depth має бути додатним цілим")
+        if depth > self.max_depth:
+            raise ValueError(f"max_depth перевищує ліміт сервісу ({self.max_depth})")
+        return depth
+
+    def count(self, args: dict, name: str, default: int) -> int:
+        """Кількість результатів з аргументів запиту (не більша за ліміт)"""
+        count = args.get(name, default)
+        if not isinstance(count, int) or count < 1:
+            raise ValueError(f"{name} має бути додатним цілим")
+        return min(count, self.max_results)
+
+
+# ----------------------------------------------------------------------
+# Операції: (args, ліміти) -> (результат JSON, чи обрізано)
+# ----------------------------------------------------------------------
+
+def _text(args: dict, name: str) -> str:
+    value = args.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"Потрібен аргумент '{name}' (рядок)")
+    return value
+
+
+def _entity_name(args: dict, name: str) -> str:
+    """Точне ім'я сутності (введене ім'я може відрізнятися регістром)"""
+    text = _text(args, name)
+    entity = Entity.get_instance(text)
+    if entity is None:
+        raise ValueError(f"Сутність '{text}' не знайдена")
+    return entity.name
+
+
+def _relations(args: dict) -> Optional[List[RelationType]]:
+    names = args.get("relations")
+    if names is None:
+        return None
+    try:
+        return [RelationType[name.upper().replace("-", "_")] for name in names]
+    except (AttributeError, KeyError):
+        raise ValueError(f"Невідомі відношення: {names} (HAS_A, USES, IS_A)")
+
+
+def _describe(entity: Entity) -> Dict[str, str]:
+    return {"name": entity.name, "type": entity.__class__.__name__}
+
+
+class QueryTimeout(Exception):
+    """Час запиту минув посеред обчислення (сигнал таймера в процесі пулу)"""
+
+
+def _expire(signum, frame):
+    raise QueryTimeout()
+
+
+# Позначка кінця потоку для next()
+_END = object()
+
+
+def _bounded(items: Iterable, limits: Limits, count: int) -> Tuple[list, bool]:
+    """
+    Перші count елементів потоку, поки не минув час запиту
+
+    Returns:
+        (елементи, чи обрізано - за часом або лімітом сервісу max_results)
+    """
+    deadline = time.monotonic() + limits.timeout
+    items = iter(items)
+    collected = []
+    try:
+        for item in islice(items, count):
+            collected.append(item)
+            if time.monotonic() > deadline:
+                return collected, True
+        if len(collected) < limits.max_results:
+            return collected, False
+        # Ліміт сервісу вичерпано - обрізано, лише якщо потік має ще елемент
+        return collected, next(items, _END) is not _END
+    except QueryTimeout:
+        # Частковий результат замість помилки
+        return collected, True
+
+
+def _entities(entities: List[Entity], limits: Limits) -> Tuple[list, bool]:
+    return [_describe(entity) for entity in entities[:limits.max_results]], \
+        len(entities) > limits.max_results
+
+
+def _find_connection(args: dict, limits: Limits):
+    is_related, path = OntologyQuery.find_connection(
+        _entity_name(args, "source"), _entity_name(args, "target"), verbose=False,
+        with_path=args.get("with_path", True), max_depth=limits.depth(args, 5))
+    return {"related": is_related, "path": path}, False
+
+
+def _shortest_path(args: dict, limits: Limits):
+    # Усі ваги 1: вартість шляху - кількість ребер
+    path = OntologyQuery.find_shortest_path(
+        _entity_name(args, "source"), _entity_name(args, "target"),
+        max_cost=limits.depth(args, limits.max_depth) - 1)
+    return path, False
+
+
+def _k_shortest_paths(args: dict, limits: Limits):
+    max_depth = limits.depth(args, limits.max_depth)
+    paths = OntologyQuery.iter_shortest_paths(
+        _entity_name(args, "source"), _entity_name(args, "target"), relations=_relations(args))
+    # Шляхи йдуть за зростанням кількості ребер - перший задовгий завершує пошук
+    short = takewhile(lambda path: (len(path) + 1) // 2 <= max_depth, paths)
+    return _bounded(short, limits, limits.count(args, "k", 3))
+
+
+def _simple_paths(args: dict, limits: Limits):
+    paths = OntologyQuery.iter_simple_paths(
+        _entity_name(args, "source"), _entity_name(args, "target"),
+        limits.depth(args, 5), _relations(args))
+    return _bounded(paths, limits, limits.count(args, "limit", limits.max_results))
+
+
+def _connections(args: dict, limits: Limits):
+    connections = OntologyQuery.get_all_connections(
+        _entity_name(args, "entity"), limits.depth(args, 3))
+    truncated = len(connections) > limits.max_results
+    return dict(islice(connections.items(), limits.max_results)), truncated
+
+
+def _hierarchy(args: dict, limits: Limits):
+    return OntologyQuery.get_hierarchy(_entity_name(args, "entity")), False
+
+
+def _parts(args: dict, limits: Limits):
+    parts = OntologyQuery.get_parts(_entity_name(args, "entity"), args.get("recursive", True))
+    return _entities(parts, limits)
+
+
+def _usage(args: dict, limits: Limits):
+    return _entities(OntologyQuery.get_usage(_entity_name(args, "entity")), limits)
+
+
+def _owners(args: dict, limits: Limits):
+    owners = OntologyQuery.get_owners(_entity_name(args, "entity"), args.get("recursive", True))
+    return _entities(owners, limits)
+
+
+def _users(args: dict, limits: Limits):
+    return _entities(OntologyQuery.get_users(_entity_name(args, "entity")), limits)
+
+
+def _select(args: dict, limits: Limits):
+    rows = ({name: value.__name__ if isinstance(value, type) else value.name
+             for name, value in row.items()}
+            for row in OntologyQuery.select(_text(args, "query")))
+    return _bounded(rows, limits, limits.count(args, "limit", limits.max_results))
+
+
+def _statistics(args: dict, limits: Limits):
+    return OntologyQuery.get_statistics(limits.count(args, "top", 3)), False
+
+
+def _complete(args: dict, limits: Limits):
+    return Entity.get_name_index().complete(_text(args, "prefix"), limits.count(args, "limit", 10)), False
+
+
+def _entities_page(args: dict, limits: Limits):
+    entity_type = None
+    if args.get("type") is not None:
+        entity_type = ontology_classes().get(args["type"])
+        if entity_type is None:
+            raise ValueError(f"Невідомий клас: {args['type']}")
+    page, cursor = OntologyQuery.page_entities(entity_type, args.get("after"),
+                                               limits.count(args, "limit", 20))
+    return {"entities": [_describe(entity) for entity in page], "cursor": cursor}, False
+
+
+# Назва -> (операція, чи виконувати в пулі - транзитивні обходи графа)
+OPERATIONS: Dict[str, Tuple[Callable[[dict, Limits], tuple], bool]] = {
+    "find_connection": (_find_connection, True),
+    "shortest_path": (_shortest_path, True),
+    "k_shortest_paths": (_k_shortest_paths, True),
+    "simple_paths": (_simple_paths, True),
+    "connections": (_connections, True),
+    "parts": (_parts, True),
+    "owners": (_owners, True),
+    "select": (_select, True),
+    "hierarchy": (_hierarchy, False),
+    "usage": (_usage, False),
+    "users": (_users, False),
+    "statistics": (_statistics, False),
+    "complete": (_complete, False),
+    "entities": (_entities_page, False),
+}
+
+
+def execute(op: str, args: dict, limits: Limits, timed: bool = False) -> tuple:
+    """
+    Виконує операцію (у процесі пулу або в циклі подій)
+
+    Args:
+        timed: Перервати обчислення через limits.timeout сигналом таймера -
+            лише в головному потоці процесу (процеси пулу)
+    """
+    operation, _ = OPERATIONS[op]
+    if not timed:
+        return operation(args, limits)
+    previous = signal.signal(signal.SIGALRM, _expire)
+    # Сигнал може надійти і після повернення operation(), поки таймер
+    # не вимкнено, - тому перехоплюється навколо всього блоку
+    try:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, limits.timeout)
+            return operation(args, limits)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    except QueryTimeout:
+        raise TimeoutError(f"Перевищено ліміт часу ({limits.timeout} с)")
+
+
+def _init_worker() -> None:
+    # Ctrl+C зупиняє сервіс, а не окремі процеси пулу
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _warm_up() -> int:
+    return 0
+
+
+# ----------------------------------------------------------------------
+# Сервіс
+# ----------------------------------------------------------------------
+
+class QueryService:
+    """
+    Сервер запитів: пул для обходів, об'єднання однакових запитів, ліміти
+
+    Однакові запити (операція, аргументи, ліміти), що виконуються
+    одночасно, обчислюються один раз - решта чекає на той самий результат.
+    Ліміт часу: у процесі пулу обчислення переривається сигналом таймера -
+    потокові операції (шляхи, select) повертають частковий результат, решта
+    - помилку; клієнт у будь-якому разі отримує відповідь не пізніше
+    timeout + RESULT_GRACE. У потоковому режимі перервати обхід неможливо -
+    він довершується у фоні, обмежений max_depth.
+    """
+
+    def __init__(self, workers: Optional[int] = None, processes: bool = True,
+                 max_depth: int = MAX_DEPTH, max_results: int = MAX_RESULTS,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            workers: Кількість процесів пулу (None - кількість ядер)
+            processes: Пул процесів; інакше (або без fork) - один потік без
+                переривання за часом: потоки все одно ділять GIL, а кеші
+                онтології не потокобезпечні
+            max_depth: Найбільша дозволена глибина обходу
+            max_results: Найбільша кількість елементів у відповіді
+            timeout: Найбільший час запиту, с
+        """
+        if max_depth < 1 or max_results < 1 or timeout <= 0:
+            raise ValueError("Ліміти сервісу мають бути додатними")
+        self.workers = workers
+        self.use_processes = processes and "fork" in multiprocessing.get_all_start_methods()
+        self.limits = Limits(max_depth, max_results, timeout)
+        self.requests = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._executor: Optional[Executor] = None
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def start(self) -> None:
+        """Запускає пул (процеси отримують поточний стан онтології)"""
+        if self._executor is not None:
+            return
+        if Entity._backends:
+            raise ValueError("Сервіс працює лише з онтологією в пам'яті - відключіть сховища")
+        if self.use_processes:
+            # Буфери ребер зливаються один раз до fork, а не в кожному процесі
+            Entity._store.compact()
+            self._executor = ProcessPoolExecutor(self.workers,
+                                                 mp_context=multiprocessing.get_context("fork"),
+                                                 initializer=_init_worker)
+            self._executor.submit(_warm_up).result()
+        else:
+            self._executor = ThreadPoolExecutor(1)
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "in_flight": len(self._in_flight),
+        }
+
+    def _request_limits(self, request: dict) -> Limits:
+        timeout = request.get("timeout", self.limits.timeout)
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError("timeout має бути додатним числом")
+        return Limits(self.limits.max_depth, self.limits.max_results,
+                      min(float(timeout), self.limits.timeout))
+
+    def _submit(self, op: str, args: dict, limits: Limits) -> asyncio.Future:
+        """Майбутній результат: спільний для однакових запитів, що ще виконуються"""
+        key = (op, json.dumps(args, sort_keys=True), limits.key())
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return future
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, execute, op, args, limits,
+                                                            self.use_processes)
+        self._in_flight[key] = future
+
+        def finished(done: asyncio.Future) -> None:
+            if self._in_flight.get(key) is done:
+                del self._in_flight[key]
+            if not done.cancelled():
+                done.exception()    # Помилку вже отримали очікувачі (або вони пішли за таймаутом)
+
+        future.add_done_callback(finished)
+        return future
+
+    async def handle(self, request: dict) -> dict:
+        """Відповідь на один запит"""
+        self.requests += 1
+        response = {"id": request.get("id")}
+        op = request.get("op")
+        try:
+            if op == "service_stats":
+                response.update(ok=True, result=self.stats())
+                return response
+            if op not in OPERATIONS:
+                raise ValueError(f"Невідома операція: {op}")
+            args = request.get("args") or {}
+            if not isinstance(args, dict):
+                raise ValueError("args має бути об'єктом")
+            limits = self._request_limits(request)
+
+            if OPERATIONS[op][1] or not self.use_processes:
+                # shield: таймаут одного клієнта не скасовує спільне обчислення
+                result, truncated = await asyncio.wait_for(
+                    asyncio.shield(self._submit(op, args, limits)), limits.timeout + RESULT_GRACE)
+            else:
+                # Прямий доступ до лічильників та індексів - одразу в циклі подій
+                result, truncated = execute(op, args, limits)
+        except (asyncio.TimeoutError, TimeoutError):
+            self.timeouts += 1
+            response.update(ok=False, error=f"Перевищено ліміт часу ({limits.timeout} с)")
+            return response
+        except ValueError as error:
+            self.errors += 1
+            response.update(ok=False, error=str(error))
+            return response
+        except Exception as error:
+            # Напр. BrokenProcessPool - клієнт усе одно отримує відповідь
+            self.errors += 1
+            response.update(ok=False, error=f"{type(error).__name__}: {error}")
+            return response
+
+        response.update(ok=True, result=result)
+        if truncated:
+            response["truncated"] = True
+        return response
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Запит має бути об'єктом JSON")
+        except ValueError as error:
+            self.errors += 1
+            response = {"id": None, "ok": False, "error": f"Некоректний запит: {error}"}
+        else:
+            response = await self.handle(request)
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+        async with lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._respond(line, writer, lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except (ConnectionError, ValueError):
+            # Розрив з'єднання або рядок довший за буфер читання
+            pass
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """Запускає пул і TCP-сервер (повертає сервер; 0 як port - вільний порт)"""
+        self.start()
+        self._server = await asyncio.start_server(self._serve_client, host, port)
+        return self._server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Асинхронний сервіс запитів до онтології")
+    parser.add_argument('--load', nargs='+', metavar='PATH',
+                        help="файли сутностей, потім відношень (інакше - синтетична онтологія)")
+    add_arguments(parser)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help="кількість процесів пулу")
+    parser.add_argument('--threads', action='store_true', help="один потік замість пулу процесів")
+    parser.add_argument('--max-depth', type=int, default=MAX_DEPTH)
+    parser.add_argument('--max-results', type=int, default=MAX_RESULTS)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="секунд на запит")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.load:
+            report = load(*args.load)
+        else:
+            report = OntologyGenerator(args.entities, args.depth, args.branching,
+                                       args.uses, args.seed).load()
+        service = QueryService(args.workers, not args.threads, args.max_depth,
+                               args.max_results, args.timeout)
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}")
+        return 1
+    print(f"✅ {report}")
+    OntologyQuery.enable_query_cache()
+
+    async def run():
+        server = await service.serve(args.host, args.port)
+        pool = "пул процесів" if service.use_processes else "один потік"
+        print(f"🌐 Сервіс запитів: {args.host}:{args.port} ({pool})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("До побачення! 👋")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+Індекс транзитивної досяжності
+Відповідає "чи пов'язана X з Y" (HAS-A / USES / IS-A) без обходу графа
+"""
+from typing import Dict, Iterator, List, Union
+from base import Entity, RegistryListener, RelationType
+from graph import RelationView
+
+
+class ReachabilityIndex(RegistryListener):
+    """
+    Для кожної компоненти сильної зв'язності - множина досяжних вершин як
+    бітова маска (Python int) над щільними id. IS-A моделюється віртуальними
+    вершинами класів: сутність -> батьківський клас -> всі екземпляри класу,
+    тому родини класів зливаються у кілька великих компонент.
+
+    Індекс оновлюється інкрементально при реєстрації та add_part / add_usage:
+    зворотна маска "хто досягає компоненту" обмежує оновлення справжніми
+    предками та нащадками ребра. Витіснення сутності (перереєстрація імені)
+    позначає індекс застарілим - він перебудовується при наступному запиті.
+    """
+
+    def __init__(self):
+        self._view = RelationView()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: Dict[Union[Entity, type], int] = {}
+        self._nodes: List[Union[Entity, type]] = []
+        # Вершина -> компонента (id її представника)
+        self._comp: List[int] = []
+        # За id представника: вершини компоненти, досяжні вершини,
+        # представники компонент, що її досягають (у т.ч. вона сама)
+        self._members: List[List[int]] = []
+        self._reach: List[int] = []
+        self._reached_by: List[int] = []
+        # Маска представників живих компонент
+        self._reps = 0
+        self._stale = False
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # ------------------------------------------------------------------
+    # Вершини та ребра
+    # ------------------------------------------------------------------
+
+    def _instance_classes(self, entity_type: type) -> List[type]:
+        """Класи, екземпляром яких є сутність (без Entity)"""
+        return [cls for cls in entity_type.__mro__
+                if cls is not Entity and issubclass(cls, Entity)]
+
+    def _new_node(self, node: Union[Entity, type]) -> int:
+        node_id = len(self._nodes)
+        self._ids[node] = node_id
+        self._nodes.append(node)
+        bit = 1 << node_id
+        self._comp.append(node_id)
+        self._members.append([node_id])
+        self._reach.append(bit)
+        self._reached_by.append(bit)
+        self._reps |= bit
+        return node_id
+
+    def _node(self, node: Union[Entity, type]) -> int:
+        node_id = self._ids.get(node)
+        if node_id is None:
+            node_id = self._new_node(node)
+            if not isinstance(node, type):
+                for cls in self._instance_classes(type(node)):
+                    if cls not in self._ids:
+                        self._new_node(cls)
+        return node_id
+
+    def _successors(self, node_id: int) -> Iterator[int]:
+        node = self._nodes[node_id]
+        if isinstance(node, type):
+            for instance in Entity.get_instances_of(node):
+                yield self._node(instance)
+            return
+        for part in node.has_parts:
+            yield self._node(part)
+        for used in node.uses_entities:
+            yield self._node(used)
+        for parent_class in self._view.parent_classes(type(node)):
+            yield self._node(parent_class)
+
+    @staticmethod
+    def _bits(mask: int) -> Iterator[int]:
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def _add_edge(self, source_id: int, target_id: int) -> None:
+        """Ребро u -> v: всі, хто досягає u, тепер досягають і все з v"""
+        reach = self._reach
+        reached_by = self._reached_by
+        source = self._comp[source_id]
+        target = self._comp[target_id]
+        if reach[source] >> target_id & 1:
+            return
+        if reach[target] >> source_id & 1:
+            # Ребро замикає цикл - компоненти між v та u зливаються в одну
+            source = target = self._merge(reached_by[source] & reach[target] & self._reps)
+
+        added = reach[target]
+        ancestors = reached_by[source] & self._reps
+        for ancestor in self._bits(ancestors):
+            reach[ancestor] |= added
+        for descendant in self._bits(added & self._reps):
+            reached_by[descendant] |= ancestors
+
+    def _merge(self, components: int) -> int:
+        """Зливає компоненти (маска представників) у найбільшу з них"""
+        ids = list(self._bits(components))
+        rep = max(ids, key=lambda component: len(self._members[component]))
+        members = self._members[rep]
+        for other in ids:
+            if other == rep:
+                continue
+            for node_id in self._members[other]:
+                self._comp[node_id] = rep
+            members.extend(self._members[other])
+            self._reach[rep] |= self._reach[other]
+            self._reached_by[rep] |= self._reached_by[other]
+            self._members[other] = []
+            self._reach[other] = self._reached_by[other] = 0
+        self._reps &= ~components | (1 << rep)
+        return rep
+
+    # ------------------------------------------------------------------
+    # Повна побудова
+    # ------------------------------------------------------------------
+
+    def build(self) -> None:
+        """
+        Будує індекс з нуля: компоненти сильної зв'язності (ітеративний Тарʼян)
+        і об'єднання досяжності у зворотному топологічному порядку
+        """
+        self._reset()
+        for entity in Entity.get_all_instances():
+            self._node(entity)
+
+        order: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        stack: List[int] = []
+        on_stack = set()
+        counter = 0
+
+        root = 0
+        while root < len(self._nodes):
+            if root in order:
+                root += 1
+                continue
+            order[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, self._successors(root))]
+
+            while work:
+                node_id, successors = work[-1]
+                descended = False
+                for succ in successors:
+                    if succ not in order:
+                        order[succ] = lowlink[succ] = counter
+                        counter += 1
+                        stack.append(succ)
+                        on_stack.add(succ)
+                        work.append((succ, self._successors(succ)))
+                        descended = True
+                        break
+                    if succ in on_stack:
+                        lowlink[node_id] = min(lowlink[node_id], order[succ])
+                if descended:
+                    continue
+
+                work.pop()
+                if work:
+                    parent_id = work[-1][0]
+                    lowlink[parent_id] = min(lowlink[parent_id], lowlink[node_id])
+
+                if lowlink[node_id] == order[node_id]:
+                    # Корінь компоненти - всі наступники поза нею вже оброблені
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        members.append(member)
+                        if member == node_id:
+                            break
+                    member_mask = 0
+                    for member in members:
+                        member_mask |= 1 << member
+                        self._comp[member] = node_id
+                    reach = member_mask
+                    for member in members:
+                        for succ in self._successors(member):
+                            reach |= self._reach[self._comp[succ]]
+                    for member in members:
+                        self._members[member] = []
+                        self._reach[member] = self._reached_by[member] = 0
+                    self._members[node_id] = members
+                    self._reach[node_id] = reach
+                    self._reps &= ~member_mask | (1 << node_id)
+            root += 1
+
+        # Зворотні маски: кожна компонента позначає себе у своїх нащадках
+        reps = self._reps
+        for component in self._bits(reps):
+            self._reached_by[component] = 1 << component
+        for component in self._bits(reps):
+            bit = 1 << component
+            for descendant in self._bits(self._reach[component] & reps & ~bit):
+                self._reached_by[descendant] |= bit
+        self._stale = False
+
+    def invalidate(self) -> None:
+        """Позначає індекс застарілим (перебудова при наступному запиті)"""
+        self._stale = True
+
+    # ------------------------------------------------------------------
+    # Запити
+    # ------------------------------------------------------------------
+
+    def is_reachable(self, source: Entity, target: Entity) -> bool:
+        """Чи є шлях source -> target (без обмеження глибини)"""
+        if self._stale:
+            self.build()
+        source_id = self._ids.get(source)
+        target_id = self._ids.get(target)
+        if source_id is None or target_id is None:
+            return source is target
+        return bool(self._reach[self._comp[source_id]] >> target_id & 1)
+
+    # ------------------------------------------------------------------
+    # Події реєстру
+    # ------------------------------------------------------------------
+
+    def on_register(self, entity: Entity) -> None:
+        if self._stale:
+            return
+        entity_id = self._node(entity)
+        for cls in self._instance_classes(type(entity)):
+            self._add_edge(self._ids[cls], entity_id)
+        for parent_class in self._view.parent_classes(type(entity)):
+            self._add_edge(entity_id, self._node(parent_class))
+
+    def on_unregister(self, entity: Entity) -> None:
+        self._stale = True
+
+    def on_relation(self, source: Entity, relation: RelationType, target: Entity) -> None:
+        if self._stale:
+            return
+        self._add_edge(self._node(source), self._node(target))
+
+    def on_clear(self) -> None:
+        self._reset()
+    
+    def on_bulk_change(self) -> None:
+        self._stale = True
@@ -0,0 +1,376 @@
+"""
+Бінарний знімок онтології, що відкривається через mmap
+Запуск: python snapshot.py save world.snap entities.jsonl relations.csv
+        python snapshot.py info world.snap
+
+Формат (порядок байтів машини, що записала файл):
+    MAGIC (8 байт) | довжина заголовка (uint64) | заголовок JSON | секції
+Кожна секція вирівняна на 8 байт; заголовок зберігає для неї
+(зсув, довжину, код типу масиву).
+"""
+import argparse
+import heapq
+import json
+import mmap
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from base import Entity, RelationType
+from graph import find_path
+from graph_store import GraphStore
+from loader import attribute_names, entity_types
+
+MAGIC = b"ONTOSNAP"
+VERSION = 2
+DEFAULT_CACHE_SIZE = 10000
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def save_snapshot(path: str, store: Optional[GraphStore] = None) -> int:
+    """
+    Записує сховище у файл знімка
+
+    Живі сутності отримують нові щільні id (у порядку реєстрації).
+
+    Returns:
+        Кількість збережених сутностей
+    """
+    store = store if store is not None else Entity._store
+    old_ids = list(store.ids())
+    new_ids = {old_id: new_id for new_id, old_id in enumerate(old_ids)}
+    count = len(old_ids)
+
+    # Таблиця імен: UTF-8 підряд + зсуви; відсортований індекс для бінарного пошуку
+    encoded = [store.name_of(old_id).encode("utf-8") for old_id in old_ids]
+    name_offsets = array('q', [0])
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+    name_order = array('i', sorted(range(count), key=encoded.__getitem__))
+
+    # Типи: код класу на сутність + id, згруповані за класом
+    classes: List[type] = []
+    class_codes: Dict[type, int] = {}
+    type_codes = array('H')
+    for old_id in old_ids:
+        cls = store.type_of(old_id)
+        if cls not in class_codes:
+            class_codes[cls] = len(classes)
+            classes.append(cls)
+        type_codes.append(class_codes[cls])
+    type_order = array('i', sorted(range(count), key=type_codes.__getitem__))
+    type_offsets = array('q', [0] * (len(classes) + 1))
+    for code in type_codes:
+        type_offsets[code + 1] += 1
+    for code in range(len(classes)):
+        type_offsets[code + 1] += type_offsets[code]
+
+    # Атрибути: JSON на сутність
+    attributes = []
+    for old_id in old_ids:
+        entity = store.entity(old_id)
+        attributes.append(json.dumps({name: getattr(entity, name, None)
+                                      for name in attribute_names(type(entity))},
+                                     ensure_ascii=False).encode("utf-8"))
+    attribute_offsets = array('q', [0])
+    for blob in attributes:
+        attribute_offsets.append(attribute_offsets[-1] + len(blob))
+
+    sections = [
+        ("name_offsets", name_offsets),
+        ("names", b"".join(encoded)),
+        ("name_order", name_order),
+        ("type_codes", type_codes),
+        ("type_order", type_order),
+        ("type_offsets", type_offsets),
+        ("attribute_offsets", attribute_offsets),
+        ("attributes", b"".join(attributes)),
+    ]
+
+    # Відношення у форматі CSR над новими id (прямі та зворотні рядки)
+    for relation in store.relations:
+        for direction, neighbors in (("", store.successors), ("reverse.", store.predecessors)):
+            offsets = array('q', [0])
+            targets = array('i')
+            for old_id in old_ids:
+                row = sorted(new_ids[target] for target in neighbors(relation, old_id)
+                             if target in new_ids)
+                targets.extend(row)
+                offsets.append(len(targets))
+            sections.append((f"{direction}{relation.value}.offsets", offsets))
+            sections.append((f"{direction}{relation.value}.targets", targets))
+
+    layout = {}
+    position = 0
+    for name, data in sections:
+        size = len(data) * data.itemsize if isinstance(data, array) else len(data)
+        layout[name] = (position, size, data.typecode if isinstance(data, array) else 'B')
+        position = _align(position + size)
+
+    header = json.dumps({
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "count": count,
+        "classes": [cls.__name__ for cls in classes],
+        "relations": [relation.value for relation in store.relations],
+        "sections": layout,
+    }).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(header)
+        for name, data in sections:
+            file.seek(data_start + layout[name][0])
+            file.write(data.tobytes() if isinstance(data, array) else data)
+        file.truncate(data_start + position)
+    return count
+
+
+class SnapshotGraph:
+    """
+    Граф онтології над знімком, відкритим через mmap (лише для читання)
+
+    Масиви - memoryview над відображеним файлом, без копіювання: сторінки
+    підвантажуються ОС при першому зверненні. Інтерфейс читання - як у
+    GraphStore, тож сутності знімка - звичайні представлення Entity з
+    _graph = знімок; об'єкти створюються лише для сутностей, до яких
+    звертаються (LRU-кеш обмеженого розміру).
+    """
+
+    def __init__(self, path: str, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: не є знімком онтології")
+        header_size = int.from_bytes(self._map[len(MAGIC):len(MAGIC) + 8], "little")
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._map[header_start:header_start + header_size])
+        if header["version"] != VERSION or header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path}: несумісна версія або порядок байтів знімка")
+
+        self.count = header["count"]
+        known = entity_types()
+        self.classes: List[type] = [known[name] for name in header["classes"]]
+        self.class_codes = {cls: code for code, cls in enumerate(self.classes)}
+
+        data_start = _align(header_start + header_size)
+        view = memoryview(self._map)
+        self._views = [view]
+        sections = {}
+        for name, (offset, size, typecode) in header["sections"].items():
+            section = view[data_start + offset:data_start + offset + size]
+            sections[name] = section.cast(typecode) if typecode != 'B' else section
+            self._views.append(sections[name])
+
+        self._name_offsets = sections["name_offsets"]
+        self._names = sections["names"]
+        self._name_order = sections["name_order"]
+        self._type_codes = sections["type_codes"]
+        self._type_order = sections["type_order"]
+        self._type_offsets = sections["type_offsets"]
+        self._attribute_offsets = sections["attribute_offsets"]
+        self._attributes = sections["attributes"]
+        self._relations = {
+            RelationType(value): (sections[f"{value}.offsets"], sections[f"{value}.targets"])
+            for value in header["relations"]
+        }
+        self._reverse = {
+            RelationType(value): (sections[f"reverse.{value}.offsets"],
+                                  sections[f"reverse.{value}.targets"])
+            for value in header["relations"]
+        }
+        self._entities: OrderedDict = OrderedDict()
+
+    def close(self) -> None:
+        for view in reversed(getattr(self, "_views", [])):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'SnapshotGraph':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ------------------------------------------------------------------
+    # Імена
+    # ------------------------------------------------------------------
+
+    def _name_bytes(self, node_id: int) -> bytes:
+        return bytes(self._names[self._name_offsets[node_id]:self._name_offsets[node_id + 1]])
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Бінарний пошук у відсортованому індексі імен"""
+        key = name.encode("utf-8")
+        order = self._name_order
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(order[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._name_bytes(order[low]) == key:
+            return order[low]
+        return None
+
+    def name_of(self, node_id: int) -> str:
+        return self._name_bytes(node_id).decode("utf-8")
+
+    # ------------------------------------------------------------------
+    # Сутності
+    # ------------------------------------------------------------------
+
+    def type_of(self, node_id: int) -> type:
+        return self.classes[self._type_codes[node_id]]
+
+    def entity(self, node_id: int):
+        entity = self._entities.get(node_id)
+        if entity is not None:
+            self._entities.move_to_end(node_id)
+            return entity
+
+        cls = self.type_of(node_id)
+        entity = cls.__new__(cls)
+        entity._graph = self
+        entity._id = node_id
+        start, end = self._attribute_offsets[node_id], self._attribute_offsets[node_id + 1]
+        for key, value in json.loads(bytes(self._attributes[start:end])).items():
+            setattr(entity, key, value)
+
+        self._entities[node_id] = entity
+        if len(self._entities) > self.cache_size:
+            self._entities.popitem(last=False)
+        return entity
+
+    def get(self, name: str):
+        """Сутність за іменем або None"""
+        node_id = self.id_of(name)
+        return self.entity(node_id) if node_id is not None else None
+
+    def is_alive(self, node_id: int) -> bool:
+        return True
+
+    def ids(self) -> Iterator[int]:
+        return iter(range(self.count))
+
+    # ------------------------------------------------------------------
+    # Індекс типів
+    # ------------------------------------------------------------------
+
+    def _bucket(self, code: int) -> Sequence[int]:
+        return self._type_order[self._type_offsets[code]:self._type_offsets[code + 1]]
+
+    def instances_of(self, cls: type, direct: bool = False) -> Iterator[int]:
+        if direct:
+            code = self.class_codes.get(cls)
+            return iter(self._bucket(code)) if code is not None else iter(())
+        buckets = [self._bucket(code) for code, klass in enumerate(self.classes)
+                   if issubclass(klass, cls)]
+        return heapq.merge(*buckets)
+
+    def count_of(self, cls: type, direct: bool = False) -> int:
+        return sum(self._type_offsets[code + 1] - self._type_offsets[code]
+                   for code, klass in enumerate(self.classes)
+                   if (klass is cls if direct else issubclass(klass, cls)))
+
+    def types(self) -> List[type]:
+        return list(self.classes)
+
+    # ------------------------------------------------------------------
+    # Ребра
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row(arrays, node_id: int) -> Sequence[int]:
+        if arrays is None:
+            return ()
+        offsets, targets = arrays
+        return targets[offsets[node_id]:offsets[node_id + 1]]
+
+    def successors(self, relation: RelationType, node_id: int) -> Sequence[int]:
+        return self._row(self._relations.get(relation), node_id)
+
+    def predecessors(self, relation: RelationType, node_id: int) -> Sequence[int]:
+        return self._row(self._reverse.get(relation), node_id)
+
+    def degree(self, relation: RelationType, node_id: int) -> int:
+        return len(self.successors(relation, node_id))
+
+    def in_degree(self, relation: RelationType, node_id: int) -> int:
+        return len(self.predecessors(relation, node_id))
+
+    def edge_count(self, relation: RelationType) -> int:
+        arrays = self._relations.get(relation)
+        return len(arrays[1]) if arrays is not None else 0
+
+    def add_edge(self, relation: RelationType, source: int, target: int) -> bool:
+        raise TypeError("Знімок онтології доступний лише для читання")
+
+    def find_path(self, source_id: int, target_id: int,
+                  max_depth: int = 5) -> Tuple[bool, List[str]]:
+        """Пошук шляху BFS прямо над масивами знімка"""
+        return find_path(self.entity(source_id), self.entity(target_id), max_depth)
+
+
+def open_snapshot(path: str, attach: bool = True,
+                  cache_size: int = DEFAULT_CACHE_SIZE) -> SnapshotGraph:
+    """
+    Відкриває знімок
+
+    Args:
+        path: Файл знімка
+        attach: Підключити до Entity.get_instance (пошук сутностей за іменем)
+        cache_size: Розмір LRU-кешу об'єктів сутностей
+    """
+    snapshot = SnapshotGraph(path, cache_size)
+    if attach:
+        Entity.attach_backend(snapshot)
+    return snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бінарні знімки онтології")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    save_parser = commands.add_parser('save', help="завантажити файли і записати знімок")
+    save_parser.add_argument('snapshot')
+    save_parser.add_argument('paths', nargs='+', help="файли JSON-lines / CSV (див. loader.py)")
+
+    info_parser = commands.add_parser('info', help="показати вміст знімка")
+    info_parser.add_argument('snapshot')
+
+    args = parser.parse_args(argv)
+    if args.command == 'save':
+        from loader import load
+        print(f"✅ {load(*args.paths)}")
+        count = save_snapshot(args.snapshot)
+        print(f"💾 Збережено {count} сутностей у {args.snapshot}")
+    else:
+        with SnapshotGraph(args.snapshot) as snapshot:
+            print(f"📦 {args.snapshot}: {len(snapshot)} сутностей")
+            for cls in snapshot.types():
+                print(f"   • {cls.__name__}: {snapshot.count_of(cls, direct=True)}")
+            for relation in RelationType:
+                if relation is not RelationType.IS_A:
+                    print(f"   {relation.value}: {snapshot.edge_count(relation)} відношень")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
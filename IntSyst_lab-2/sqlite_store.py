@@ -0,0 +1,355 @@
+"""
+Постійне сховище онтології в SQLite
+Сутності, атрибути та відношення зберігаються на диску й завантажуються
+ліниво: сутність та її сусідство читаються при першому зверненні через
+обмежений LRU-кеш, а пошук шляху може виконуватися рекурсивним CTE у базі.
+"""
+import json
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from base import Entity, RelationType
+from graph import RELATION_LABELS, RelationView
+from graph_store import GraphStore
+from loader import attribute_names, entity_types
+
+DEFAULT_CACHE_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    attributes TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS entities_type ON entities (type);
+
+CREATE TABLE IF NOT EXISTS relations (
+    subject INTEGER NOT NULL REFERENCES entities (id),
+    relation TEXT NOT NULL,
+    object INTEGER NOT NULL REFERENCES entities (id),
+    PRIMARY KEY (subject, relation, object)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS relations_object ON relations (object, relation);
+
+-- Клас -> всі його класи-предки в онтології (включно з ним, без Entity)
+CREATE TABLE IF NOT EXISTS type_ancestors (
+    type TEXT NOT NULL,
+    ancestor TEXT NOT NULL,
+    PRIMARY KEY (ancestor, type)
+) WITHOUT ROWID;
+"""
+
+# Відстані від source: рекурсивний CTE з тими ж ребрами, що й RelationView.
+# IS-A проходить через вершину класу (текстовий id): сутність -> батьківський
+# клас (та сама глибина) -> всі його екземпляри. Клас розгортається один раз
+# на глибину, а не для кожної сутності - як expanded_classes у graph.py.
+REACH_QUERY = """
+WITH RECURSIVE reach(id, depth) AS (
+    VALUES (:source, 1)
+    UNION
+    SELECT r.object, reach.depth + 1
+      FROM reach JOIN relations r ON r.subject = reach.id
+     WHERE reach.depth < :max_depth
+    UNION
+    SELECT a.ancestor, reach.depth
+      FROM reach
+      JOIN entities e ON e.id = reach.id
+      JOIN type_ancestors a ON a.type = e.type AND a.ancestor <> e.type
+     WHERE reach.depth < :max_depth
+    UNION
+    SELECT i.id, reach.depth + 1
+      FROM reach
+      JOIN type_ancestors b ON b.ancestor = reach.id
+      JOIN entities i ON i.type = b.type
+)
+SELECT id, MIN(depth) FROM reach WHERE typeof(id) = 'integer' GROUP BY id
+"""
+
+
+class SQLiteGraph:
+    """
+    Граф онтології у файлі SQLite
+
+    Має той самий інтерфейс читання, що й GraphStore (id_of, name_of,
+    entity, successors, instances_of...), тож сутності з бази - звичайні
+    представлення Entity з _graph = це сховище, а graph.find_path та
+    RelationView працюють над ним без змін. Рядки сутностей та списки
+    сусідів кешуються в LRU з обмеженим розміром.
+    """
+
+    def __init__(self, path: str, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            path: Файл бази (":memory:" - база в пам'яті)
+            cache_size: Максимальна кількість сутностей / списків сусідів у кеші
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.classes = entity_types()
+        self._attributes: Dict[type, Tuple[str, ...]] = {}
+        # id -> (ім'я, клас, представлення)
+        self._rows: OrderedDict = OrderedDict()
+        # id -> {відношення: id сусідів}
+        self._neighbors: OrderedDict = OrderedDict()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'SQLiteGraph':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Збереження
+    # ------------------------------------------------------------------
+
+    def _attribute_names(self, cls: type) -> Tuple[str, ...]:
+        names = self._attributes.get(cls)
+        if names is None:
+            names = self._attributes[cls] = attribute_names(cls)
+        return names
+
+    def save(self, store: Optional[GraphStore] = None) -> int:
+        """
+        Записує сховище в пам'яті в базу (замінює її вміст)
+
+        Returns:
+            Кількість збережених сутностей
+        """
+        store = store if store is not None else Entity._store
+        alive = store.alive
+
+        def entity_rows():
+            for node_id in store.ids():
+                entity = store.entity(node_id)
+                attributes = {name: getattr(entity, name, None)
+                              for name in self._attribute_names(type(entity))}
+                yield (node_id, store.name_of(node_id), type(entity).__name__,
+                       json.dumps(attributes, ensure_ascii=False))
+
+        def relation_rows():
+            for relation in store.relations:
+                for node_id in store.ids():
+                    for target_id in store.successors(relation, node_id):
+                        if alive[target_id]:
+                            yield node_id, relation.value, target_id
+
+        ancestor_rows = {(cls.__name__, ancestor.__name__)
+                         for cls in store.types() for ancestor in cls.__mro__
+                         if ancestor is not Entity and issubclass(ancestor, Entity)}
+
+        with self.connection:
+            self.connection.execute("DELETE FROM relations")
+            self.connection.execute("DELETE FROM entities")
+            self.connection.execute("DELETE FROM type_ancestors")
+            self.connection.executemany("INSERT INTO entities VALUES (?, ?, ?, ?)", entity_rows())
+            self.connection.executemany("INSERT INTO relations VALUES (?, ?, ?)", relation_rows())
+            self.connection.executemany("INSERT INTO type_ancestors VALUES (?, ?)", ancestor_rows)
+        self.clear_cache()
+        return len(store.name_ids)
+
+    def add_edge(self, relation: RelationType, source: int, target: int) -> bool:
+        """Додає відношення в базу (add_part / add_usage сутностей з бази)"""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO relations VALUES (?, ?, ?)",
+                (source, relation.value, target))
+        self._neighbors.pop(source, None)
+        return cursor.rowcount == 1
+
+    # ------------------------------------------------------------------
+    # Кеш
+    # ------------------------------------------------------------------
+
+    def clear_cache(self) -> None:
+        self._rows.clear()
+        self._neighbors.clear()
+
+    def _remember(self, cache: OrderedDict, key, value) -> None:
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _materialize(self, node_id: int, name: str, type_name: str, attributes: str):
+        """Рядок бази -> (ім'я, клас, представлення сутності)"""
+        cls = self.classes[type_name]
+        entity = cls.__new__(cls)
+        entity._graph = self
+        entity._id = node_id
+        for key, value in json.loads(attributes).items():
+            setattr(entity, key, value)
+        row = (name, cls, entity)
+        self._remember(self._rows, node_id, row)
+        return row
+
+    def _row(self, node_id: int):
+        row = self._rows.get(node_id)
+        if row is not None:
+            self._rows.move_to_end(node_id)
+            return row
+        result = self.connection.execute(
+            "SELECT name, type, attributes FROM entities WHERE id = ?", (node_id,)).fetchone()
+        if result is None:
+            raise KeyError(node_id)
+        return self._materialize(node_id, *result)
+
+    def _neighborhood(self, node_id: int) -> Dict[RelationType, Tuple[int, ...]]:
+        """Всі вихідні відношення сутності - один запит на сусідство"""
+        neighborhood = self._neighbors.get(node_id)
+        if neighborhood is not None:
+            self._neighbors.move_to_end(node_id)
+            return neighborhood
+        grouped: Dict[RelationType, List[int]] = {}
+        for relation, target_id in self.connection.execute(
+                "SELECT relation, object FROM relations WHERE subject = ? ORDER BY relation, object",
+                (node_id,)):
+            grouped.setdefault(RelationType(relation), []).append(target_id)
+        neighborhood = {relation: tuple(ids) for relation, ids in grouped.items()}
+        self._remember(self._neighbors, node_id, neighborhood)
+        return neighborhood
+
+    # ------------------------------------------------------------------
+    # Інтерфейс GraphStore
+    # ------------------------------------------------------------------
+
+    def id_of(self, name: str) -> Optional[int]:
+        result = self.connection.execute(
+            "SELECT id, name, type, attributes FROM entities WHERE name = ?", (name,)).fetchone()
+        if result is None:
+            return None
+        if result[0] not in self._rows:
+            self._materialize(*result)
+        return result[0]
+
+    def name_of(self, node_id: int) -> str:
+        return self._row(node_id)[0]
+
+    def type_of(self, node_id: int) -> type:
+        return self._row(node_id)[1]
+
+    def entity(self, node_id: int):
+        return self._row(node_id)[2]
+
+    def get(self, name: str):
+        """Сутність за іменем або None"""
+        node_id = self.id_of(name)
+        return self.entity(node_id) if node_id is not None else None
+
+    def is_alive(self, node_id: int) -> bool:
+        return True
+
+    def ids(self) -> Iterator[int]:
+        for (node_id,) in self.connection.execute("SELECT id FROM entities ORDER BY id"):
+            yield node_id
+
+    def instances_of(self, cls: type, direct: bool = False) -> Iterator[int]:
+        if cls is Entity:
+            return self.ids()
+        if direct:
+            cursor = self.connection.execute(
+                "SELECT id FROM entities WHERE type = ? ORDER BY id", (cls.__name__,))
+        else:
+            cursor = self.connection.execute(
+                "SELECT e.id FROM type_ancestors a JOIN entities e ON e.type = a.type "
+                "WHERE a.ancestor = ? ORDER BY e.id", (cls.__name__,))
+        return (node_id for (node_id,) in cursor)
+
+    def count_of(self, cls: type, direct: bool = False) -> int:
+        if cls is Entity:
+            return len(self)
+        if direct:
+            query = "SELECT COUNT(*) FROM entities WHERE type = ?"
+        else:
+            query = ("SELECT COUNT(*) FROM type_ancestors a JOIN entities e ON e.type = a.type "
+                     "WHERE a.ancestor = ?")
+        return self.connection.execute(query, (cls.__name__,)).fetchone()[0]
+
+    def types(self) -> List[type]:
+        return [self.classes[type_name] for (type_name,)
+                in self.connection.execute("SELECT DISTINCT type FROM entities")]
+
+    def successors(self, relation: RelationType, node_id: int) -> Sequence[int]:
+        return self._neighborhood(node_id).get(relation, ())
+
+    def predecessors(self, relation: RelationType, node_id: int) -> Sequence[int]:
+        """Суб'єкти відношення до node_id (індекс (object, relation))"""
+        return tuple(subject for (subject,) in self.connection.execute(
+            "SELECT subject FROM relations WHERE object = ? AND relation = ? ORDER BY subject",
+            (node_id, relation.value)))
+
+    def degree(self, relation: RelationType, node_id: int) -> int:
+        return len(self.successors(relation, node_id))
+
+    def in_degree(self, relation: RelationType, node_id: int) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM relations WHERE object = ? AND relation = ?",
+            (node_id, relation.value)).fetchone()[0]
+
+    def edge_count(self, relation: RelationType) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM relations WHERE relation = ?", (relation.value,)).fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Обхід у базі
+    # ------------------------------------------------------------------
+
+    def distances(self, source_id: int, max_depth: int) -> Dict[int, int]:
+        """Кількість сутностей у найкоротшому шляху від source до кожної досяжної"""
+        if max_depth <= 0:
+            return {}
+        return dict(self.connection.execute(
+            REACH_QUERY, {'source': source_id, 'max_depth': max_depth}))
+
+    def find_path(self, source_id: int, target_id: int,
+                  max_depth: int = 5) -> Tuple[bool, List[str]]:
+        """
+        Пошук шляху рекурсивним CTE без завантаження графа в пам'ять
+
+        Відстані обчислює база з поступовим збільшенням глибини (близькі
+        цілі не потребують повного обходу); шлях відновлюється назад від
+        target: на кожному кроці - попередник з відстанню на одиницю меншою.
+        Семантика max_depth - як у graph.find_path.
+        """
+        distances: Dict[int, int] = {}
+        for depth in range(1, max_depth + 1):
+            reached = len(distances)
+            distances = self.distances(source_id, depth)
+            if target_id in distances or len(distances) == reached:
+                break
+        if target_id not in distances:
+            return False, []
+
+        view = RelationView(self)
+        path = [self.name_of(target_id)]
+        current = target_id
+        for depth in range(distances[target_id] - 1, 0, -1):
+            previous, relation = self._predecessor(current, depth, distances, view)
+            path.append(RELATION_LABELS[relation])
+            path.append(self.name_of(previous))
+            current = previous
+        path.reverse()
+        return True, path
+
+    def _predecessor(self, node_id: int, depth: int, distances: Dict[int, int],
+                     view: RelationView) -> Tuple[int, RelationType]:
+        """Попередник вершини на відстані depth (HAS-A / USES, інакше IS-A)"""
+        for subject, relation in self.connection.execute(
+                "SELECT subject, relation FROM relations WHERE object = ? ORDER BY relation, subject",
+                (node_id,)):
+            if distances.get(subject) == depth:
+                return subject, RelationType(relation)
+
+        lineage = set(self.type_of(node_id).__mro__)
+        for candidate, candidate_depth in distances.items():
+            if candidate_depth == depth and candidate != node_id:
+                if lineage.intersection(view.parent_classes(self.type_of(candidate))):
+                    return candidate, RelationType.IS_A
+        raise LookupError(f"Немає попередника для {node_id} на глибині {depth}")